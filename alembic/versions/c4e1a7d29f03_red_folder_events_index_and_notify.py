@@ -0,0 +1,66 @@
+"""red_folder_events (currency, event_time) index, updated_at and change notifications
+
+Revision ID: c4e1a7d29f03
+Revises: b15d570687ff
+Create Date: 2025-12-08 10:12:44.318201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e1a7d29f03'
+down_revision: Union[str, Sequence[str], None] = 'b15d570687ff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_red_folder_events_currency_event_time', 'red_folder_events',
+                    ['currency', 'event_time'], unique=False)
+    # Change marker for processes that poll instead of LISTEN; set by the
+    # database (UTC) on every insert and update, including raw SQL edits
+    op.add_column('red_folder_events', sa.Column('updated_at', sa.DateTime(), nullable=True,
+                                                 server_default=sa.text("timezone('utc', now())")))
+    op.execute("""
+        CREATE OR REPLACE FUNCTION touch_red_folder_events() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := timezone('utc', clock_timestamp());
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER red_folder_events_touch
+        BEFORE INSERT OR UPDATE ON red_folder_events
+        FOR EACH ROW EXECUTE FUNCTION touch_red_folder_events()
+    """)
+    # One NOTIFY per statement on the channel DbNewsAvoidanceService listens on,
+    # so admin edits and bulk imports invalidate every process's calendar cache
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_red_folder_events() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('red_folder_events', TG_OP);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER red_folder_events_notify
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON red_folder_events
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_red_folder_events()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS red_folder_events_notify ON red_folder_events")
+    op.execute("DROP FUNCTION IF EXISTS notify_red_folder_events()")
+    op.execute("DROP TRIGGER IF EXISTS red_folder_events_touch ON red_folder_events")
+    op.execute("DROP FUNCTION IF EXISTS touch_red_folder_events()")
+    op.drop_column('red_folder_events', 'updated_at')
+    op.drop_index('ix_red_folder_events_currency_event_time', table_name='red_folder_events')
@@ -0,0 +1,39 @@
+"""ml_signal_history (instrument, timestamp DESC) index
+
+Revision ID: d7b3f0c85e21
+Revises: c4e1a7d29f03
+Create Date: 2025-12-09 16:40:02.551847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3f0c85e21'
+down_revision: Union[str, Sequence[str], None] = 'c4e1a7d29f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY: the signal services keep inserting while a large history is indexed
+    with op.get_context().autocommit_block():
+        op.create_index('ix_ml_signal_history_instrument_timestamp', 'ml_signal_history',
+                        ['instrument', sa.text('timestamp DESC')], unique=False,
+                        postgresql_concurrently=True)
+        # The composite index covers instrument-only lookups
+        op.drop_index('ix_ml_signal_history_instrument', table_name='ml_signal_history',
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_ml_signal_history_instrument', 'ml_signal_history', ['instrument'],
+                        unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_ml_signal_history_instrument_timestamp', table_name='ml_signal_history',
+                      postgresql_concurrently=True)
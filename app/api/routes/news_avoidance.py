@@ -1,14 +1,18 @@
 """
 News Avoidance API Routes
 Provides REST API endpoints for managing news events and checking trading avoidance.
+
+Handlers use the async backend: checks are served from memory and file writes
+run in a worker thread, so disk latency never stalls the event loop.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel
 from datetime import datetime
 from typing import List, Optional
 
-from app.utils.simple_news_avoidance import simple_news_avoidance
+from app.utils.async_news_avoidance import async_news_avoidance
+from app.utils.news_import import parse_calendar
 
 router = APIRouter()
 
@@ -52,7 +56,7 @@ async def get_upcoming_news(
 ):
     """Get upcoming high-impact news events."""
     try:
-        events = simple_news_avoidance.get_upcoming_news(
+        events = await async_news_avoidance.get_upcoming_news(
             hours_ahead=hours_ahead,
             currency=currency
         )
@@ -65,7 +69,7 @@ async def get_upcoming_news(
 async def create_news_event(event: NewsEventCreate):
     """Add a new news event."""
     try:
-        created_event = simple_news_avoidance.add_news_event(
+        created_event = await async_news_avoidance.add_news_event(
             title=event.title,
             currency=event.currency,
             event_time=event.event_time,
@@ -76,11 +80,51 @@ async def create_news_event(event: NewsEventCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/news-events/import")
+async def import_news_events(
+    request: Request,
+    format: Optional[str] = None,
+    tz: str = "UTC",
+    skip_invalid: bool = False,
+    dry_run: bool = False
+):
+    """
+    Bulk import a calendar file (CSV, ICS or JSON request body).
+
+    The file is validated and de-duplicated in one pass, then written in a
+    single transaction / file write. Any invalid row rejects the whole file
+    (422) unless skip_invalid is set. Events already stored are skipped.
+    """
+    body = (await request.body()).decode("utf-8-sig")
+    try:
+        batch = parse_calendar(body, fmt=format, content_type=request.headers.get("content-type"), tz=tz)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse calendar: {e}")
+
+    summary = {
+        "format": batch["format"],
+        "rows": batch["rows"],
+        "valid": len(batch["events"]),
+        "duplicates": batch["duplicates"],
+        "invalid": len(batch["errors"]),
+        "errors": batch["errors"][:50],
+    }
+    if batch["errors"] and not skip_invalid:
+        raise HTTPException(status_code=422, detail=summary)
+    if dry_run:
+        return {**summary, "inserted": 0, "skipped": 0}
+    try:
+        counts = await async_news_avoidance.import_events(batch["events"])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {**summary, **counts}
+
+
 @router.delete("/news-events/{event_id}", status_code=204)
 async def delete_news_event(event_id: int):
     """Delete a news event by ID."""
     try:
-        success = simple_news_avoidance.delete_news_event(event_id)
+        success = await async_news_avoidance.delete_news_event(event_id)
         if not success:
             raise HTTPException(status_code=404, detail=f"Event with ID {event_id} not found")
     except HTTPException:
@@ -93,7 +137,7 @@ async def delete_news_event(event_id: int):
 async def check_should_avoid_trading(currency_pair: str):
     """Check if trading should be avoided for a currency pair."""
     try:
-        result = simple_news_avoidance.should_avoid_trading(currency_pair)
+        result = await async_news_avoidance.should_avoid_trading(currency_pair)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -103,18 +147,26 @@ async def check_should_avoid_trading(currency_pair: str):
 async def check_should_close_positions(currency_pair: str):
     """Check if positions should be closed for a currency pair."""
     try:
-        result = simple_news_avoidance.should_close_positions(currency_pair)
+        result = await async_news_avoidance.should_close_positions(currency_pair)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/next-transition/{currency_pair}")
+async def get_next_transition(currency_pair: str):
+    """Current avoidance state for a currency pair and when it next changes."""
+    try:
+        return await async_news_avoidance.next_transition(currency_pair)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/settings")
 async def get_settings():
     """Get current news avoidance settings."""
     try:
-        data = simple_news_avoidance._load_data()
-        return data.get("settings", {})
+        return await async_news_avoidance.get_settings()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -128,14 +180,12 @@ async def update_settings(
 ):
     """Update news avoidance settings."""
     try:
-        simple_news_avoidance.update_settings(
+        return await async_news_avoidance.update_settings(
             minutes_before=minutes_before,
             minutes_after=minutes_after,
             minutes_before_close=minutes_before_close,
             enabled=enabled
         )
-        data = simple_news_avoidance._load_data()
-        return data.get("settings", {})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1 @@
+# Historical backtesting
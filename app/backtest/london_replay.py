@@ -0,0 +1,326 @@
+"""
+London Breakout Replay Harness
+Streams M1 candles from the memory-mapped candle store through
+LondonBreakoutStrategy.on_candle, exactly as the live bot feeds it.
+
+- Candles are read in chunks from the store (years of M1 without loading it all)
+- Spread comes from a simulated per-hour spread series (or a constant)
+- News avoidance is a stub driven by the replay clock (optional blackouts, e.g.
+  the blackout timeline compiled from news_events.json), masked per chunk
+- Session flags (local day, Asian/London windows, 12:00 EST flatten) are
+  precomputed per chunk with LondonBreakoutStrategy.session_index
+- Actions are filled like the live driver: ENTER opens at the action price,
+  EXIT closes at the action price, UPDATE_SL is counted
+- Trades, PnL in pips (gross and net of spread) and candles/sec are reported
+
+Usage:
+    python3 -m app.backtest.london_replay --start 2020-01-01 --end 2025-01-01 \\
+        [--config app/services/bots/indy-bots/gbpusd-londonbreak/config.json] [--trades-out trades.csv]
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.utils.candle_store import DEFAULT_STORE_DIR, CandleStore, to_time_ns
+from app.utils.news_calendar import BlackoutTimeline
+
+project_root = Path(__file__).parent.parent.parent
+STRATEGY_DIR = project_root / "app" / "services" / "bots" / "indy-bots" / "gbpusd-londonbreak"
+if str(STRATEGY_DIR) not in sys.path:
+    sys.path.append(str(STRATEGY_DIR))
+
+from gbpusd_london_breakout import LondonBreakoutStrategy, StrategyConfig, load_strategy_config  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = STRATEGY_DIR / "config.json"
+
+# Candles materialized per chunk from the store
+CHUNK_SIZE = 100_000
+
+# Typical GBP/USD spread multipliers by UTC hour (wide around the 21-22 UTC rollover)
+DEFAULT_SPREAD_PROFILE = (
+    1.2, 1.2, 1.1, 1.0, 1.0, 1.0, 0.9, 0.8, 0.8, 0.8, 0.8, 0.8,
+    0.8, 0.8, 0.8, 0.9, 0.9, 1.0, 1.0, 1.1, 1.5, 3.0, 3.0, 1.5,
+)
+
+
+# ------------- Simulated market inputs ------------- #
+
+@dataclass
+class SpreadModel:
+    """Spread in pips per candle: base * hourly profile (+ optional noise)."""
+    base_pips: float = 1.2
+    hourly_profile: Sequence[float] = DEFAULT_SPREAD_PROFILE
+    noise_pips: float = 0.0
+    seed: int = 0
+
+    def series(self, time_ns: np.ndarray) -> np.ndarray:
+        hours = (np.asarray(time_ns, dtype=np.int64) // 3_600_000_000_000) % 24
+        spread = self.base_pips * np.asarray(self.hourly_profile, dtype=np.float64)[hours]
+        if self.noise_pips:
+            rng = np.random.default_rng(self.seed)
+            spread = spread + np.abs(rng.normal(0.0, self.noise_pips, len(spread)))
+        return spread
+
+
+class StubNewsAvoidance:
+    """
+    Drop-in for simple_news_avoidance during replay.
+    Blackouts are inclusive (start, end) UTC pairs, sorted and disjoint; the
+    harness masks each chunk once and sets `blocked` (and `now`) per candle.
+    """
+
+    def __init__(self, blackouts: Optional[List[Tuple[datetime, datetime]]] = None):
+        self.now: Optional[datetime] = None
+        self._starts = np.array([to_time_ns([start])[0] for start, _ in blackouts or []], dtype=np.int64)
+        self._ends = np.array([to_time_ns([end])[0] for _, end in blackouts or []], dtype=np.int64)
+        self.now_ns = 0
+        self.blocked = False
+        self.checks = 0
+
+    @classmethod
+    def from_timeline(cls, timeline: BlackoutTimeline, instrument: str) -> "StubNewsAvoidance":
+        """Blackouts of the instrument's currencies from a compiled news timeline."""
+        stub = cls()
+        starts, ends = timeline.intervals(instrument.upper().split("_")[:2], "blackout")
+        stub._starts, stub._ends = starts, ends - 1  # timeline intervals are half-open
+        return stub
+
+    def mask(self, time_ns: np.ndarray) -> np.ndarray:
+        """Vectorized blackout check for a chunk of candle times (epoch ns)."""
+        time_ns = np.asarray(time_ns, dtype=np.int64)
+        idx = np.searchsorted(self._starts, time_ns, side="right") - 1
+        inside = idx >= 0
+        inside[inside] = time_ns[inside] <= self._ends[idx[inside]]
+        return inside
+
+    def should_avoid_trading(self, instrument: str) -> Dict:
+        self.checks += 1
+        if self.blocked:
+            return {"avoid_trading": True, "reason": "Replay news blackout"}
+        return {"avoid_trading": False, "reason": None}
+
+    def should_close_positions(self, instrument: str) -> Dict:
+        return {"close_positions": False, "reason": None}
+
+
+# ------------- Results ------------- #
+
+@dataclass
+class ReplayResult:
+    trades: pd.DataFrame
+    stats: Dict = field(default_factory=dict)
+
+
+class _Book:
+    """Simulated broker position, filled from the strategy's actions."""
+
+    def __init__(self):
+        self.open: Optional[Dict] = None
+        self.trades: List[Dict] = []
+        self.sl_updates = 0
+
+    def on_action(self, action: Dict, candle_time: datetime, spread_pips: float, pip: float):
+        kind = action["action"]
+        if kind == "ENTER" and self.open is None:
+            self.open = {
+                "entry_time": candle_time,
+                "direction": action["direction"],
+                "probe": action.get("probe_number"),
+                "entry_price": action["entry_price"],
+                "sl_price": action["sl_price"],
+                "tp_price": action["tp_price"],
+                "spread_pips": spread_pips,
+            }
+        elif kind == "EXIT" and self.open is not None:
+            trade = self.open
+            sign = 1.0 if trade["direction"] == "long" else -1.0
+            gross = sign * (action["exit_price"] - trade["entry_price"]) / pip
+            trade.update({
+                "exit_time": candle_time,
+                "exit_price": action["exit_price"],
+                "exit_reason": action.get("exit_reason"),
+                "pips_gross": gross,
+                "pips_net": gross - trade["spread_pips"],
+            })
+            self.trades.append(trade)
+            self.open = None
+        elif kind == "UPDATE_SL":
+            self.sl_updates += 1
+
+
+# ------------- Replay ------------- #
+
+def replay(cfg: StrategyConfig, arrays: Dict[str, np.ndarray], spread_pips: np.ndarray,
+           news: Optional[StubNewsAvoidance] = None, chunk_size: int = CHUNK_SIZE,
+           strategy_logger: Optional[logging.Logger] = None) -> ReplayResult:
+    """
+    Feed candles through a fresh LondonBreakoutStrategy.
+
+    Args:
+        cfg: Strategy configuration
+        arrays: Column arrays (time int64 ns UTC, open, high, low, close[, volume]);
+            memmaps and shared-memory views are read chunk by chunk
+        spread_pips: Spread per candle (same length as the arrays)
+        news: News stub (default: never blocks)
+        chunk_size: Candles materialized per chunk
+        strategy_logger: Logger given to the strategy (default: WARNING-level,
+            so per-candle info logs are discarded)
+    """
+    news = news or StubNewsAvoidance()
+    strategy_logger = strategy_logger or _quiet_logger()
+    strategy = LondonBreakoutStrategy(cfg, logger=strategy_logger, news_avoidance=news)
+    book = _Book()
+    pip = cfg.pip_value
+
+    times = arrays["time"]
+    total = len(times)
+    volume = arrays.get("volume")
+    actions = {"ENTER": 0, "EXIT": 0, "UPDATE_SL": 0}
+
+    started = time.perf_counter()
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        time_ns = np.asarray(times[start:stop], dtype=np.int64)
+        stamps = pd.DatetimeIndex(time_ns, tz="UTC").to_pydatetime()
+        opens = np.asarray(arrays["open"][start:stop]).tolist()
+        highs = np.asarray(arrays["high"][start:stop]).tolist()
+        lows = np.asarray(arrays["low"][start:stop]).tolist()
+        closes = np.asarray(arrays["close"][start:stop]).tolist()
+        volumes = np.asarray(volume[start:stop]).tolist() if volume is not None else [0] * (stop - start)
+        spreads = np.asarray(spread_pips[start:stop], dtype=np.float64).tolist()
+        ns_list = time_ns.tolist()
+        local_days, flags = strategy.session_index(time_ns)
+        sessions = list(zip(local_days.tolist(), flags.tolist()))
+        blocked = news.mask(time_ns).tolist()
+
+        for i in range(stop - start):
+            news.now = stamps[i]
+            news.now_ns = ns_list[i]
+            news.blocked = blocked[i]
+            candle = {
+                "time": stamps[i],
+                "open": opens[i],
+                "high": highs[i],
+                "low": lows[i],
+                "close": closes[i],
+                "volume": volumes[i],
+            }
+            action = strategy.on_candle(candle, spreads[i], sessions[i])
+            if action:
+                actions[action["action"]] = actions.get(action["action"], 0) + 1
+                book.on_action(action, stamps[i], spreads[i], pip)
+
+    elapsed = time.perf_counter() - started
+    trades = pd.DataFrame(book.trades, columns=[
+        "entry_time", "exit_time", "direction", "probe", "entry_price", "sl_price", "tp_price",
+        "exit_price", "exit_reason", "spread_pips", "pips_gross", "pips_net",
+    ])
+    stats = summarize(trades)
+    stats.update({
+        "candles": int(total),
+        "elapsed_s": round(elapsed, 2),
+        "candles_per_sec": round(total / elapsed) if elapsed > 0 else None,
+        "actions": actions,
+        "sl_updates": book.sl_updates,
+        "open_at_end": book.open is not None,
+    })
+    return ReplayResult(trades=trades, stats=stats)
+
+
+def summarize(trades: pd.DataFrame) -> Dict:
+    """Headline statistics for a replay trade list (pips)."""
+    if trades.empty:
+        return {"trades": 0, "pips_net": 0.0}
+
+    net = trades["pips_net"]
+    equity = net.cumsum()
+    wins = net > 0
+    gross_win = net[wins].sum()
+    gross_loss = -net[~wins].sum()
+    by_year = net.groupby(pd.to_datetime(trades["entry_time"], utc=True).dt.year).sum()
+    return {
+        "trades": int(len(trades)),
+        "win_rate": round(float(wins.mean()), 4),
+        "pips_gross": round(float(trades["pips_gross"].sum()), 1),
+        "pips_net": round(float(net.sum()), 1),
+        "avg_pips": round(float(net.mean()), 2),
+        "profit_factor": round(float(gross_win / gross_loss), 3) if gross_loss > 0 else None,
+        "max_drawdown_pips": round(float((equity - equity.cummax()).min()), 1),
+        "exits": trades["exit_reason"].value_counts().to_dict(),
+        "pips_by_year": {int(year): round(float(pips), 1) for year, pips in by_year.items()},
+    }
+
+
+def _quiet_logger() -> logging.Logger:
+    quiet = logging.getLogger("london_replay.strategy")
+    quiet.setLevel(logging.WARNING)
+    quiet.propagate = False
+    return quiet
+
+
+def load_candles(instrument: str = "GBP_USD", start=None, end=None,
+                 root_dir=DEFAULT_STORE_DIR) -> Dict[str, np.ndarray]:
+    """Zero-copy M1 column views for [start, end) from the candle store."""
+    store = CandleStore(instrument, "M1", root_dir)
+    if not store.exists():
+        raise FileNotFoundError(
+            f"No M1 candle store at {store.path}; convert a CSV first: "
+            f"python3 -m app.utils.candle_store convert <csv> --instrument {instrument} --granularity M1"
+        )
+    return store.range(start, end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay M1 history through LondonBreakoutStrategy")
+    parser.add_argument("--instrument", default="GBP_USD")
+    parser.add_argument("--start", help="Inclusive start date (UTC)")
+    parser.add_argument("--end", help="Exclusive end date (UTC)")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="Strategy config.json")
+    parser.add_argument("--root", default=str(DEFAULT_STORE_DIR), help="Candle store root")
+    parser.add_argument("--spread-pips", type=float, default=1.2, help="Base spread in pips")
+    parser.add_argument("--flat-spread", action="store_true", help="Use the base spread at all hours")
+    parser.add_argument("--no-news", action="store_true", help="Disable news avoidance in the strategy")
+    parser.add_argument("--news-file", help="news_events.json to compile into replay blackouts")
+    parser.add_argument("--trades-out", help="Write the trade list to this CSV")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+
+    cfg = load_strategy_config(args.config)
+    if args.no_news:
+        cfg.news_avoidance_enabled = False
+
+    arrays = load_candles(args.instrument, args.start, args.end, args.root)
+    profile = (1.0,) * 24 if args.flat_spread else DEFAULT_SPREAD_PROFILE
+    spreads = SpreadModel(base_pips=args.spread_pips, hourly_profile=profile).series(arrays["time"])
+
+    news = None
+    if args.news_file:
+        from app.utils.simple_news_avoidance import SimpleNewsAvoidanceService
+        timeline = SimpleNewsAvoidanceService(data_file=args.news_file).blackout_timeline()
+        news = StubNewsAvoidance.from_timeline(timeline, args.instrument)
+        blocked = news.mask(arrays["time"])
+        print(f"📰 News blackouts cover {blocked.mean():.1%} of candles")
+
+    print(f"📼 Replaying {len(arrays['time']):,} {args.instrument} M1 candles through LondonBreakoutStrategy...")
+    result = replay(cfg, arrays, spreads, news=news)
+
+    print("=" * 70)
+    print(json.dumps(result.stats, indent=2, default=str))
+    if args.trades_out:
+        result.trades.to_csv(args.trades_out, index=False)
+
+
+if __name__ == "__main__":
+    main()
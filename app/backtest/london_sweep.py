@@ -0,0 +1,419 @@
+"""
+London Breakout Parameter Sweep
+Evaluates many StrategyConfig variants over M1 history in a process pool and
+writes a ranked results table.
+
+- The candle columns and spread series are copied once into a
+  multiprocessing.shared_memory block; workers attach to it and replay over
+  zero-copy NumPy views instead of receiving pickled arrays per task
+- Search modes: grid (full cartesian product), random (uniform on the
+  parameter grid) and bayes (Gaussian-process surrogate with expected
+  improvement, evaluated in batches of one config per worker)
+- Each variant is a full LondonBreakoutStrategy replay (app.backtest.london_replay)
+
+Usage:
+    python3 -m app.backtest.london_sweep --mode bayes --evals 400 --start 2019-01-01 --end 2025-01-01 \\
+        [--space space.json] [--workers 8] [--out sweep_results.csv] [--best-config-out config.best.json]
+"""
+
+import argparse
+import copy
+import dataclasses
+import itertools
+import json
+import logging
+import math
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import time as dtime
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.backtest.london_replay import (
+    DEFAULT_CONFIG, DEFAULT_SPREAD_PROFILE, SpreadModel, StrategyConfig, load_candles,
+    load_strategy_config, replay,
+)
+from app.utils.candle_store import DEFAULT_STORE_DIR
+
+logger = logging.getLogger(__name__)
+
+OBJECTIVES = ("pips_net", "profit_factor", "calmar")
+
+# Columns shared with the workers
+SHARED_COLUMNS = (("time", np.int64), ("open", np.float64), ("high", np.float64),
+                  ("low", np.float64), ("close", np.float64), ("spread", np.float64))
+
+
+# ------------- Parameter space ------------- #
+
+@dataclass
+class Param:
+    """One swept knob: a numeric range on a step grid, or explicit choices."""
+    name: str
+    low: float = 0.0
+    high: float = 0.0
+    step: float = 1.0
+    choices: Optional[Sequence[Any]] = None
+
+    def values(self) -> List[Any]:
+        if self.choices is not None:
+            return list(self.choices)
+        count = int(round((self.high - self.low) / self.step)) + 1
+        return [_clean(self.low + i * self.step) for i in range(count)]
+
+    @classmethod
+    def from_dict(cls, name: str, spec) -> "Param":
+        if isinstance(spec, list):
+            return cls(name, choices=spec)
+        return cls(name, spec["low"], spec["high"], spec.get("step", 1.0))
+
+
+def _clean(value: float):
+    value = round(value, 6)
+    return int(value) if float(value).is_integer() else value
+
+
+# StrategyConfig fields plus `tp_scale` (multiplies every ATR TP band)
+DEFAULT_SPACE = [
+    Param("min_asian_range_pips", 6, 20, 2),
+    Param("max_asian_range_pips", 40, 100, 10),
+    Param("breakout_buffer_pips", 0, 5, 1),
+    Param("initial_stop_pips", 10, 25, 2.5),
+    Param("probe_max_count", 1, 4, 1),
+    Param("trail_step_1_pips", 6, 20, 2),
+    Param("trail_sl_1_pips", -8, 0, 2),
+    Param("trail_step_2_pips", 10, 30, 2),
+    Param("trail_sl_2_pips", 0, 4, 1),
+    Param("trail_step_3_pips", 16, 40, 4),
+    Param("trail_sl_3_pips", 4, 20, 2),
+    Param("tp_scale", 0.6, 1.6, 0.1),
+    Param("london_window_end", choices=["04:15", "05:15", "06:15", "07:15"]),
+]
+
+
+def load_space(path: Optional[str]) -> List[Param]:
+    """Parameter space from JSON ({name: {low, high, step}} or {name: [choices]})."""
+    if not path:
+        return list(DEFAULT_SPACE)
+    with open(path) as f:
+        raw = json.load(f)
+    return [Param.from_dict(name, spec) for name, spec in raw.items()]
+
+
+def apply_params(base: StrategyConfig, params: Dict[str, Any]) -> StrategyConfig:
+    """New StrategyConfig with the swept values applied."""
+    fields = {f.name: f for f in dataclasses.fields(StrategyConfig)}
+    changes = {}
+    for name, value in params.items():
+        if name == "tp_scale":
+            changes["atr_tp_bands"] = [
+                {**band, "tp_pips": round(band["tp_pips"] * value, 1)} for band in base.atr_tp_bands
+            ]
+        elif name not in fields:
+            raise ValueError(f"Unknown strategy parameter: {name}")
+        elif isinstance(getattr(base, name), dtime):
+            hh, mm = str(value).split(":")
+            changes[name] = dtime(int(hh), int(mm))
+        else:
+            changes[name] = value
+    return dataclasses.replace(base, **changes)
+
+
+def is_valid(cfg: StrategyConfig) -> bool:
+    """Reject variants whose knobs contradict each other."""
+    steps = (cfg.trail_step_1_pips, cfg.trail_step_2_pips, cfg.trail_step_3_pips)
+    stops = (cfg.trail_sl_1_pips, cfg.trail_sl_2_pips, cfg.trail_sl_3_pips)
+    return (cfg.min_asian_range_pips < cfg.max_asian_range_pips
+            and list(steps) == sorted(steps) and list(stops) == sorted(stops)
+            and all(sl < step for sl, step in zip(stops, steps))
+            and cfg.london_window_start < cfg.london_window_end)
+
+
+def to_raw_config(raw: Dict, params: Dict[str, Any]) -> Dict:
+    """Merge swept values back into a config.json dict (for the bot)."""
+    raw = copy.deepcopy(raw)
+    for name, value in params.items():
+        if name == "tp_scale":
+            for band in raw["strategy_params"]["atr_tp_bands"]:
+                band["tp_pips"] = round(band["tp_pips"] * value, 1)
+        elif name in raw["session_times"]:
+            raw["session_times"][name] = value
+        elif name in raw["market_conditions"]:
+            raw["market_conditions"][name] = value
+        else:
+            raw["strategy_params"][name] = value
+    return raw
+
+
+# ------------- Shared candle memory ------------- #
+
+class SharedCandles:
+    """Candle columns + spread series in one shared-memory block."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], spread: np.ndarray):
+        length = len(arrays["time"])
+        self.length = length
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, length * 8 * len(SHARED_COLUMNS)))
+        for name, view in self.views(self.shm, length).items():
+            view[:] = spread if name == "spread" else arrays[name]
+
+    @staticmethod
+    def views(shm: shared_memory.SharedMemory, length: int) -> Dict[str, np.ndarray]:
+        return {
+            name: np.ndarray((length,), dtype=dtype, buffer=shm.buf, offset=i * length * 8)
+            for i, (name, dtype) in enumerate(SHARED_COLUMNS)
+        }
+
+    @property
+    def handle(self) -> Tuple[str, int]:
+        return self.shm.name, self.length
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# Per-worker state, set by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(handle: Tuple[str, int], base: StrategyConfig):
+    name, length = handle
+    shm = shared_memory.SharedMemory(name=name)
+    views = SharedCandles.views(shm, length)
+    _worker.update(shm=shm, base=base, spread=views.pop("spread"), arrays=views)
+
+
+def _evaluate(params: Dict[str, Any]) -> Dict[str, Any]:
+    cfg = apply_params(_worker["base"], params)
+    result = replay(cfg, _worker["arrays"], _worker["spread"])
+    return _row(params, result.stats)
+
+
+def _row(params: Dict[str, Any], stats: Dict) -> Dict[str, Any]:
+    drawdown = stats.get("max_drawdown_pips") or 0.0
+    return {
+        **params,
+        "trades": stats["trades"],
+        "win_rate": stats.get("win_rate"),
+        "pips_net": stats["pips_net"],
+        "avg_pips": stats.get("avg_pips"),
+        "profit_factor": stats.get("profit_factor"),
+        "max_drawdown_pips": drawdown,
+        "calmar": round(stats["pips_net"] / abs(drawdown), 3) if drawdown else None,
+        "elapsed_s": stats["elapsed_s"],
+    }
+
+
+# ------------- Search strategies ------------- #
+
+def grid_candidates(space: List[Param], base: StrategyConfig, limit: Optional[int] = None) -> List[Dict]:
+    names = [p.name for p in space]
+    size = math.prod(len(p.values()) for p in space)
+    if limit is not None and size > limit:
+        raise ValueError(f"Grid has {size:,} points (> --evals {limit:,}); narrow the space or use random/bayes")
+    candidates = (dict(zip(names, values)) for values in itertools.product(*(p.values() for p in space)))
+    return [c for c in candidates if is_valid(apply_params(base, c))]
+
+
+def random_candidates(space: List[Param], base: StrategyConfig, count: int,
+                      rng: np.random.Generator, seen: Optional[set] = None) -> List[Dict]:
+    """Distinct valid random points on the parameter grid."""
+    seen = set() if seen is None else seen
+    grids = [p.values() for p in space]
+    out = []
+    for _ in range(count * 50):
+        if len(out) >= count:
+            break
+        candidate = {p.name: grid[rng.integers(len(grid))] for p, grid in zip(space, grids)}
+        key = _key(candidate)
+        if key in seen or not is_valid(apply_params(base, candidate)):
+            continue
+        seen.add(key)
+        out.append(candidate)
+    return out
+
+
+def _key(params: Dict) -> Tuple:
+    return tuple(sorted(params.items()))
+
+
+def _encode(space: List[Param], params: Dict) -> np.ndarray:
+    """Map a candidate onto [0, 1]^d by its position in each parameter grid."""
+    coords = []
+    for p in space:
+        grid = p.values()
+        coords.append(grid.index(params[p.name]) / max(1, len(grid) - 1))
+    return np.array(coords)
+
+
+def propose_bayes(space: List[Param], base: StrategyConfig, rows: List[Dict], objective: str,
+                  batch: int, rng: np.random.Generator, seen: set, pool_size: int = 2000) -> List[Dict]:
+    """Next batch by expected improvement under a GP fitted to the evaluated rows."""
+    from scipy.stats import norm
+    from sklearn.gaussian_process import GaussianProcessRegressor
+    from sklearn.exceptions import ConvergenceWarning
+    from sklearn.gaussian_process.kernels import Matern, WhiteKernel
+
+    scored = [r for r in rows if _score(r, objective) is not None]
+    if len(scored) < 5:
+        return random_candidates(space, base, batch, rng, seen)
+
+    X = np.array([_encode(space, r) for r in scored])
+    y = np.array([_score(r, objective) for r in scored])
+    kernel = Matern(length_scale=np.full(X.shape[1], 0.3), length_scale_bounds=(1e-2, 10.0), nu=2.5) \
+        + WhiteKernel()
+    gp = GaussianProcessRegressor(kernel=kernel, normalize_y=True, random_state=int(rng.integers(1 << 31)))
+    with warnings.catch_warnings():
+        # Hyperparameters pinned at a bound are fine for a surrogate
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        gp.fit(X, y)
+
+    pool = random_candidates(space, base, pool_size, rng, set(seen))
+    if not pool:
+        return []
+    mu, sigma = gp.predict(np.array([_encode(space, c) for c in pool]), return_std=True)
+    sigma = np.maximum(sigma, 1e-9)
+    z = (mu - y.max()) / sigma
+    ei = (mu - y.max()) * norm.cdf(z) + sigma * norm.pdf(z)
+
+    picked = [pool[i] for i in np.argsort(-ei)[:batch]]
+    seen.update(_key(c) for c in picked)
+    return picked
+
+
+def _score(row: Dict, objective: str, min_trades: int = 0) -> Optional[float]:
+    if row["trades"] < min_trades:
+        return None
+    value = row.get(objective)
+    return None if value is None else float(value)
+
+
+# ------------- Runner ------------- #
+
+def run_sweep(arrays: Dict[str, np.ndarray], spread: np.ndarray, base: StrategyConfig,
+              space: List[Param], mode: str = "random", evals: int = 100,
+              workers: Optional[int] = None, objective: str = "pips_net",
+              min_trades: int = 20, seed: int = 0) -> pd.DataFrame:
+    """
+    Evaluate config variants in a process pool over shared candle memory.
+
+    Args:
+        arrays: Candle columns (time int64 ns UTC, open, high, low, close)
+        spread: Spread in pips per candle
+        base: Config the swept parameters are applied to
+        space: Swept parameters
+        mode: "grid", "random" or "bayes"
+        evals: Evaluation budget (grid: maximum allowed grid size)
+        workers: Processes (default: CPU count)
+        objective: Ranking column (pips_net, profit_factor or calmar)
+        min_trades: Variants with fewer trades rank last
+        seed: RNG seed for random/bayes
+
+    Returns:
+        Results ranked best-first (one row per variant)
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+    workers = workers or os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+    seen: set = set()
+
+    shared = SharedCandles(arrays, spread)
+    rows: List[Dict] = []
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared.handle, base)) as pool:
+            if mode == "grid":
+                rows = list(pool.map(_evaluate, grid_candidates(space, base, evals)))
+            elif mode == "random":
+                rows = list(pool.map(_evaluate, random_candidates(space, base, evals, rng, seen)))
+            elif mode == "bayes":
+                while len(rows) < evals:
+                    initial = len(rows) < max(2 * workers, 10)
+                    batch = min(workers, evals - len(rows))
+                    candidates = (random_candidates(space, base, batch, rng, seen) if initial else
+                                  propose_bayes(space, base, rows, objective, batch, rng, seen))
+                    if not candidates:
+                        break
+                    rows.extend(pool.map(_evaluate, candidates))
+                    best = max((s for s in (_score(r, objective, min_trades) for r in rows) if s is not None),
+                               default=None)
+                    logger.info(f"🔎 {len(rows)}/{evals} evaluated, best {objective}={best}")
+            else:
+                raise ValueError(f"Unknown mode: {mode}")
+    finally:
+        shared.close()
+
+    logger.info(f"✅ {len(rows)} variants in {time.perf_counter() - started:.1f}s ({workers} workers)")
+    return rank(rows, objective, min_trades)
+
+
+def rank(rows: List[Dict], objective: str, min_trades: int = 0) -> pd.DataFrame:
+    """Results table sorted best-first; variants below min_trades go last."""
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    eligible = (df["trades"] >= min_trades) & df[objective].notna()
+    df = df.assign(_eligible=eligible).sort_values(["_eligible", objective], ascending=[False, False],
+                                                   na_position="last")
+    df = df.drop(columns="_eligible").reset_index(drop=True)
+    df.insert(0, "rank", np.arange(1, len(df) + 1))
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep LondonBreakoutStrategy parameters over M1 history")
+    parser.add_argument("--mode", choices=["grid", "random", "bayes"], default="bayes")
+    parser.add_argument("--evals", type=int, default=200, help="Evaluation budget (grid: max grid size)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="pips_net")
+    parser.add_argument("--min-trades", type=int, default=20)
+    parser.add_argument("--space", help="Parameter space JSON (default: built-in)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--instrument", default="GBP_USD")
+    parser.add_argument("--start", help="Inclusive start date (UTC)")
+    parser.add_argument("--end", help="Exclusive end date (UTC)")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="Base strategy config.json")
+    parser.add_argument("--root", default=str(DEFAULT_STORE_DIR), help="Candle store root")
+    parser.add_argument("--spread-pips", type=float, default=1.2, help="Base spread in pips")
+    parser.add_argument("--out", default="london_sweep_results.csv", help="Ranked results CSV")
+    parser.add_argument("--best-config-out", help="Write the best variant as a bot config.json")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+
+    base = load_strategy_config(args.config)
+    base.news_avoidance_enabled = False  # no historical calendar in replays
+    arrays = load_candles(args.instrument, args.start, args.end, args.root)
+    spread = SpreadModel(base_pips=args.spread_pips, hourly_profile=DEFAULT_SPREAD_PROFILE).series(arrays["time"])
+    space = load_space(args.space)
+
+    print(f"🧮 {args.mode} sweep: {args.evals} evals over {len(arrays['time']):,} M1 candles, "
+          f"{len(space)} parameters")
+    results = run_sweep(arrays, spread, base, space, args.mode, args.evals, args.workers,
+                        args.objective, args.min_trades, args.seed)
+    results.to_csv(args.out, index=False)
+
+    print("=" * 70)
+    print(results.head(10).to_string(index=False))
+    print(f"\n💾 {len(results)} results written to {args.out}")
+
+    if args.best_config_out and not results.empty:
+        best = {p.name: results.iloc[0][p.name] for p in space}
+        best = {k: (v.item() if hasattr(v, "item") else v) for k, v in best.items()}
+        with open(args.config) as f:
+            raw = json.load(f)
+        Path(args.best_config_out).write_text(json.dumps(to_raw_config(raw, best), indent=2))
+        print(f"🏆 Best config written to {args.best_config_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""
+Vectorized ML Ensemble Backtester
+Evaluates the EURUSDMLEnsembleStrategy rules over full H1 history.
+
+1. Features for every bar at once (vectorized calculate_indicators)
+2. One batched predict per ensemble member over all rows
+3. Signal classification (BUY/SELL/NEUTRAL, confidence) with NumPy
+4. SL/TP exits for every candidate entry resolved in NumPy blocks
+5. A single pass over candidates applies max_positions, the same-direction
+   cooldown and risk-based sizing, giving the trade list and equity curve
+
+Simulation rules (mirroring the live bot):
+- A signal is formed at a bar's close; the trade is entered at the next bar's
+  open, paying half the spread (BUY at ask, SELL at bid)
+- SL/TP are entry -/+ ATR * multiplier, evaluated on bid (long) / ask (short)
+- If SL and TP are both touched within one bar, SL is assumed first
+- A bar that opens through the SL/TP exits at its open (gap fill)
+- Trades still open at the end of the data are closed at the last close
+- News avoidance is not simulated
+
+Usage:
+    python3 -m app.backtest.ml_ensemble --instrument EUR_USD --start 2015-01-01 \\
+        [--csv data/h1_data/EUR_USD_H1_....csv] [--model-dir DIR] [--trades-out trades.csv]
+"""
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from app.utils.candle_store import DEFAULT_STORE_DIR, open_store
+from app.utils.incremental_indicators import FEATURE_COLS, calculate_indicators
+from app.utils.model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+H1_DATA_DIR = Path("/home/myalgo/algo-trader/data/h1_data")
+MODEL_ROOT = Path("/home/myalgo/algo-trader/ml_models/signal_generator")
+
+CONFIDENCE_LEVELS = {"LOW": 1, "MEDIUM": 2, "HIGH": 3}
+
+# Bars of price history scanned per block when resolving exits
+EXIT_BLOCK = 256
+
+
+@dataclass
+class BacktestConfig:
+    """Strategy rules (bot config.json keys) plus simulation costs."""
+    stop_loss_multiplier: float = 2.0
+    take_profit_multiplier: float = 3.0
+    min_confidence: str = "MEDIUM"
+    max_positions: int = 1
+    same_direction_cooldown: float = 1800.0   # seconds
+    risk_percentage: float = 2.0
+    initial_balance: float = 10_000.0
+    spread_pips: float = 1.0
+    pip_size: float = 0.0001
+    bar_seconds: int = 3600
+
+    @classmethod
+    def from_bot_config(cls, config: Dict, **overrides) -> "BacktestConfig":
+        """Build from an ML ensemble bot config.json (unknown keys are ignored)."""
+        known = {name: config[name] for name in cls.__dataclass_fields__ if name in config}
+        known.update(overrides)
+        return cls(**known)
+
+
+@dataclass
+class BacktestResult:
+    trades: pd.DataFrame
+    equity: pd.Series
+    stats: Dict = field(default_factory=dict)
+
+
+# ------------- Signals ------------- #
+
+def predict_probabilities(features: pd.DataFrame, models: List[xgb.Booster]) -> np.ndarray:
+    """
+    Ensemble P(up) for every row: one batched predict per member.
+
+    NaNs are forward-filled per column and remaining ones set to 0, the batch
+    equivalent of the live engine's last-valid-value rule; member outputs are
+    rounded to 4 dp before averaging, as in generate_signal().
+    """
+    matrix = features[FEATURE_COLS].ffill().fillna(0.0).to_numpy(dtype=np.float64)
+    dmatrix = xgb.DMatrix(matrix, feature_names=FEATURE_COLS)
+    predictions = np.vstack([np.round(model.predict(dmatrix), 4) for model in models])
+    return predictions.mean(axis=0)
+
+
+def classify_signals(prob_up: np.ndarray):
+    """
+    Vectorized signal rules.
+
+    Returns:
+        (direction, confidence) arrays: direction +1 BUY / -1 SELL / 0 NEUTRAL,
+        confidence 1 LOW / 2 MEDIUM / 3 HIGH
+    """
+    direction = np.where(prob_up > 0.6, 1, np.where(prob_up < 0.4, -1, 0))
+    high = np.where(direction == 1, prob_up > 0.75, prob_up < 0.25)
+    confidence = np.where(direction == 0, 1, np.where(high, 3, 2))
+    return direction.astype(np.int8), confidence.astype(np.int8)
+
+
+# ------------- Exits ------------- #
+
+def resolve_exits(entry_idx: np.ndarray, direction: np.ndarray, stop_loss: np.ndarray,
+                  take_profit: np.ndarray, open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                  close: np.ndarray, half_spread: float, block: int = EXIT_BLOCK):
+    """
+    First SL/TP touch for every candidate trade, scanning price in blocks.
+
+    Returns:
+        (exit_idx, exit_price, exit_reason) arrays; reason 1 = SL, 2 = TP, 0 = end of data
+    """
+    n = len(close)
+    count = len(entry_idx)
+    exit_idx = np.full(count, n - 1, dtype=np.int64)
+    exit_price = np.full(count, close[-1] - direction * half_spread if n else np.nan, dtype=np.float64)
+    exit_reason = np.zeros(count, dtype=np.int8)
+
+    pending = np.arange(count)
+    offset = 0
+    steps = np.arange(block)
+    while pending.size:
+        bars = entry_idx[pending, None] + offset + steps[None, :]
+        valid = bars < n
+        bars = np.minimum(bars, n - 1)
+        side = direction[pending, None]
+
+        # Exit side of the book: bid for longs, ask for shorts
+        exit_high = high[bars] - side * half_spread
+        exit_low = low[bars] - side * half_spread
+        sl = stop_loss[pending, None]
+        tp = take_profit[pending, None]
+        sl_hit = np.where(side > 0, exit_low <= sl, exit_high >= sl) & valid
+        tp_hit = np.where(side > 0, exit_high >= tp, exit_low <= tp) & valid
+        hit = sl_hit | tp_hit
+
+        found = hit.any(axis=1)
+        rows = pending[found]
+        first = hit[found].argmax(axis=1)
+        bar = bars[found, first]
+        is_sl = sl_hit[found, first]
+
+        # Gap through the level: filled at the bar's open (not on the entry bar)
+        exit_open = open_[bar] - direction[rows] * half_spread
+        level = np.where(is_sl, stop_loss[rows], take_profit[rows])
+        gapped = (bar > entry_idx[rows]) & np.where(
+            is_sl,
+            np.where(direction[rows] > 0, exit_open <= level, exit_open >= level),
+            np.where(direction[rows] > 0, exit_open >= level, exit_open <= level),
+        )
+        exit_idx[rows] = bar
+        exit_price[rows] = np.where(gapped, exit_open, level)
+        exit_reason[rows] = np.where(is_sl, 1, 2)
+
+        # Unresolved rows continue with the next block while price data remains
+        still = pending[~found]
+        pending = still[entry_idx[still] + offset + block < n]
+        offset += block
+
+    return exit_idx, exit_price, exit_reason
+
+
+# ------------- Simulation ------------- #
+
+def simulate(candles: pd.DataFrame, prob_up: np.ndarray, config: BacktestConfig) -> BacktestResult:
+    """
+    Apply the strategy rules to precomputed probabilities.
+
+    Args:
+        candles: H1 candles with an 'atr' column (time, open, high, low, close, atr)
+        prob_up: Ensemble P(up) per row (signal formed at that row's close)
+        config: Strategy and cost settings
+    """
+    times = pd.to_datetime(candles["time"], utc=True)
+    time_s = times.astype("int64").to_numpy() // 1_000_000_000
+    open_ = candles["open"].to_numpy(dtype=np.float64)
+    high = candles["high"].to_numpy(dtype=np.float64)
+    low = candles["low"].to_numpy(dtype=np.float64)
+    close = candles["close"].to_numpy(dtype=np.float64)
+    atr = candles["atr"].to_numpy(dtype=np.float64)
+    n = len(close)
+    half_spread = config.spread_pips * config.pip_size / 2
+
+    direction, confidence = classify_signals(np.asarray(prob_up, dtype=np.float64))
+    min_level = CONFIDENCE_LEVELS.get(config.min_confidence, 2)
+
+    # Candidate entries: tradable signal with a next bar to enter on
+    signal_idx = np.flatnonzero((direction != 0) & (confidence >= min_level) & np.isfinite(atr) & (atr > 0))
+    signal_idx = signal_idx[signal_idx + 1 < n]
+    entry_idx = signal_idx + 1
+    side = direction[signal_idx].astype(np.float64)
+    entry_price = open_[entry_idx] + side * half_spread
+    stop_distance = atr[signal_idx] * config.stop_loss_multiplier
+    stop_loss = entry_price - side * stop_distance
+    take_profit = entry_price + side * atr[signal_idx] * config.take_profit_multiplier
+
+    exit_idx, exit_price, exit_reason = resolve_exits(
+        entry_idx, side, stop_loss, take_profit, open_, high, low, close, half_spread)
+
+    # Sequential gating: max_positions, cooldown and compounding risk sizing
+    balance = config.initial_balance
+    open_trades = []  # (exit_idx, pnl) of trades not yet closed
+    last_direction = 0
+    last_trade_time = None
+    taken = []
+    for k in range(len(signal_idx)):
+        decision_bar = signal_idx[k]
+        still_open = []
+        for trade_exit, trade_pnl in open_trades:
+            if trade_exit <= decision_bar:
+                balance += trade_pnl
+            else:
+                still_open.append((trade_exit, trade_pnl))
+        open_trades = still_open
+
+        if len(open_trades) >= config.max_positions:
+            continue
+        decision_time = time_s[decision_bar] + config.bar_seconds
+        if last_direction == side[k] and last_trade_time is not None \
+                and decision_time - last_trade_time < config.same_direction_cooldown:
+            continue
+
+        risk_amount = balance * config.risk_percentage / 100
+        units = risk_amount / stop_distance[k]
+        pnl = units * side[k] * (exit_price[k] - entry_price[k])
+        open_trades.append((exit_idx[k], pnl))
+        taken.append((k, units, pnl, balance))
+        last_direction = side[k]
+        last_trade_time = time_s[entry_idx[k]]
+
+    if taken:
+        rows, units, pnl, balance_at_entry = (np.array(values) for values in zip(*taken))
+        rows = rows.astype(np.int64)
+    else:
+        rows, units, pnl, balance_at_entry = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0))
+
+    reasons = np.array(["END", "SL", "TP"])
+    trades = pd.DataFrame({
+        "signal_time": times.iloc[signal_idx[rows]].to_numpy(),
+        "entry_time": times.iloc[entry_idx[rows]].to_numpy(),
+        "exit_time": times.iloc[exit_idx[rows]].to_numpy(),
+        "direction": np.where(side[rows] > 0, "BUY", "SELL"),
+        "confidence": np.array(["LOW", "MEDIUM", "HIGH"])[confidence[signal_idx[rows]] - 1],
+        "ml_probability": np.round(np.asarray(prob_up)[signal_idx[rows]], 3),
+        "entry_price": entry_price[rows],
+        "stop_loss": stop_loss[rows],
+        "take_profit": take_profit[rows],
+        "exit_price": exit_price[rows],
+        "exit_reason": reasons[exit_reason[rows]],
+        "units": np.round(units, 0),
+        "pnl": pnl,
+        "r_multiple": pnl / (balance_at_entry * config.risk_percentage / 100) if len(rows) else pnl,
+        "bars_held": exit_idx[rows] - entry_idx[rows] + 1,
+    })
+
+    # Closed-trade equity, booked at each trade's exit bar
+    realized = np.zeros(n)
+    np.add.at(realized, exit_idx[rows], pnl)
+    equity = pd.Series(config.initial_balance + np.cumsum(realized), index=times, name="equity")
+
+    return BacktestResult(trades=trades, equity=equity, stats=summarize(trades, equity, config))
+
+
+def summarize(trades: pd.DataFrame, equity: pd.Series, config: BacktestConfig) -> Dict:
+    """Headline statistics for a trade list and equity curve."""
+    if trades.empty:
+        return {"trades": 0, "final_balance": round(float(config.initial_balance), 2)}
+
+    wins = trades["pnl"] > 0
+    gross_profit = trades.loc[wins, "pnl"].sum()
+    gross_loss = -trades.loc[~wins, "pnl"].sum()
+    drawdown = equity / equity.cummax() - 1
+
+    return {
+        "trades": int(len(trades)),
+        "win_rate": round(float(wins.mean()), 4),
+        "total_return_pct": round(float((equity.iloc[-1] / config.initial_balance - 1) * 100), 2),
+        "final_balance": round(float(equity.iloc[-1]), 2),
+        "profit_factor": round(float(gross_profit / gross_loss), 3) if gross_loss > 0 else None,
+        "avg_r": round(float(trades["r_multiple"].mean()), 3),
+        "max_drawdown_pct": round(float(drawdown.min() * 100), 2),
+        "avg_bars_held": round(float(trades["bars_held"].mean()), 1),
+        "exits": trades["exit_reason"].value_counts().to_dict(),
+        "from": str(equity.index[0]),
+        "to": str(equity.index[-1]),
+    }
+
+
+def run_backtest(candles: pd.DataFrame, models: List[xgb.Booster],
+                 config: Optional[BacktestConfig] = None) -> BacktestResult:
+    """Features → batched ensemble predict → vectorized strategy simulation."""
+    config = config or BacktestConfig()
+    started = time.perf_counter()
+    features = calculate_indicators(candles.reset_index(drop=True))
+    features_done = time.perf_counter()
+    prob_up = predict_probabilities(features, models)
+    predict_done = time.perf_counter()
+    result = simulate(features, prob_up, config)
+    finished = time.perf_counter()
+
+    result.stats["timings_s"] = {
+        "features": round(features_done - started, 3),
+        "predict": round(predict_done - features_done, 3),
+        "simulate": round(finished - predict_done, 3),
+        "total": round(finished - started, 3),
+    }
+    result.stats["bars"] = int(len(candles))
+    return result
+
+
+def load_history(instrument: str, csv_path: Optional[str] = None,
+                 start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+    """H1 history from the candle store (preferred) or a CSV."""
+    store = None if csv_path else open_store(instrument, "H1", DEFAULT_STORE_DIR)
+    if store is not None:
+        return store.range_frame(start, end)
+
+    path = Path(csv_path) if csv_path else next(H1_DATA_DIR.glob(f"{instrument}_H1_*.csv"))
+    df = pd.read_csv(path)
+    df["time"] = pd.to_datetime(df["time"], utc=True)
+    df = df.sort_values("time").reset_index(drop=True)
+    if start:
+        df = df[df["time"] >= pd.Timestamp(start, tz="UTC")]
+    if end:
+        df = df[df["time"] < pd.Timestamp(end, tz="UTC")]
+    return df.reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized ML ensemble strategy backtest")
+    parser.add_argument("--instrument", default="EUR_USD")
+    parser.add_argument("--csv", help="H1 candle CSV (default: candle store, then data/h1_data)")
+    parser.add_argument("--start", help="Inclusive start date")
+    parser.add_argument("--end", help="Exclusive end date")
+    parser.add_argument("--model-dir", help="Ensemble directory (default: signal_generator/<pair>-models)")
+    parser.add_argument("--bot-config", help="Bot config.json with the strategy settings")
+    parser.add_argument("--spread-pips", type=float, default=1.0)
+    parser.add_argument("--initial-balance", type=float, default=10_000.0)
+    parser.add_argument("--trades-out", help="Write the trade list to this CSV")
+    parser.add_argument("--equity-out", help="Write the equity curve to this CSV")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+
+    pair_dir = args.instrument.replace("_", "").lower()
+    model_dir = Path(args.model_dir) if args.model_dir else MODEL_ROOT / f"{pair_dir}-models"
+    models = ModelRegistry(model_dir, args.instrument).load()
+    if not models:
+        raise SystemExit(f"No models found in {model_dir}")
+
+    bot_config = {}
+    if args.bot_config:
+        with open(args.bot_config) as f:
+            bot_config = json.load(f)
+    config = BacktestConfig.from_bot_config(
+        bot_config,
+        spread_pips=args.spread_pips,
+        initial_balance=args.initial_balance,
+        pip_size=0.01 if args.instrument.endswith("_JPY") else 0.0001,
+    )
+
+    candles = load_history(args.instrument, args.csv, args.start, args.end)
+    result = run_backtest(candles, models, config)
+
+    print(f"📊 {args.instrument} ML ensemble backtest ({len(models)} models)")
+    print("=" * 70)
+    print(json.dumps({"config": asdict(config), **result.stats}, indent=2, default=str))
+    if args.trades_out:
+        result.trades.to_csv(args.trades_out, index=False)
+    if args.equity_out:
+        result.equity.to_csv(args.equity_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Test the London breakout replay harness on synthetic M1 sessions.
+
+Usage:
+    python3 app/backtest/test_london_replay.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.backtest.london_replay import (
+    DEFAULT_CONFIG, SpreadModel, StubNewsAvoidance, load_candles, replay,
+)
+from app.utils.candle_store import CandleStore, to_time_ns
+from app.utils.news_calendar import BlackoutTimeline, NewsCalendar
+from gbpusd_london_breakout import CandleWindow, LondonBreakoutStrategy, load_strategy_config
+
+
+def _breakout_day(day: str = "2025-11-24") -> pd.DataFrame:
+    """One New York session: 25-pip Asian range, then a clean upside breakout at 02:30 local."""
+    times = pd.date_range(f"{day} 05:00", periods=12 * 60, freq="min", tz="UTC")  # 00:00-12:00 NY
+    minutes = np.arange(len(times))
+    close = 1.2700 + 0.00125 * (1 + np.sin(minutes / 7.0))                         # 1.2700-1.2725
+    breakout = minutes >= 150
+    close[breakout] = 1.2728 + 0.00005 * (minutes[breakout] - 150)                 # +0.5 pip/min
+    return pd.DataFrame({
+        "time": times,
+        "open": close,
+        "high": close + 0.00002,
+        "low": close - 0.00002,
+        "close": close,
+        "volume": 100,
+    })
+
+
+def _random_walk(days: int = 10, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2025-11-03", periods=days * 1440, freq="min", tz="UTC")
+    times = times[times.weekday < 5]
+    close = 1.27 + np.cumsum(rng.normal(0, 0.00012, len(times)))
+    return pd.DataFrame({
+        "time": times,
+        "open": close - rng.normal(0, 0.00003, len(times)),
+        "high": close + rng.exponential(0.00008, len(times)),
+        "low": close - rng.exponential(0.00008, len(times)),
+        "close": close,
+        "volume": rng.integers(10, 200, len(times)),
+    })
+
+
+def _arrays(df: pd.DataFrame):
+    return {
+        "time": to_time_ns(df["time"]),
+        **{col: df[col].to_numpy(dtype=np.float64) for col in ["open", "high", "low", "close"]},
+        "volume": df["volume"].to_numpy(dtype=np.int64),
+    }
+
+
+def test_breakout_trade_is_recorded():
+    """A clean breakout enters long and is filled at TP; PnL is net of spread."""
+    print("\n🚀 Test 1: Breakout day")
+    cfg = load_strategy_config(DEFAULT_CONFIG)
+    arrays = _arrays(_breakout_day())
+    spread = np.full(len(arrays["time"]), 1.0)
+
+    result = replay(cfg, arrays, spread)
+    trades = result.trades
+    assert len(trades) == 1, trades
+    trade = trades.iloc[0]
+    assert trade["direction"] == "long" and trade["exit_reason"] == "TP_HIT"
+    assert trade["pips_gross"] > 0 and np.isclose(trade["pips_net"], trade["pips_gross"] - 1.0)
+    assert result.stats["candles"] == len(arrays["time"]) and result.stats["candles_per_sec"] > 0
+    print(f"   ✅ {trade['direction']} {trade['pips_gross']:.1f} pips ({trade['exit_reason']}), "
+          f"{result.stats['candles_per_sec']:,} candles/sec")
+
+
+def test_news_blackout_and_spread_block_entries():
+    """The stubbed news service and the spread series both gate entries."""
+    print("\n📰 Test 2: News blackout and wide spread")
+    cfg = load_strategy_config(DEFAULT_CONFIG)
+    day = _breakout_day()
+    arrays = _arrays(day)
+
+    blackout = [(day["time"].iloc[0].to_pydatetime(), day["time"].iloc[-1].to_pydatetime())]
+    news = StubNewsAvoidance(blackout)
+    result = replay(cfg, arrays, np.full(len(day), 1.0), news=news)
+    assert result.trades.empty and news.checks > 0
+
+    # Same day blacked out by a compiled news timeline (GBP event, ±12 h windows)
+    midday = day["time"].iloc[len(day) // 2].to_pydatetime()
+    calendar = NewsCalendar([{"title": "BoE", "currency": "GBP", "impact": "high", "event_time": midday}])
+    timeline_news = StubNewsAvoidance.from_timeline(BlackoutTimeline(calendar, 720, 720, 3), "GBP_USD")
+    assert timeline_news.mask(arrays["time"]).all()
+    assert replay(cfg, arrays, np.full(len(day), 1.0), news=timeline_news).trades.empty
+    assert not StubNewsAvoidance.from_timeline(BlackoutTimeline(calendar, 720, 720, 3), "EUR_USD") \
+        .mask(arrays["time"]).any()
+
+    wide = SpreadModel(base_pips=cfg.max_spread_pips + 1, hourly_profile=(1.0,) * 24).series(arrays["time"])
+    assert replay(cfg, arrays, wide).trades.empty
+    print(f"   ✅ No entries under blackout ({news.checks} news checks) or wide spread")
+
+
+def test_matches_direct_on_candle_loop():
+    """Chunked store replay emits the same actions as feeding on_candle directly."""
+    print("\n🔁 Test 3: Store replay vs direct loop")
+    cfg = load_strategy_config(DEFAULT_CONFIG)
+    cfg.news_avoidance_enabled = False
+    candles = pd.concat([_random_walk(), _breakout_day("2025-11-17")]).sort_values("time")
+    candles = candles.drop_duplicates("time").reset_index(drop=True)
+    spread = SpreadModel(noise_pips=0.3, seed=2).series(_arrays(candles)["time"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        CandleStore("GBP_USD", "M1", tmp).append_frame(candles)
+        arrays = load_candles("GBP_USD", root_dir=tmp)
+        result = replay(cfg, arrays, spread, chunk_size=997)
+
+    strategy = LondonBreakoutStrategy(cfg, logger=_Silent())
+    expected = []
+    for i, row in enumerate(candles.itertuples(index=False)):
+        candle = {"time": row.time.to_pydatetime(), "open": row.open, "high": row.high,
+                  "low": row.low, "close": row.close, "volume": row.volume}
+        action = strategy.on_candle(candle, spread[i])
+        if action:
+            expected.append(action["action"])
+
+    assert sum(result.stats["actions"].values()) == len(expected)
+    assert result.stats["actions"]["ENTER"] == expected.count("ENTER") > 0
+    assert result.stats["sl_updates"] == expected.count("UPDATE_SL")
+    assert len(result.trades) == result.stats["trades"]
+    print(f"   ✅ {len(expected)} identical actions, {len(result.trades)} trades")
+
+
+def test_candle_window_atr():
+    """Ring-buffer ATR equals the textbook true-range mean across wraparounds."""
+    print("\n📏 Test 4: CandleWindow ATR")
+    df = _random_walk(days=1)
+    high, low, close = (df[col].to_numpy() for col in ["high", "low", "close"])
+    window = CandleWindow(capacity=10)
+    for i in range(300):
+        window.push(high[i], low[i], close[i])
+        if i < 5:
+            assert window.atr(5) is None
+            continue
+        tr = np.maximum(high[i - 4:i + 1] - low[i - 4:i + 1],
+                        np.maximum(np.abs(high[i - 4:i + 1] - close[i - 5:i]),
+                                   np.abs(low[i - 4:i + 1] - close[i - 5:i])))
+        assert np.isclose(window.atr(5), tr.mean(), rtol=0, atol=1e-15)
+    assert np.array_equal(window.last("close", 3), close[297:300])
+    print("   ✅ ATR matches over 300 pushes into a 10-slot ring")
+
+
+def test_session_index_matches_live_path():
+    """Vectorized session flags equal the per-candle timezone path across a DST switch."""
+    print("\n🕰️  Test 5: Precomputed session index")
+    cfg = load_strategy_config(DEFAULT_CONFIG)
+    cfg.news_avoidance_enabled = False
+    rng = np.random.default_rng(9)
+    times = pd.date_range("2025-03-05", "2025-03-14", freq="min", tz="UTC")  # US DST starts 03-09
+    close = 1.27 + np.cumsum(rng.normal(0, 0.00012, len(times)))
+    candles = [{"time": t.to_pydatetime(), "open": c, "high": c + 0.0001, "low": c - 0.0001,
+                "close": c, "volume": 1} for t, c in zip(times, close)]
+
+    live = LondonBreakoutStrategy(cfg, logger=_Silent())
+    fast = LondonBreakoutStrategy(cfg, logger=_Silent())
+    days, flags = fast.session_index(to_time_ns(times))
+    for i, candle in enumerate(candles):
+        session = (int(days[i]), int(flags[i]))
+        assert live.session_for(candle["time"]) == session, candle["time"]
+        assert live.on_candle(candle, 1.0) == fast.on_candle(candle, 1.0, session)
+    print(f"   ✅ {len(candles):,} candles: identical flags and actions")
+
+
+def test_repeated_candles_are_folded():
+    """Forming revisions and repeats of a bar give the same actions and ATR as one feed."""
+    print("\n♻️  Test 6: Duplicate and forming candles")
+    cfg = load_strategy_config(DEFAULT_CONFIG)
+    cfg.news_avoidance_enabled = False
+    candles = _breakout_day().to_dict("records")
+    once = LondonBreakoutStrategy(cfg, logger=_Silent())
+    noisy = LondonBreakoutStrategy(cfg, logger=_Silent())
+
+    for candle in candles:
+        candle["time"] = candle["time"].to_pydatetime()
+        forming = {**candle, "high": candle["open"], "low": candle["open"], "close": candle["open"],
+                   "complete": False}
+        expected = once.on_candle(candle, 1.0)
+        assert noisy.on_candle(forming, 1.0) is None
+        assert noisy.on_candle(forming, 1.0) is None
+        assert noisy.on_candle({**candle, "complete": True}, 1.0) == expected
+        assert noisy.on_candle(candle, 1.0) is None          # polled again after close
+        assert noisy._compute_atr() == once._compute_atr()
+
+    assert noisy._debug_counter == once._debug_counter and noisy.duplicate_candles == len(candles)
+    print(f"   ✅ {len(candles)} bars fed 4x each: identical actions, ATR and counters")
+
+
+class _Silent:
+    def info(self, msg):
+        pass
+
+
+if __name__ == "__main__":
+    print("🧪 Testing London Breakout Replay Harness")
+    print("=" * 70)
+    test_breakout_trade_is_recorded()
+    test_news_blackout_and_spread_block_entries()
+    test_matches_direct_on_candle_loop()
+    test_candle_window_atr()
+    test_session_index_matches_live_path()
+    test_repeated_candles_are_folded()
+    print("\n🎉 All replay tests passed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the London breakout parameter sweep (shared memory process pool).
+
+Usage:
+    python3 app/backtest/test_london_sweep.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.backtest.london_replay import DEFAULT_CONFIG, SpreadModel, load_strategy_config, replay
+from app.backtest.london_sweep import Param, apply_params, is_valid, run_sweep
+from app.backtest.test_london_replay import _arrays, _breakout_day, _random_walk
+
+
+def _history():
+    candles = pd.concat([_random_walk(days=8), _breakout_day("2025-11-17")]).sort_values("time")
+    arrays = _arrays(candles.drop_duplicates("time").reset_index(drop=True))
+    spread = SpreadModel(noise_pips=0.2, seed=4).series(arrays["time"])
+    base = load_strategy_config(DEFAULT_CONFIG)
+    base.news_avoidance_enabled = False
+    return arrays, spread, base
+
+
+def test_grid_matches_serial_replay():
+    """Workers reading shared memory rank the same numbers as in-process replays."""
+    print("\n🧮 Test 1: Grid sweep vs serial replay")
+    arrays, spread, base = _history()
+    space = [Param("initial_stop_pips", 10, 20, 5), Param("tp_scale", choices=[0.8, 1.2])]
+
+    results = run_sweep(arrays, spread, base, space, mode="grid", evals=10, workers=2, min_trades=0)
+    assert len(results) == 6 and list(results["rank"]) == list(range(1, 7))
+    assert results["pips_net"].is_monotonic_decreasing
+
+    for row in results.itertuples(index=False):
+        params = {"initial_stop_pips": row.initial_stop_pips, "tp_scale": row.tp_scale}
+        stats = replay(apply_params(base, params), arrays, spread).stats
+        assert stats["trades"] == row.trades and np.isclose(stats["pips_net"], row.pips_net)
+    print(f"   ✅ 6 variants identical to serial replays (best {results['pips_net'].iloc[0]:.1f} pips)")
+
+
+def test_random_and_bayes_respect_budget():
+    """Random and Bayesian modes evaluate distinct, valid variants within the budget."""
+    print("\n🎲 Test 2: Random and Bayesian search")
+    arrays, spread, base = _history()
+    space = [Param("initial_stop_pips", 10, 25, 2.5), Param("breakout_buffer_pips", 0, 4, 1),
+             Param("trail_step_1_pips", 6, 20, 2), Param("tp_scale", 0.6, 1.6, 0.2)]
+    names = [p.name for p in space]
+
+    for mode in ("random", "bayes"):
+        results = run_sweep(arrays, spread, base, space, mode=mode, evals=14, workers=2,
+                            objective="pips_net", min_trades=0, seed=1)
+        assert len(results) == 14
+        assert not results.duplicated(subset=names).any()
+        assert all(is_valid(apply_params(base, row[names].to_dict())) for _, row in results.iterrows())
+        print(f"   ✅ {mode}: 14 distinct variants, best {results['pips_net'].iloc[0]:.1f} pips")
+
+    assert not is_valid(apply_params(base, {"trail_step_1_pips": 40}))  # step 1 beyond step 2
+
+
+if __name__ == "__main__":
+    print("🧪 Testing London Breakout Parameter Sweep")
+    print("=" * 70)
+    test_grid_matches_serial_replay()
+    test_random_and_bayes_respect_budget()
+    print("\n🎉 All sweep tests passed!")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized ML ensemble backtester against a bar-by-bar replay
+of the same strategy rules.
+
+Usage:
+    python3 app/backtest/test_ml_ensemble.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.backtest.ml_ensemble import BacktestConfig, classify_signals, run_backtest, simulate
+from app.utils.incremental_indicators import FEATURE_COLS, calculate_indicators
+
+
+def _synthetic_candles(n: int = 6000, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0012, n))
+    open_ = np.concatenate(([close[0]], close[:-1])) + rng.normal(0, 0.0002, n)  # small gaps
+    high = np.maximum(open_, close) + rng.exponential(0.0008, n)
+    low = np.minimum(open_, close) - rng.exponential(0.0008, n)
+    return pd.DataFrame({
+        "time": pd.date_range("2015-01-05", periods=n, freq="h", tz="UTC"),
+        "open": open_, "high": high, "low": low, "close": close,
+        "volume": rng.integers(100, 1000, n),
+    })
+
+
+def _reference(candles: pd.DataFrame, prob_up: np.ndarray, config: BacktestConfig) -> pd.DataFrame:
+    """Straightforward bar-by-bar replay of the bot's rules."""
+    direction, confidence = classify_signals(prob_up)
+    min_level = {"LOW": 1, "MEDIUM": 2, "HIGH": 3}[config.min_confidence]
+    half = config.spread_pips * config.pip_size / 2
+    o, h, l, c = (candles[col].to_numpy() for col in ["open", "high", "low", "close"])
+    atr = candles["atr"].to_numpy()
+    times = candles["time"]
+    n = len(c)
+
+    balance = config.initial_balance
+    open_trades, closed = [], []
+    last_dir, last_time = 0, None
+    for i in range(n):
+        for trade in list(open_trades):
+            if i < trade["entry_idx"]:
+                continue
+            side = trade["side"]
+            lo, hi, op = l[i] - side * half, h[i] - side * half, o[i] - side * half
+            sl_hit = lo <= trade["sl"] if side > 0 else hi >= trade["sl"]
+            tp_hit = hi >= trade["tp"] if side > 0 else lo <= trade["tp"]
+            if not (sl_hit or tp_hit):
+                continue
+            level = trade["sl"] if sl_hit else trade["tp"]
+            through = (op <= level if side > 0 else op >= level) if sl_hit else \
+                      (op >= level if side > 0 else op <= level)
+            trade["exit_price"] = op if (i > trade["entry_idx"] and through) else level
+            trade["exit_idx"] = i
+            trade["pnl"] = trade["units"] * side * (trade["exit_price"] - trade["entry"])
+            balance += trade["pnl"]
+            open_trades.remove(trade)
+            closed.append(trade)
+
+        if i + 1 >= n or direction[i] == 0 or confidence[i] < min_level or not atr[i] > 0:
+            continue
+        if len(open_trades) >= config.max_positions:
+            continue
+        decision_time = times.iloc[i].timestamp() + config.bar_seconds
+        if last_dir == direction[i] and last_time is not None \
+                and decision_time - last_time < config.same_direction_cooldown:
+            continue
+        side = float(direction[i])
+        entry = o[i + 1] + side * half
+        stop_distance = atr[i] * config.stop_loss_multiplier
+        open_trades.append({
+            "entry_idx": i + 1, "side": side, "entry": entry,
+            "sl": entry - side * stop_distance,
+            "tp": entry + side * atr[i] * config.take_profit_multiplier,
+            "units": balance * config.risk_percentage / 100 / stop_distance,
+        })
+        last_dir, last_time = direction[i], times.iloc[i + 1].timestamp()
+
+    for trade in open_trades:  # end of data
+        trade["exit_idx"] = n - 1
+        trade["exit_price"] = c[-1] - trade["side"] * half
+        trade["pnl"] = trade["units"] * trade["side"] * (trade["exit_price"] - trade["entry"])
+        closed.append(trade)
+
+    closed.sort(key=lambda t: t["entry_idx"])
+    return pd.DataFrame(closed)
+
+
+def _assert_same_trades(expected: pd.DataFrame, actual: pd.DataFrame, candles: pd.DataFrame):
+    assert len(expected) == len(actual), f"{len(expected)} reference trades vs {len(actual)}"
+    times = candles["time"]
+    assert (times.iloc[expected["entry_idx"]].to_numpy() == actual["entry_time"].to_numpy()).all()
+    assert (times.iloc[expected["exit_idx"]].to_numpy() == actual["exit_time"].to_numpy()).all()
+    assert np.allclose(expected["exit_price"], actual["exit_price"], rtol=0, atol=1e-12)
+    assert np.allclose(expected["pnl"], actual["pnl"], rtol=1e-9)
+
+
+def test_matches_bar_by_bar_replay():
+    """Trades and PnL equal a naive replay, for one and several open positions."""
+    print("\n🔁 Test 1: Vectorized vs bar-by-bar")
+    candles = calculate_indicators(_synthetic_candles())
+    prob_up = np.random.default_rng(3).uniform(0.15, 0.85, len(candles))
+
+    for config in [
+        BacktestConfig(),
+        BacktestConfig(max_positions=3, min_confidence="HIGH", same_direction_cooldown=3 * 3600),
+        BacktestConfig(stop_loss_multiplier=0.5, take_profit_multiplier=0.8, spread_pips=2.0),
+    ]:
+        result = simulate(candles, prob_up, config)
+        _assert_same_trades(_reference(candles, prob_up, config), result.trades, candles)
+        assert np.isclose(result.equity.iloc[-1], config.initial_balance + result.trades["pnl"].sum())
+        print(f"   ✅ max_positions={config.max_positions}, min_confidence={config.min_confidence}: "
+              f"{len(result.trades)} identical trades")
+
+
+def test_end_to_end_with_models():
+    """Full pipeline: features, batched ensemble predict, simulation."""
+    print("\n🤖 Test 2: End-to-end with a small ensemble")
+    candles = _synthetic_candles(n=3000)
+    features = calculate_indicators(candles)
+    train = features.dropna()
+    label = (train["close"].shift(-1) > train["close"]).astype(int)
+    dtrain = xgb.DMatrix(train[FEATURE_COLS], label=label, feature_names=FEATURE_COLS)
+    models = [xgb.train({"objective": "binary:logistic", "max_depth": 3, "seed": seed}, dtrain, 20)
+              for seed in (43, 44)]
+
+    result = run_backtest(candles, models, BacktestConfig(min_confidence="LOW"))
+    assert result.stats["bars"] == 3000
+    assert result.stats["trades"] == len(result.trades) > 0
+    assert set(result.trades["exit_reason"]) <= {"SL", "TP", "END"}
+    print(f"   ✅ {result.stats['trades']} trades in {result.stats['timings_s']['total']:.3f}s")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Vectorized ML Ensemble Backtester")
+    print("=" * 70)
+    test_matches_bar_by_bar_replay()
+    test_end_to_end_with_models()
+    print("\n🎉 All backtest tests passed!")
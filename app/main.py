@@ -55,8 +55,16 @@ async def health():
 
 @app.on_event("startup")
 async def startup_event():
-    """Log application startup"""
+    """Log application startup and load the news calendar"""
     logger.info("🚀 Starting TraderMain Clean API on port 8888")
+    from app.utils.async_news_avoidance import async_news_avoidance
+    await async_news_avoidance.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks"""
+    from app.utils.async_news_avoidance import async_news_avoidance
+    await async_news_avoidance.stop()
 
 if __name__ == "__main__":
     import uvicorn
@@ -5,7 +5,7 @@ Stores all ML signals generated by signal services (EUR/USD, USD/JPY, etc.)
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, String, Numeric, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -15,7 +15,7 @@ class MLSignalHistory(Base):
     __tablename__ = "ml_signal_history"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    instrument = Column(String(30), nullable=False, index=True)  # e.g., 'EUR_USD', 'USD_JPY', 'XAU_USD', 'BTC_USD'
+    instrument = Column(String(30), nullable=False)  # e.g., 'EUR_USD', 'USD_JPY', 'XAU_USD', 'BTC_USD'
     direction = Column(String(10), nullable=False)   # 'BUY', 'SELL', 'NEUTRAL'
     confidence = Column(String(10), nullable=False)  # 'HIGH', 'MEDIUM', 'LOW'
     confidence_score = Column(Numeric(5, 3), nullable=True)
@@ -34,3 +34,6 @@ class MLSignalHistory(Base):
     def __repr__(self):
         return f"<MLSignalHistory(id={self.id}, instrument={self.instrument}, direction={self.direction}, confidence={self.confidence})>"
 
+
+# Latest signal per instrument (dashboards, bots); also serves plain instrument lookups
+Index("ix_ml_signal_history_instrument_timestamp", MLSignalHistory.instrument, MLSignalHistory.timestamp.desc())
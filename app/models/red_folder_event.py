@@ -1,10 +1,14 @@
 # models/red_folder_event.py
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, String, DateTime, Integer, Index
 from app.db.base_class import Base
 
 class RedFolderEvent(Base):
     __tablename__ = "red_folder_events"
+    __table_args__ = (
+        # Window queries: "any USD event between t0 and t1?"
+        Index("ix_red_folder_events_currency_event_time", "currency", "event_time"),
+    )
 
     id = Column(Integer, primary_key=True)  # Matches existing table
     event_time = Column(DateTime, nullable=False)  # When the news event occurs
@@ -13,4 +17,5 @@ class RedFolderEvent(Base):
     impact = Column(String, default="high")  # "high", "medium", "low"
     created_by = Column(Integer, nullable=True)  # Admin user who created it
     created_at = Column(DateTime, default=datetime.utcnow)  # When added to system
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Change marker for pollers
 
@@ -2,71 +2,44 @@ import os
 import logging
 import json
 from datetime import datetime
-import requests
 from typing import Optional, Dict, List
 
+from app.utils.account_state import DEFAULT_TTL_SECONDS
+from app.utils.account_sync import AccountSync, default_state_path
+from app.utils.oanda_client import OandaAPIError, shared_client
+
 logger = logging.getLogger(__name__)
 
 class OANDAService:
     """Service to handle all OANDA API interactions for USD/JPY ML Ensemble Bot"""
     
-    def __init__(self, account_id: str, api_key: str, mode: str = 'practice'):
+    def __init__(self, account_id: str, api_key: str, mode: str = 'practice',
+                 state_ttl: float = DEFAULT_TTL_SECONDS):
         self.account_id = account_id
         self.api_key = api_key
         self.mode = mode
-        self.base_url = "https://api-fxpractice.oanda.com/v3" if mode == 'practice' else "https://api-fxtrade.oanda.com/v3"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "Accept-Datetime-Format": "RFC3339"
-        }
+        # Pooled keep-alive client shared by every bot in the process (rate limits, retries, latency stats)
+        self.client = shared_client(api_key, 'practice' if mode == 'practice' else 'live')
+        # Summary + open trades come from a local account mirror advanced by transaction deltas
+        self.state = AccountSync(self.client, account_id, state_path=default_state_path(account_id),
+                                 ttl=state_ttl)
         logger.info(f"OANDA service initialized - Mode: {mode}, Account: {account_id}")
 
-    def _make_request(self, method: str, endpoint: str, params: dict = None, data: dict = None, max_retries: int = 3) -> Optional[dict]:
-        """Make request to OANDA API with retry logic"""
-        url = f"{self.base_url}/{endpoint}"
-        
-        for attempt in range(max_retries):
-            try:
-                if method == "GET":
-                    response = requests.get(url, headers=self.headers, params=params, timeout=30)
-                elif method == "POST":
-                    response = requests.post(url, headers=self.headers, json=data, timeout=30)
-                elif method == "PUT":
-                    response = requests.put(url, headers=self.headers, json=data, timeout=30)
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except requests.exceptions.HTTPError as e:
-                error_msg = str(e)
-                try:
-                    if e.response is not None:
-                        error_data = e.response.json()
-                        error_msg = error_data.get('errorMessage', error_data.get('errorMessage', str(e)))
-                except:
-                    pass
-                
-                status_code = e.response.status_code if e.response else "unknown"
-                if attempt == max_retries - 1:
-                    logger.error(f"OANDA API request failed after {max_retries} attempts: {status_code} - {error_msg}")
-                    return None
-                logger.warning(f"Request failed (attempt {attempt + 1}/{max_retries}): {status_code} - {error_msg}, retrying...")
-            except requests.exceptions.RequestException as e:
-                if attempt == max_retries - 1:
-                    logger.error(f"OANDA API request failed after {max_retries} attempts: {e}")
-                    return None
-                logger.warning(f"Request failed (attempt {attempt + 1}/{max_retries}), retrying...")
-        
-        return None
+    def _make_request(self, method: str, endpoint: str, params: dict = None, data: dict = None) -> Optional[dict]:
+        """Make request to OANDA API (retries/backoff handled by the shared client)"""
+        try:
+            return self.client.request(method, endpoint, params=params, json=data)
+        except OandaAPIError as e:
+            logger.error(f"OANDA API request failed: {e}")
+            return None
 
     def get_account_summary(self) -> Optional[dict]:
-        """Get account summary including balance"""
-        endpoint = f"accounts/{self.account_id}/summary"
-        response = self._make_request("GET", endpoint)
-        if response:
-            return response.get("account")
-        return None
+        """Get account summary including balance (local account mirror)"""
+        try:
+            return self.state.account()
+        except OandaAPIError as e:
+            logger.error(f"OANDA API request failed: {e}")
+            return None
 
     def get_current_price(self, instrument: str) -> Optional[dict]:
         """Get current price for an instrument"""
@@ -113,6 +86,8 @@ class OANDAService:
         logger.info(f"📋 Order data: {json.dumps(order_data, indent=2)}")
         
         response = self._make_request("POST", endpoint, data=order_data)
+        # Even a failed POST may have filled; poll account changes on the next read
+        self.state.invalidate()
         logger.info(f"📡 OANDA response: {response}")
         
         if response:
@@ -120,21 +95,18 @@ class OANDAService:
         return None
 
     def get_open_trades(self, instrument: str = "USD_JPY") -> Optional[List[dict]]:
-        """Get all open trades for an instrument"""
-        endpoint = f"accounts/{self.account_id}/openTrades"
-        response = self._make_request("GET", endpoint)
-        if response:
-            trades = response.get("trades", [])
-            # Filter by instrument if specified
-            if instrument:
-                trades = [t for t in trades if t.get("instrument") == instrument]
-            return trades
-        return None
+        """Get all open trades for an instrument (local account mirror)"""
+        try:
+            return self.state.open_trades(instrument)
+        except OandaAPIError as e:
+            logger.error(f"OANDA API request failed: {e}")
+            return None
 
     def close_trade(self, trade_id: str) -> Optional[dict]:
         """Close a specific trade"""
         endpoint = f"accounts/{self.account_id}/trades/{trade_id}/close"
         response = self._make_request("PUT", endpoint, data={})
+        self.state.invalidate()
         if response:
             logger.info(f"✅ Trade {trade_id} closed")
             return response.get("orderFillTransaction")
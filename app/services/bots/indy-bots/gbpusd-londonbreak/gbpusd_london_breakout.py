@@ -1,7 +1,7 @@
 import json
 from dataclasses import dataclass, field
 from datetime import datetime, time
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -14,6 +14,31 @@ except ImportError:
 
 PIP = 0.0001  # for GBPUSD
 
+NEW_YORK = "America/New_York"
+LONDON_CLOSE_EST = time(12, 0)
+
+# Per-candle session flags (see LondonBreakoutStrategy.session_index)
+IN_ASIAN = 1            # inside asian_start..asian_end (local)
+LOCK_WINDOW = 2         # Asian window over and local time <= london_window_end
+IN_LONDON = 4           # inside london_probe_start..london_window_end
+IN_TRADE_WINDOW = 8     # inside london_window_start..london_window_end
+AFTER_WINDOW_START = 16 # local time >= london_window_start
+FLATTEN = 32            # New York time >= 12:00 (London close killer)
+
+_LONDON_CLOSE_SECONDS = LONDON_CLOSE_EST.hour * 3600
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+
+def _seconds(t: time) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def _between(sod, start: int, end: int):
+    """Window membership on seconds-of-day (overnight windows wrap); ints or NumPy arrays."""
+    if start <= end:
+        return (sod >= start) & (sod <= end)
+    return (sod >= start) | (sod <= end)
+
 
 @dataclass
 class StrategyConfig:
@@ -73,6 +98,71 @@ class SessionState:
     last_failed_time: Optional[datetime] = None
 
 
+class CandleWindow:
+    """
+    Fixed-size window of recent candles in preallocated ring buffers.
+
+    push() is O(1) and allocation-free (three slot writes); ATR and other
+    rolling stats are computed from the ring on demand, which the strategy
+    only needs when it opens a probe. The rings are plain lists because
+    scalar writes into a list are several times cheaper than into an ndarray;
+    last() hands out NumPy arrays for vectorized stats.
+    """
+
+    __slots__ = ("capacity", "high", "low", "close", "_pos", "count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.high = [0.0] * capacity
+        self.low = [0.0] * capacity
+        self.close = [0.0] * capacity
+        self._pos = 0    # next write slot
+        self.count = 0   # candles pushed (total)
+
+    def __len__(self) -> int:
+        return self.count if self.count < self.capacity else self.capacity
+
+    def push(self, high: float, low: float, close: float):
+        pos = self._pos
+        self.high[pos] = high
+        self.low[pos] = low
+        self.close[pos] = close
+        pos += 1
+        self._pos = pos if pos < self.capacity else 0
+        self.count += 1
+
+    def atr(self, period: int) -> Optional[float]:
+        """Mean true range of the last `period` candles (None until period+1 candles)."""
+        if len(self) < period + 1:
+            return None
+        high, low, close, cap = self.high, self.low, self.close, self.capacity
+        idx = self._pos - period  # oldest candle in the ATR window (may wrap negative)
+        prev_close = close[idx - 1]
+        total = 0.0
+        for _ in range(period):
+            h, l = high[idx], low[idx]
+            total += max(h - l, abs(h - prev_close), abs(l - prev_close))
+            prev_close = close[idx]
+            idx = idx + 1 if idx + 1 < cap else 0
+        return total / period
+
+    def update_last(self, high: float, low: float, close: float):
+        """Overwrite the newest candle (a revision of a still-forming bar)."""
+        pos = self._pos - 1
+        self.high[pos] = high
+        self.low[pos] = low
+        self.close[pos] = close
+
+    def last(self, name: str, n: int) -> np.ndarray:
+        """Oldest-to-newest values of high/low/close for the last n candles."""
+        n = min(n, len(self))
+        buf = getattr(self, name)
+        start = self._pos - n
+        if start >= 0:
+            return np.array(buf[start:self._pos])
+        return np.array(buf[start:] + buf[:self._pos])
+
+
 class LondonBreakoutStrategy:
     """
     Core logic only:
@@ -84,14 +174,25 @@ class LondonBreakoutStrategy:
     def __init__(self, config: StrategyConfig, logger=None, news_avoidance=None):
         self.cfg = config
         self.tz = ZoneInfo(self.cfg.timezone)
+        self.tz_est = ZoneInfo(NEW_YORK)
+        self._window_seconds = tuple(_seconds(t) for t in (
+            config.asian_start, config.asian_end, config.london_probe_start,
+            config.london_window_start, config.london_window_end,
+        ))
         self.logger = logger
         self.news_avoidance = news_avoidance  # your simple_news_avoidance service
 
         self.session = SessionState()
         self.position = PositionState()
+        self._session_day: Optional[int] = None
 
-        # keep last N candles for ATR
-        self.candle_history: List[Dict[str, Any]] = []
+        # candle identity: repeated/forming bars are folded into one
+        self._last_candle_time: Optional[datetime] = None
+        self._last_candle_complete = True
+        self.duplicate_candles = 0
+
+        # recent candles for ATR (ring buffer, O(1) per candle)
+        self.candles = CandleWindow(self.cfg.atr_period + 5)
 
     # ------------- Helpers ------------- #
 
@@ -106,33 +207,51 @@ class LondonBreakoutStrategy:
             dt_utc = dt_utc.replace(tzinfo=ZoneInfo("UTC"))
         return dt_utc.astimezone(self.tz)
 
-    def _is_between(self, t: time, start: time, end: time) -> bool:
-        # handles overnight windows (e.g. 19:00 -> 02:55)
-        if start <= end:
-            return start <= t <= end
-        else:
-            return t >= start or t <= end
+    def _session_flags(self, local_sod, est_sod):
+        """Session flags for seconds-of-day (scalar or array), per the constants above."""
+        asian_start, asian_end, probe_start, window_start, window_end = self._window_seconds
 
-    def _compute_atr(self) -> Optional[float]:
-        if len(self.candle_history) < self.cfg.atr_period + 1:
-            return None
+        if asian_start <= asian_end:
+            after_asian = local_sod > asian_end
+        else:  # Asian window crosses midnight (e.g., 19:00 -> 02:00)
+            after_asian = (local_sod > asian_end) & (local_sod < asian_start)
 
-        df = pd.DataFrame(self.candle_history[-(self.cfg.atr_period + 1):])
-        high = df["high"].values
-        low = df["low"].values
-        close = df["close"].values
-
-        tr_list = []
-        for i in range(1, len(df)):
-            tr = max(
-                high[i] - low[i],
-                abs(high[i] - close[i - 1]),
-                abs(low[i] - close[i - 1])
-            )
-            tr_list.append(tr)
+        return (IN_ASIAN * _between(local_sod, asian_start, asian_end)
+                | LOCK_WINDOW * (after_asian & (local_sod <= window_end))
+                | IN_LONDON * _between(local_sod, probe_start, window_end)
+                | IN_TRADE_WINDOW * _between(local_sod, window_start, window_end)
+                | AFTER_WINDOW_START * (local_sod >= window_start)
+                | FLATTEN * (est_sod >= _LONDON_CLOSE_SECONDS))
 
-        atr = np.mean(tr_list)
-        return atr
+    def session_for(self, t_utc: datetime) -> Tuple[int, int]:
+        """(local day number, session flags) for one UTC timestamp."""
+        if t_utc.tzinfo is None:
+            t_utc = t_utc.replace(tzinfo=ZoneInfo("UTC"))
+        t_local = t_utc.astimezone(self.tz)
+        est = t_utc.astimezone(self.tz_est).time()
+        flags = self._session_flags(_seconds(t_local.time()), _seconds(est))
+        return t_local.toordinal() - _EPOCH_ORDINAL, int(flags)
+
+    def session_index(self, time_ns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized session_for over a candle time array (int64 ns UTC), so a
+        replay does the timezone work once instead of per candle.
+
+        Returns:
+            (local day numbers, session flags) arrays to pass to on_candle
+        """
+        utc = pd.DatetimeIndex(np.asarray(time_ns, dtype=np.int64), tz="UTC")
+        day_ns = 86_400 * 1_000_000_000
+
+        local_ns = utc.tz_convert(self.tz).tz_localize(None).asi8
+        est_ns = utc.tz_convert(self.tz_est).tz_localize(None).asi8
+        local_sod = (local_ns % day_ns) // 1_000_000_000
+        est_sod = (est_ns % day_ns) // 1_000_000_000
+        flags = self._session_flags(local_sod, est_sod).astype(np.int64)
+        return local_ns // day_ns, flags
+
+    def _compute_atr(self) -> Optional[float]:
+        return self.candles.atr(self.cfg.atr_period)
 
     def _choose_tp_pips(self, atr_pips: float) -> float:
         for band in self.cfg.atr_tp_bands:
@@ -166,20 +285,6 @@ class LondonBreakoutStrategy:
             return "short"
         return None
 
-    def _inside_london_window(self, t_local: time) -> bool:
-        return self._is_between(t_local, self.cfg.london_probe_start, self.cfg.london_window_end)
-
-    def _after_asian_end(self, t_local: time) -> bool:
-        # Only true once the Asian window has fully finished
-        if self._is_between(t_local, self.cfg.asian_start, self.cfg.asian_end):
-            return False
-
-        if self.cfg.asian_start <= self.cfg.asian_end:
-            return t_local >= self.cfg.asian_end
-
-        # Asian window crosses midnight (e.g., 19:00 -> 01:30)
-        return self.cfg.asian_end < t_local < self.cfg.asian_start
-
     def _should_avoid_news(self) -> bool:
         if not self.cfg.news_avoidance_enabled:
             return False
@@ -201,6 +306,7 @@ class LondonBreakoutStrategy:
         self,
         candle: Dict[str, Any],
         spread_pips: float,
+        session: Optional[Tuple[int, int]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         candle: {
@@ -209,26 +315,37 @@ class LondonBreakoutStrategy:
           "high": float,
           "low": float,
           "close": float,
-          "volume": int
+          "volume": int,
+          "complete": bool (optional, default True)
         }
+        A candle with the same time as the previous one is a repeat: a forming
+        bar (complete=False) is updated in place and only evaluated once it is
+        complete; repeats of an evaluated bar and older candles are ignored.
         spread_pips: current spread in pips (used to block trades above max_spread)
+        session: optional precomputed (local day, flags) from session_index();
+                 computed from candle["time"] when omitted (live path)
         Returns action dict or None.
         """
-        self.candle_history.append(candle)
-        max_hist = self.cfg.atr_period + 5
-        if len(self.candle_history) > max_hist:
-            self.candle_history = self.candle_history[-max_hist:]
-
         t_utc = candle["time"]
-        t_local = self._utc_to_local(t_utc)
-        local_time = t_local.time()
-        
-        # London close killer: Exit all positions at 12:00 PM EST
-        # Convert candle time to EST
         if t_utc.tzinfo is None:
             t_utc = t_utc.replace(tzinfo=ZoneInfo("UTC"))
-        est_time = t_utc.astimezone(ZoneInfo("America/New_York")).time()
-        if est_time >= time(12, 0) and self.position.direction is not None:
+
+        last_time = self._last_candle_time
+        if last_time is not None and t_utc <= last_time:
+            if t_utc < last_time or self._last_candle_complete:
+                self.duplicate_candles += 1
+                return None
+            self.candles.update_last(candle["high"], candle["low"], candle["close"])
+        else:
+            self.candles.push(candle["high"], candle["low"], candle["close"])
+            self._last_candle_time = t_utc
+        self._last_candle_complete = candle.get("complete", True)
+        if not self._last_candle_complete:
+            return None  # evaluated once the bar completes
+        local_day, flags = session if session is not None else self.session_for(t_utc)
+
+        # London close killer: Exit all positions at 12:00 PM EST
+        if flags & FLATTEN and self.position.direction is not None:
             self._log("🕐 London close: Exiting position at 12:00 PM EST")
             return {
                 "action": "EXIT",
@@ -241,8 +358,10 @@ class LondonBreakoutStrategy:
         low = candle["low"]
 
         # new session date logic (we treat "session_date" as local calendar date)
-        if self.session.session_date is None or t_local.date() != self.session.session_date.date():
+        if self._session_day is None or local_day != self._session_day:
             # new trading day: reset session state
+            t_local = self._utc_to_local(t_utc)
+            self._session_day = local_day
             self.session = SessionState(
                 session_date=t_local,
                 asian_high=None,
@@ -258,7 +377,7 @@ class LondonBreakoutStrategy:
             self._log(f"🔄 New session day: {t_local.date()}")
 
         # 1) Build Asian range
-        if self._is_between(local_time, self.cfg.asian_start, self.cfg.asian_end):
+        if flags & IN_ASIAN:
             if self.session.asian_high is None:
                 self.session.asian_high = high
                 self.session.asian_low = low
@@ -275,9 +394,7 @@ class LondonBreakoutStrategy:
                     self._log(f"🌅 Asian range building: {self.session.asian_low:.5f} - {self.session.asian_high:.5f} ({current_range:.1f} pips)")
 
         # 2) Lock Asian range after Asian session, before London end
-        if (not self.session.range_locked
-                and self._after_asian_end(local_time)
-                and local_time <= self.cfg.london_window_end):
+        if not self.session.range_locked and flags & LOCK_WINDOW:
             self.session.range_locked = True
             # Calculate range pips
             if self.session.asian_high is not None and self.session.asian_low is not None:
@@ -307,16 +424,18 @@ class LondonBreakoutStrategy:
             if not hasattr(self, '_debug_counter'):
                 self._debug_counter = 0
             self._debug_counter += 1
-            
-            if self._inside_london_window(local_time):
+            log_tick = self._debug_counter % 20 == 0
+
+            if flags & IN_LONDON:
                 # Log every 5 minutes (20 candles) during London window
-                if self._debug_counter % 20 == 0:
+                if log_tick:
                     range_valid = self._asian_range_valid()
                     range_pips = self.session.asian_range_pips if self.session.asian_range_pips else 0
                     breakout_dir = self._price_breakout_direction(close)
                     news_blocking = self._should_avoid_news()
-                    in_trade_window = self._is_between(local_time, self.cfg.london_window_start, self.cfg.london_window_end)
-                    
+                    in_trade_window = bool(flags & IN_TRADE_WINDOW)
+                    local_time = self._utc_to_local(t_utc).time()
+
                     self._log(
                         f"🔍 Entry check @ {local_time.strftime('%H:%M')}: "
                         f"Range={range_valid} ({range_pips:.1f}pips), "
@@ -326,7 +445,7 @@ class LondonBreakoutStrategy:
                         f"InWindow={in_trade_window}, "
                         f"Probes={self.session.probes_used}/{self.cfg.probe_max_count}"
                     )
-                
+
                 if self.session.probes_used < self.cfg.probe_max_count:
                     if self._asian_range_valid():
                         if spread_pips <= self.cfg.max_spread_pips:
@@ -335,31 +454,28 @@ class LondonBreakoutStrategy:
                                 if direction is not None:
                                     # 🚫 NEW RULE: BLOCK SAME-DIRECTION AFTER SL LOSS
                                     if self.session.last_failed_direction == direction:
-                                        if self._debug_counter % 20 == 0:
+                                        if log_tick:
                                             self._log(f"⛔ Same-direction retry blocked after SL: {direction.upper()}")
                                         return None
-                                    
-                                    if self._is_between(
-                                        local_time,
-                                        self.cfg.london_window_start,
-                                        self.cfg.london_window_end,
-                                    ):
+
+                                    if flags & IN_TRADE_WINDOW:
                                         return self._enter_new_probe(direction, close, t_utc)
                                     else:
-                                        if self._debug_counter % 20 == 0:
+                                        if log_tick:
                                             self._log("ℹ️ Breakout detected before London trade window; waiting.")
                         else:
-                            if self._debug_counter % 20 == 0:
+                            if log_tick:
                                 self._log(f"⏸️ Spread too high ({spread_pips:.1f} pips), skip entry.")
                     else:
                         # no valid range
-                        if self._debug_counter % 20 == 0:
+                        if log_tick:
                             range_pips = self.session.asian_range_pips if self.session.asian_range_pips else 0
                             self._log(f"⏸️ Asian range invalid: {range_pips:.1f} pips (need {self.cfg.min_asian_range_pips}-{self.cfg.max_asian_range_pips} pips)")
                 else:
-                    if self._debug_counter % 20 == 0:
+                    if log_tick:
                         self._log(f"⏸️ Max probes reached ({self.session.probes_used}/{self.cfg.probe_max_count})")
-            elif self._debug_counter % 20 == 0 and local_time >= self.cfg.london_window_start:
+            elif log_tick and flags & AFTER_WINDOW_START:
+                local_time = self._utc_to_local(t_utc).time()
                 self._log(f"⏸️ Outside London window: {local_time.strftime('%H:%M')} (window: {self.cfg.london_window_start.strftime('%H:%M')}-{self.cfg.london_window_end.strftime('%H:%M')})")
 
         # nothing special on this candle
@@ -17,7 +17,8 @@ import pytz
 sys.path.append(str(Path(__file__).parent))
 sys.path.append(str(Path(__file__).parent.parent.parent.parent.parent))
 
-from signal_engine import generate_and_save_signal
+from signal_engine import generate_and_save_signal, model_registry
+from app.utils.bar_scheduler import BarCloseScheduler
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
@@ -54,7 +55,8 @@ def load_config():
         # Default config
         return {
             "instrument": "EUR_USD",
-            "cycle_interval_seconds": 3600,  # Check every hour (H1 timeframe)
+            "granularity": "H1",  # Wake at every H1 bar close
+            "settle_delay_seconds": 5,
             "description": "EUR/USD ML5 Ensemble Signal Service - Generates signals using 5-model XGBoost ensemble"
         }
 
@@ -154,23 +156,36 @@ def main():
         # Load config
         config = load_config()
         instrument = config.get("instrument", "EUR_USD")
-        cycle_interval = config.get("cycle_interval_seconds", 3600)
+        granularity = config.get("granularity", "H1")
+        settle_delay = config.get("settle_delay_seconds", 5)
         
         logger.info(f"Instrument: {instrument}")
-        logger.info(f"Cycle interval: {cycle_interval} seconds ({cycle_interval/3600:.1f} hours)")
+        logger.info(f"Schedule: every {granularity} bar close + {settle_delay}s settle delay")
+        
+        # Load the ensemble once; later cycles reuse it
+        model_registry.load()
+        model_stats = model_registry.stats()
+        logger.info(f"Models: {model_stats['ensemble_size']} loaded in {model_stats['load_ms']} ms "
+                    f"({', '.join(m['file'] for m in model_stats['models'])})")
         logger.info("✅ Signal service initialized successfully")
         logger.info("🔄 Starting signal generation loop...")
         
+        # First tick runs at once for the latest closed bar, then at every close
+        scheduler = BarCloseScheduler(granularity, settle_seconds=settle_delay, fire_immediately=True)
+        
         # Main loop
         cycle = 0
         
         while True:
             try:
+                next_due = datetime.fromtimestamp(scheduler.next_due(), tz=UTC)
+                logger.info(f"⏳ Waiting for next bar close (due {next_due.strftime('%Y-%m-%d %H:%M:%S UTC')})...")
+                tick = scheduler.wait()
                 cycle += 1
-                now = datetime.now(UTC)
                 
                 logger.info("=" * 70)
-                logger.info(f"🔄 Cycle #{cycle} - {now.strftime('%Y-%m-%d %H:%M:%S UTC')}")
+                logger.info(f"🔄 Cycle #{cycle} - {tick.bar_close.strftime('%Y-%m-%d %H:%M')} bar close "
+                            f"(drift {tick.drift_seconds:+.2f}s)")
                 
                 # Check if we need to generate a new signal
                 db: Session = SyncSessionLocal()
@@ -182,7 +197,7 @@ def main():
                 if should_generate:
                     # Generate signal
                     logger.info("🔄 Generating new ML signal...")
-                    signal = generate_and_save_signal()
+                    signal = generate_and_save_signal(tick.bar_close)
                     
                     if signal:
                         # Save to database
@@ -198,9 +213,8 @@ def main():
                 else:
                     logger.info("⏭️  Skipping signal generation (latest signal still valid)")
                 
-                # Sleep until next cycle
-                logger.info(f"⏳ Sleeping for {cycle_interval} seconds until next cycle...")
-                time.sleep(cycle_interval)
+                latency = scheduler.record_done(tick)
+                logger.info(f"✅ Cycle #{cycle} done {latency:.1f}s after bar close")
                 
             except KeyboardInterrupt:
                 logger.info("⚠️ Keyboard interrupt - shutting down...")
@@ -0,0 +1 @@
+# Multi-Instrument ML5 Signal Service
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Multi-Instrument ML5 Ensemble Signal Service
+Generates ML signals for every instrument in config.json and saves them to the database
+One process, one pandas/xgboost import and one DB pool, however many instruments
+"""
+
+import sys
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+import pytz
+from dotenv import load_dotenv
+
+# Add parent directories to path for imports
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent.parent.parent.parent))
+
+from signal_engine import InstrumentSignalEngine, build_engines
+from app.utils.bar_scheduler import BarCloseScheduler
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+
+# Database imports
+from app.db.db import SyncSessionLocal
+from app.models.ml_signal_history import MLSignalHistory
+
+# Setup logging
+log_dir = Path(__file__).parent / "logs"
+log_dir.mkdir(exist_ok=True)
+
+UTC = pytz.UTC
+log_file = log_dir / f"multi_ml5_signal_service_{datetime.now(UTC).strftime('%Y%m%d')}.log"
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(threadName)s %(name)s: %(message)s',
+    handlers=[
+        logging.FileHandler(log_file),
+        logging.StreamHandler()
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+
+def load_config():
+    """Load configuration"""
+    config_file = Path(__file__).parent / "config.json"
+    if config_file.exists():
+        with open(config_file, 'r') as f:
+            return json.load(f)
+    else:
+        # Default config
+        return {
+            "instruments": ["EUR_USD", "GBP_USD", "USD_JPY"],
+            "granularity": "H1",  # Wake at every H1 bar close
+            "settle_delay_seconds": 5,
+            "description": "Multi-instrument ML5 Ensemble Signal Service"
+        }
+
+
+def save_signal_to_database(signal: dict) -> bool:
+    """
+    Save signal to database (ml_signal_history table)
+    Returns True if saved successfully, False otherwise
+    """
+    try:
+        # Create database session (shared pool across all instruments)
+        db: Session = SyncSessionLocal()
+
+        try:
+            # Parse timestamp and valid_until
+            timestamp = datetime.fromisoformat(signal['timestamp'].replace('Z', '+00:00'))
+            valid_until = None
+            if signal.get('valid_until'):
+                valid_until = datetime.fromisoformat(signal['valid_until'].replace('Z', '+00:00'))
+
+            # Create MLSignalHistory record
+            signal_record = MLSignalHistory(
+                instrument=signal['instrument'],
+                direction=signal['direction'],
+                confidence=signal['confidence'],
+                confidence_score=float(signal.get('confidence_score', 0)),
+                ml_probability=float(signal['ml_probability']),
+                entry_price=float(signal['entry_price']),
+                ensemble_size=int(signal.get('ensemble_size', 0)) if signal.get('ensemble_size') else None,
+                individual_models=signal.get('individual_models'),  # JSONB
+                indicators=signal.get('indicators'),  # JSONB
+                timestamp=timestamp,
+                valid_until=valid_until
+            )
+
+            # Add and commit
+            db.add(signal_record)
+            db.commit()
+            db.refresh(signal_record)
+
+            logger.info(f"✅ {signal['instrument']} signal saved to database (ID: {signal_record.id})")
+            logger.info(f"   Direction: {signal['direction']}, Confidence: {signal['confidence']}, Prob: {signal['ml_probability']:.3f}")
+
+            return True
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Error saving {signal.get('instrument')} signal to database: {e}", exc_info=True)
+            return False
+        finally:
+            db.close()
+
+    except Exception as e:
+        logger.error(f"❌ Database connection error: {e}", exc_info=True)
+        return False
+
+
+def should_generate_new_signal(db: Session, instrument: str) -> bool:
+    """
+    Check if we need to generate a new signal for an instrument
+    Returns True if no recent valid signal exists
+    """
+    try:
+        stmt = select(MLSignalHistory).where(
+            MLSignalHistory.instrument == instrument
+        ).order_by(MLSignalHistory.timestamp.desc()).limit(1)
+
+        result = db.execute(stmt)
+        latest_signal = result.scalar_one_or_none()
+
+        if not latest_signal:
+            logger.info(f"No previous {instrument} signals found, generating new signal")
+            return True
+
+        # Check if signal is still valid
+        now = datetime.now(timezone.utc)
+        if latest_signal.valid_until and now < latest_signal.valid_until:
+            logger.info(f"Latest {instrument} signal still valid until {latest_signal.valid_until}, skipping generation")
+            return False
+
+        logger.info(f"Latest {instrument} signal expired, generating new signal")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error checking for existing {instrument} signals: {e}", exc_info=True)
+        return True  # Generate signal if check fails
+
+
+def run_instrument_cycle(engine: InstrumentSignalEngine, bar_close: Optional[datetime] = None) -> str:
+    """
+    One cycle for one instrument: ingest candles, validity check, generate, save
+    Returns "saved", "skipped" or "failed"
+    """
+    # Keep the candle store current even when no new signal is needed
+    engine.ingest()
+
+    db: Session = SyncSessionLocal()
+    try:
+        should_generate = should_generate_new_signal(db, engine.instrument)
+    finally:
+        db.close()
+
+    if not should_generate:
+        return "skipped"
+
+    logger.info(f"🔄 Generating new {engine.label} ML signal...")
+    signal = engine.generate_and_save_signal(bar_close)
+    if not signal:
+        logger.error(f"❌ Failed to generate {engine.label} signal")
+        return "failed"
+
+    if save_signal_to_database(signal):
+        return "saved"
+    logger.error(f"❌ Failed to save {engine.label} signal to database")
+    return "failed"
+
+
+def run_cycle(engines: List[InstrumentSignalEngine], executor: ThreadPoolExecutor,
+              bar_close: Optional[datetime] = None) -> Dict[str, str]:
+    """Run every instrument concurrently; one instrument failing does not block the others."""
+    futures = {engine.instrument: executor.submit(run_instrument_cycle, engine, bar_close) for engine in engines}
+    results = {}
+    for instrument, future in futures.items():
+        try:
+            results[instrument] = future.result()
+        except Exception as e:
+            logger.error(f"❌ {instrument} cycle error: {e}", exc_info=True)
+            results[instrument] = "failed"
+    return results
+
+
+def main():
+    """Main signal service loop"""
+    logger.info("=" * 70)
+    logger.info("📡🌍 MULTI-INSTRUMENT ML5 ENSEMBLE SIGNAL SERVICE STARTING")
+    logger.info("=" * 70)
+
+    executor = None
+    try:
+        # Load config
+        config = load_config()
+        ingest = config.get("ingest") or {}
+        if ingest.get("enabled") and ingest.get("env_file"):
+            load_dotenv(ingest["env_file"], override=True)  # OANDA credentials
+        granularity = config.get("granularity", "H1")
+        settle_delay = config.get("settle_delay_seconds", 5)
+        engines = build_engines(config)
+        if not engines:
+            logger.error("❌ No instruments configured")
+            sys.exit(1)
+
+        logger.info(f"Instruments: {', '.join(engine.instrument for engine in engines)}")
+        logger.info(f"Schedule: every {granularity} bar close + {settle_delay}s settle delay")
+        if ingest.get("enabled"):
+            logger.info(f"Candle ingestion: {ingest.get('source', 'oanda')} → "
+                        f"{', '.join(ingest.get('granularities', ['H1']))} candle store")
+
+        max_workers = config.get("max_workers") or len(engines)
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="signal")
+
+        # Load every ensemble once, in parallel; later cycles reuse them
+        list(executor.map(lambda engine: engine.model_registry.load(), engines))
+        for engine in engines:
+            model_stats = engine.model_registry.stats()
+            logger.info(f"{engine.label} models: {model_stats['ensemble_size']} loaded in {model_stats['load_ms']} ms "
+                        f"({', '.join(m['file'] for m in model_stats['models'])})")
+        logger.info("✅ Signal service initialized successfully")
+        logger.info("🔄 Starting signal generation loop...")
+
+        # First tick runs at once for the latest closed bar, then at every close
+        scheduler = BarCloseScheduler(granularity, settle_seconds=settle_delay, fire_immediately=True)
+
+        # Main loop
+        cycle = 0
+
+        while True:
+            try:
+                next_due = datetime.fromtimestamp(scheduler.next_due(), tz=UTC)
+                logger.info(f"⏳ Waiting for next bar close (due {next_due.strftime('%Y-%m-%d %H:%M:%S UTC')})...")
+                tick = scheduler.wait()
+                cycle += 1
+
+                logger.info("=" * 70)
+                logger.info(f"🔄 Cycle #{cycle} - {tick.bar_close.strftime('%Y-%m-%d %H:%M')} bar close "
+                            f"(drift {tick.drift_seconds:+.2f}s)")
+
+                started = time.perf_counter()
+                results = run_cycle(engines, executor, tick.bar_close)
+                latency = scheduler.record_done(tick)
+                summary = ", ".join(f"{instrument}={status}" for instrument, status in results.items())
+                logger.info(f"✅ Cycle #{cycle} done in {time.perf_counter() - started:.2f}s, "
+                            f"{latency:.1f}s after bar close ({summary})")
+
+            except KeyboardInterrupt:
+                logger.info("⚠️ Keyboard interrupt - shutting down...")
+                break
+            except Exception as e:
+                logger.error(f"❌ Error in main loop: {e}", exc_info=True)
+                logger.info(f"⏳ Waiting 60 seconds before retrying...")
+                time.sleep(60)
+
+    except Exception as e:
+        logger.error(f"❌ Fatal error: {e}", exc_info=True)
+        sys.exit(1)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    logger.info("=" * 70)
+    logger.info("🛑 MULTI-INSTRUMENT ML5 ENSEMBLE SIGNAL SERVICE STOPPED")
+    logger.info("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
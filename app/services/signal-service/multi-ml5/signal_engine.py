@@ -0,0 +1,308 @@
+"""
+Multi-Instrument ML5 Ensemble Signal Engine
+Generates BUY/SELL/NEUTRAL signals using 5-model XGBoost ensembles
+One InstrumentSignalEngine per instrument, parameterized from config.json
+"""
+
+import pandas as pd
+import numpy as np
+import xgboost as xgb
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+import logging
+
+from app.utils.candle_ingest import CandleIngestor, OandaCandleSource, ReplayCandleSource
+from app.utils.candle_store import open_store
+from app.utils.csv_tail import read_csv_tail
+from app.utils.ensemble_predictor import EnsemblePredictor, build_feature_vector
+from app.utils.incremental_indicators import DEFAULT_STATE_DIR, FEATURE_COLS, IncrementalIndicatorEngine
+from app.utils.model_registry import DEFAULT_SEEDS, ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# Paths for algo-trader
+H1_DATA_DIR = Path("/home/myalgo/algo-trader/data/h1_data")
+CANDLE_STORE_DIR = Path("/home/myalgo/algo-trader/data/candle_store")
+MODEL_ROOT = Path("/home/myalgo/algo-trader/ml_models/signal_generator")
+
+# Incremental indicator checkpoints, one file per instrument (kept apart from
+# the per-pair services' files so both can run during a migration)
+STATE_DIR = Path(DEFAULT_STATE_DIR) / "multi-ml5"
+
+
+def classify_probability(prob_up: float):
+    """
+    Map P(up) to (direction, confidence)
+    - prob > 0.6: BUY
+    - prob < 0.4: SELL
+    - 0.4 <= prob <= 0.6: NEUTRAL
+    """
+    if prob_up > 0.6:
+        return "BUY", "HIGH" if prob_up > 0.75 else "MEDIUM"
+    if prob_up < 0.4:
+        return "SELL", "HIGH" if prob_up < 0.25 else "MEDIUM"
+    return "NEUTRAL", "LOW"
+
+
+def _rounded(latest: pd.Series, col: str, decimals: int) -> Optional[float]:
+    return round(float(latest[col]), decimals) if not pd.isna(latest[col]) else None
+
+
+class InstrumentSignalEngine:
+    """Models, indicator state and data source for one instrument."""
+
+    def __init__(self, instrument: str, model_dir: Path, data_file: Path,
+                 price_decimals: int = 5, candles_count: int = 250,
+                 ensemble_seeds: Sequence[int] = DEFAULT_SEEDS,
+                 candle_store_dir: Path = CANDLE_STORE_DIR, state_dir: Path = STATE_DIR,
+                 ingestor: Optional[CandleIngestor] = None):
+        """
+        Args:
+            instrument: OANDA instrument (e.g. "EUR_USD")
+            model_dir: Directory holding {instrument}_xgboost_seed{N}.json
+            data_file: H1 CSV used when no candle store exists
+            price_decimals: Rounding for prices/EMAs/ATR (5, or 3 for JPY pairs)
+            candles_count: Candles loaded per cycle
+            ensemble_seeds: Ensemble seeds to load
+            candle_store_dir: Root of the memory-mapped candle store
+            state_dir: Where the indicator checkpoint is kept
+            ingestor: Appends fresh candles to the store before each signal (optional)
+        """
+        self.instrument = instrument
+        self.label = instrument.replace("_", "/")
+        self.model_dir = Path(model_dir)
+        self.data_file = Path(data_file)
+        self.price_decimals = price_decimals
+        self.candles_count = candles_count
+        self.seeds = list(ensemble_seeds)
+        self.candle_store_dir = Path(candle_store_dir)
+        self.ingestor = ingestor
+
+        # Ensemble stays loaded between cycles; hot-reloads when the model files change
+        self.model_registry = ModelRegistry(self.model_dir, instrument, self.seeds)
+        self.ensemble_predictor = EnsemblePredictor()
+
+        # Incremental indicator state (resumed across restarts)
+        self.indicator_engine = IncrementalIndicatorEngine(
+            checkpoint_path=Path(state_dir) / f"{instrument}_indicators.json",
+            history=candles_count,
+        )
+
+    def __repr__(self):
+        return f"<InstrumentSignalEngine({self.instrument}, models={self.model_dir})>"
+
+    @classmethod
+    def from_config(cls, entry: Dict, defaults: Optional[Dict] = None) -> "InstrumentSignalEngine":
+        """
+        Build an engine from one `instruments` entry of config.json.
+
+        Keys missing from the entry fall back to the top-level config (defaults),
+        then to the standard algo-trader paths for that instrument.
+        """
+        settings = dict(defaults or {})
+        settings.update(entry)
+        instrument = settings["instrument"]
+        pair_dir = instrument.replace("_", "").lower()
+
+        data_dir = Path(settings.get("data_dir", H1_DATA_DIR))
+        data_file = settings.get("data_file", f"{instrument}_H1_20051202_to_20251127.csv")
+        default_decimals = 3 if instrument.endswith("_JPY") else 5
+        candle_store_dir = Path(settings.get("candle_store_dir", CANDLE_STORE_DIR))
+
+        ingestor = None
+        ingest = settings.get("ingest") or {}
+        if ingest.get("enabled"):
+            ingestor = CandleIngestor(
+                instrument,
+                make_candle_source(ingest, data_dir / data_file),
+                granularities=tuple(ingest.get("granularities", ["H1"])),
+                root_dir=candle_store_dir,
+                backfill_count=int(ingest.get("backfill_count", 5000)),
+            )
+
+        return cls(
+            instrument=instrument,
+            model_dir=Path(settings.get("model_dir", MODEL_ROOT / f"{pair_dir}-models")),
+            data_file=data_dir / data_file,
+            price_decimals=int(settings.get("price_decimals", default_decimals)),
+            candles_count=int(settings.get("candles_count", 250)),
+            ensemble_seeds=settings.get("ensemble_seeds", DEFAULT_SEEDS),
+            candle_store_dir=candle_store_dir,
+            state_dir=Path(settings.get("state_dir", STATE_DIR)),
+            ingestor=ingestor,
+        )
+
+    def ingest(self):
+        """Append newly completed candles to the store (no-op without an ingestor)."""
+        if self.ingestor is not None:
+            return self.ingestor.run_once()
+        return []
+
+    def load_data(self, count: Optional[int] = None) -> pd.DataFrame:
+        """Load most recent N candles of H1 data"""
+        count = count or self.candles_count
+        try:
+            # Prefer the memory-mapped candle store once the CSV has been converted
+            store = open_store(self.instrument, "H1", self.candle_store_dir)
+            if store is not None:
+                return store.tail_frame(count)
+
+            # Seek from the end of the file; falls back to a full read if unsorted
+            return read_csv_tail(self.data_file, count)
+        except Exception as e:
+            logger.error(f"Error loading {self.label} data: {e}")
+            raise
+
+    def _check_fresh(self, df: pd.DataFrame, bar_close: datetime):
+        """Warn when the newest candle is not the bar that just closed."""
+        if df.empty:
+            return
+        expected_open = pd.Timestamp(bar_close) - pd.Timedelta(hours=1)
+        latest_open = pd.to_datetime(df['time'].iloc[-1], utc=True)
+        if latest_open < expected_open:
+            logger.warning(f"⚠️ {self.label} data is stale: latest candle {latest_open}, "
+                           f"expected {expected_open} for the {bar_close:%H:%M} close")
+
+    def generate_signal(self, df: pd.DataFrame, models: List[xgb.Booster],
+                        bar_close: Optional[datetime] = None) -> Dict:
+        """
+        Generate BUY/SELL/NEUTRAL signal using XGBoost ensemble
+
+        Model predicts probability of price going UP in next hour
+
+        Args:
+            df: Candles with indicators
+            models: Loaded ensemble
+            bar_close: Close of the H1 bar this signal is for (from the scheduler);
+                valid_until is the following close. Defaults to wall-clock hour.
+        """
+        if len(df) < 200:
+            return {
+                "instrument": self.instrument,
+                "direction": "NEUTRAL",
+                "confidence": "LOW",
+                "reason": "Insufficient data for indicators",
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
+
+        # Get latest row for prediction
+        latest = df.iloc[-1]
+
+        # Prepare features - latest row, NaNs forward-filled from each column's last valid value
+        features = build_feature_vector(df, FEATURE_COLS)
+
+        # Ensemble prediction: score all models in one pass, then average
+        individual_predictions = [round(float(pred), 4)
+                                  for pred in self.ensemble_predictor.predict(models, features, FEATURE_COLS)]
+        prob_up = np.mean(individual_predictions)
+
+        if len(models) > 1:
+            logger.debug(f"{self.label} ensemble prediction: "
+                         f"{[f'{p:.3f}' for p in individual_predictions]} → avg: {prob_up:.3f}")
+
+        direction, confidence = classify_probability(prob_up)
+        if direction == "BUY":
+            confidence_score = prob_up
+        elif direction == "SELL":
+            confidence_score = 1.0 - prob_up
+        else:
+            confidence_score = 0.5
+
+        # Valid until next H1 candle close
+        now = datetime.now(timezone.utc)
+        if bar_close is None:
+            bar_close = now.replace(minute=0, second=0, microsecond=0)
+        valid_until = (bar_close + timedelta(hours=1)).isoformat()
+
+        # Prepare individual model predictions for display
+        individual_signals = []
+        if len(models) > 1:
+            for i, pred in enumerate(individual_predictions):
+                model_direction, model_confidence = classify_probability(pred)
+                individual_signals.append({
+                    "model_num": i + 1,
+                    "seed": self.seeds[i] if i < len(self.seeds) else None,
+                    "probability": pred,
+                    "direction": model_direction,
+                    "confidence": model_confidence
+                })
+
+        price_dp = self.price_decimals
+        return {
+            "instrument": self.instrument,
+            "direction": direction,
+            "entry_price": round(float(latest['close']), price_dp),
+            "confidence": confidence,
+            "confidence_score": round(float(confidence_score), 3),
+            "ml_probability": round(float(prob_up), 3),
+            "ensemble_size": len(models),
+            "individual_models": individual_signals,
+            "timestamp": now.isoformat(),
+            "valid_until": valid_until,
+            "indicators": {
+                "rsi": _rounded(latest, 'rsi', 2),
+                "macd": _rounded(latest, 'macd', 5),
+                "macd_signal": _rounded(latest, 'macd_signal', 5),
+                "macd_histogram": _rounded(latest, 'macd_histogram', 5),
+                "ema_20": _rounded(latest, 'ema_20', price_dp),
+                "ema_50": _rounded(latest, 'ema_50', price_dp),
+                "ema_200": _rounded(latest, 'ema_200', price_dp),
+                "atr": _rounded(latest, 'atr', price_dp),
+                "momentum_1h": _rounded(latest, 'momentum_1h', 6),
+                "momentum_4h": _rounded(latest, 'momentum_4h', 6),
+                "momentum_24h": _rounded(latest, 'momentum_24h', 6),
+                "volatility": _rounded(latest, 'volatility', 6),
+                "price_position": _rounded(latest, 'price_position', 4)
+            }
+        }
+
+    def generate_and_save_signal(self, bar_close: Optional[datetime] = None) -> Optional[Dict]:
+        """
+        Load data, calculate indicators, generate signal using ML ensemble
+        Returns signal dict ready to save to database
+        """
+        try:
+            # Get loaded ensemble (reloaded only if the model files changed)
+            models = self.model_registry.get_models()
+            if not models:
+                logger.error(f"No {self.label} models found in {self.model_dir}. Please train the models first.")
+                return None
+
+            df = self.load_data()
+            if bar_close is not None:
+                self._check_fresh(df, bar_close)
+
+            # Calculate indicators (only bars newer than the last cycle are processed)
+            df = self.indicator_engine.apply(df)
+
+            signal = self.generate_signal(df, models, bar_close)
+
+            logger.info(f"{self.label} signal generated: {signal['direction']} "
+                        f"({signal['confidence']}, prob={signal.get('ml_probability', 0):.3f})")
+            return signal
+
+        except Exception as e:
+            logger.error(f"Error generating {self.label} signal: {e}", exc_info=True)
+            return None
+
+
+def make_candle_source(ingest: Dict, data_file: Path):
+    """Candle source from the `ingest` config: "oanda" (default) or "replay"."""
+    source = ingest.get("source", "oanda")
+    if source == "oanda":
+        return OandaCandleSource(mode=ingest.get("mode", "practice"))
+    if source == "replay":
+        return ReplayCandleSource(Path(ingest.get("replay_file", data_file)))
+    raise ValueError(f"Unknown candle source: {source}")
+
+
+def build_engines(config: Dict) -> List[InstrumentSignalEngine]:
+    """One engine per entry of config['instruments'] (strings or dicts)."""
+    defaults = {key: value for key, value in config.items() if key != "instruments"}
+    engines = []
+    for entry in config.get("instruments", []):
+        if isinstance(entry, str):
+            entry = {"instrument": entry}
+        engines.append(InstrumentSignalEngine.from_config(entry, defaults))
+    return engines
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Parity test: the multi-instrument service produces the same signals as the
+per-pair services (eurusd-ml5, usdjpy-ml5) on the same candles and models.
+
+Usage:
+    python3 app/services/signal-service/multi-ml5/test_signal_engine.py
+"""
+
+import importlib.util
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# Add project root and this service to path
+project_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from signal_engine import build_engines
+from app.utils.incremental_indicators import FEATURE_COLS, IncrementalIndicatorEngine
+from app.utils.model_registry import DEFAULT_SEEDS, ModelRegistry
+
+SERVICE_ROOT = project_root / "app" / "services" / "signal-service"
+PAIRS = {
+    # instrument: (per-pair service, its CSV constant, start price)
+    "EUR_USD": ("eurusd-ml5", "EURUSD_CSV", 1.10),
+    "USD_JPY": ("usdjpy-ml5", "USDJPY_CSV", 150.0),
+}
+
+
+def _candles(start_price: float, n: int = 600, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = start_price * np.abs(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        "time": pd.date_range("2025-06-02", periods=n, freq="h", tz="UTC").strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "open": open_, "high": np.maximum(open_, close) + spread, "low": np.minimum(open_, close) - spread,
+        "close": close, "volume": rng.integers(100, 1000, n),
+    })
+
+
+def _save_models(model_dir: Path, instrument: str, seed: int):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(500, len(FEATURE_COLS)))
+    y = (X[:, 0] + X[:, 8] + rng.normal(size=500) > 0).astype(int)
+    dtrain = xgb.DMatrix(X, label=y, feature_names=FEATURE_COLS)
+    model_dir.mkdir(parents=True)
+    for model_seed in DEFAULT_SEEDS:
+        booster = xgb.train({"objective": "binary:logistic", "max_depth": 3, "subsample": 0.8, "seed": model_seed},
+                            dtrain, num_boost_round=20)
+        booster.save_model(str(model_dir / f"{instrument}_xgboost_seed{model_seed}.json"))
+
+
+def _per_pair_service(instrument: str, tmp: Path, model_dir: Path, csv: Path):
+    """Import a per-pair signal_engine.py, pointed at the test data instead of the algo-trader paths."""
+    service, csv_constant, _ = PAIRS[instrument]
+    spec = importlib.util.spec_from_file_location(f"{service.replace('-', '_')}_signal_engine",
+                                                  SERVICE_ROOT / service / "signal_engine.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    setattr(module, csv_constant, csv)
+    module.CANDLE_STORE_DIR = tmp / "no-store"
+    module.model_registry = ModelRegistry(model_dir, instrument)
+    module.indicator_engine = IncrementalIndicatorEngine(tmp / "pair-state" / f"{instrument}.json", history=250)
+    return module
+
+
+def _comparable(signal: dict) -> dict:
+    """Everything except the wall-clock timestamp."""
+    return {key: value for key, value in signal.items() if key != "timestamp"}
+
+
+def test_engines_match_per_pair_services():
+    """A two-instrument config builds engines whose signals equal the per-pair services'."""
+    print("\n🔀 Test 1: Multi-instrument engines vs per-pair services")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        config = {
+            "data_dir": str(tmp / "h1_data"),
+            "candle_store_dir": str(tmp / "no-store"),
+            "state_dir": str(tmp / "multi-state"),
+            "candles_count": 250,
+            "ensemble_seeds": list(DEFAULT_SEEDS),
+            "instruments": [],
+        }
+        (tmp / "h1_data").mkdir()
+        pair_modules = {}
+        for i, (instrument, (_, _, start_price)) in enumerate(PAIRS.items()):
+            csv = tmp / "h1_data" / f"{instrument}_H1.csv"
+            _candles(start_price, seed=10 + i).to_csv(csv, index=False)
+            model_dir = tmp / "models" / instrument
+            _save_models(model_dir, instrument, seed=20 + i)
+            config["instruments"].append({"instrument": instrument, "model_dir": str(model_dir),
+                                          "data_file": csv.name})
+            pair_modules[instrument] = _per_pair_service(instrument, tmp, model_dir, csv)
+
+        engines = build_engines(config)
+        assert [engine.instrument for engine in engines] == list(PAIRS)
+        assert [engine.price_decimals for engine in engines] == [5, 3]
+
+        # The scheduler's tick for the bar after the last candle
+        bar_close = datetime(2025, 6, 27, 0, tzinfo=timezone.utc)
+        for engine in engines:
+            expected = pair_modules[engine.instrument].generate_and_save_signal(bar_close)
+            actual = engine.generate_and_save_signal(bar_close)
+            assert expected is not None and actual is not None
+            assert _comparable(actual) == _comparable(expected), engine.instrument
+            assert actual["valid_until"] == expected["valid_until"] == "2025-06-27T01:00:00+00:00"
+            assert actual["ensemble_size"] == len(DEFAULT_SEEDS)
+            assert [m["seed"] for m in actual["individual_models"]] == list(DEFAULT_SEEDS)
+        assert sorted(p.name for p in (tmp / "multi-state").iterdir()) == [f"{i}_indicators.json" for i in PAIRS]
+    print(f"   ✅ {', '.join(PAIRS)}: direction, probabilities, per-model votes, indicators and valid_until identical")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Multi-Instrument Signal Engine")
+    print("=" * 70)
+    test_engines_match_per_pair_services()
+    print("\n🎉 All multi-instrument signal engine tests passed!")
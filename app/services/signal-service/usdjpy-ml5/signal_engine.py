@@ -6,22 +6,35 @@ Saves signals to database instead of JSON files
 
 import pandas as pd
 import numpy as np
-import xgboost as xgb
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional
 import logging
 import sys
 
+from app.utils.candle_store import open_store
+from app.utils.csv_tail import read_csv_tail
+from app.utils.ensemble_predictor import EnsemblePredictor, build_feature_vector
+from app.utils.incremental_indicators import DEFAULT_STATE_DIR, IncrementalIndicatorEngine
+from app.utils.model_registry import ModelRegistry
+
 logger = logging.getLogger(__name__)
 
 # Paths for algo-trader
 H1_DATA_DIR = Path("/home/myalgo/algo-trader/data/h1_data")
 USDJPY_CSV = H1_DATA_DIR / "USD_JPY_H1_20051202_to_20251127.csv"
+CANDLE_STORE_DIR = Path("/home/myalgo/algo-trader/data/candle_store")
 
 # Model paths in algo-trader
 MODEL_DIR = Path("/home/myalgo/algo-trader/ml_models/signal_generator/usdjpy-models")
-MODEL_PATH = MODEL_DIR / "USD_JPY_xgboost.json"
+
+# Ensemble stays loaded between cycles; hot-reloads when the model files change
+model_registry = ModelRegistry(MODEL_DIR, "USD_JPY")
+ensemble_predictor = EnsemblePredictor()
+
+# Incremental indicator state (resumed across restarts)
+INDICATOR_CHECKPOINT = Path(DEFAULT_STATE_DIR) / "USD_JPY_indicators.json"
+indicator_engine = IncrementalIndicatorEngine(checkpoint_path=INDICATOR_CHECKPOINT, history=250)
 
 
 def calculate_indicators(df: pd.DataFrame) -> pd.DataFrame:
@@ -73,60 +86,30 @@ def calculate_indicators(df: pd.DataFrame) -> pd.DataFrame:
 def load_usdjpy_data(count: int = 250) -> pd.DataFrame:
     """Load most recent N candles of USD/JPY H1 data"""
     try:
-        df = pd.read_csv(USDJPY_CSV)
-        df['time'] = pd.to_datetime(df['time'])
-        df = df.sort_values('time')
-        df = df.tail(count)  # Get most recent candles
-        df = df.reset_index(drop=True)
-        return df
+        # Prefer the memory-mapped candle store once the CSV has been converted
+        store = open_store("USD_JPY", "H1", CANDLE_STORE_DIR)
+        if store is not None:
+            return store.tail_frame(count)
+
+        # Seek from the end of the file; falls back to a full read if unsorted
+        return read_csv_tail(USDJPY_CSV, count)
     except Exception as e:
         logger.error(f"Error loading USD/JPY data: {e}")
         raise
 
 
-def load_model() -> Optional[xgb.Booster]:
-    """Load trained XGBoost model (single model, for backward compatibility)"""
-    if not MODEL_PATH.exists():
-        logger.warning(f"Model not found: {MODEL_PATH}")
-        return None
-    
-    try:
-        model = xgb.Booster()
-        model.load_model(str(MODEL_PATH))
-        return model
-    except Exception as e:
-        logger.error(f"Error loading model: {e}")
-        return None
+def check_fresh(df: pd.DataFrame, bar_close: datetime):
+    """Warn when the newest candle is not the bar that just closed."""
+    if df.empty:
+        return
+    expected_open = pd.Timestamp(bar_close) - pd.Timedelta(hours=1)
+    latest_open = pd.to_datetime(df['time'].iloc[-1], utc=True)
+    if latest_open < expected_open:
+        logger.warning(f"⚠️ USD/JPY data is stale: latest candle {latest_open}, "
+                       f"expected {expected_open} for the {bar_close:%H:%M} close")
 
 
-def load_ensemble_models() -> list:
-    """Load all ensemble models (5 models with different seeds: 43-47)"""
-    models = []
-    
-    # Try to load ensemble models (seed 43-47)
-    for seed in range(43, 48):
-        model_path = MODEL_DIR / f"USD_JPY_xgboost_seed{seed}.json"
-        if model_path.exists():
-            try:
-                model = xgb.Booster()
-                model.load_model(str(model_path))
-                models.append(model)
-                logger.debug(f"Loaded ensemble model: {model_path.name}")
-            except Exception as e:
-                logger.warning(f"Error loading model {model_path}: {e}")
-    
-    # Fallback to single model if ensemble not found
-    if not models:
-        logger.info("Ensemble models not found, using single model")
-        single_model = load_model()
-        if single_model:
-            models = [single_model]
-    
-    logger.info(f"Loaded {len(models)} model(s) for ensemble prediction")
-    return models
-
-
-def generate_signal(df: pd.DataFrame, models: list) -> Dict:
+def generate_signal(df: pd.DataFrame, models: list, bar_close: Optional[datetime] = None) -> Dict:
     """
     Generate BUY/SELL/NEUTRAL signal using XGBoost ensemble
     
@@ -134,6 +117,10 @@ def generate_signal(df: pd.DataFrame, models: list) -> Dict:
     - prob > 0.6: BUY
     - prob < 0.4: SELL
     - 0.4 <= prob <= 0.6: NEUTRAL
+    
+    bar_close is the close of the H1 bar this signal is for (from the
+    scheduler); valid_until is the following close. Defaults to the
+    wall-clock hour.
     """
     if len(df) < 200:
         return {
@@ -154,34 +141,11 @@ def generate_signal(df: pd.DataFrame, models: list) -> Dict:
         'volatility', 'high_low_range', 'price_position'
     ]
     
-    # Prepare features - convert to numpy array and handle NaN
-    feature_values = []
-    for col in feature_cols:
-        val = latest[col]
-        # Handle NaN and convert to float
-        if pd.isna(val):
-            # Find last valid value in column
-            valid_idx = df[col].last_valid_index()
-            if valid_idx is not None:
-                val = df.loc[valid_idx, col]
-            else:
-                val = 0.0
-        feature_values.append(float(val))
-    
-    features = np.array(feature_values, dtype=np.float64).reshape(1, -1)
-    
-    # Final NaN check
-    if np.isnan(features).any():
-        logger.warning("Features still contain NaN after processing, filling with 0")
-        features = np.nan_to_num(features, nan=0.0)
-    
-    # Ensemble prediction: average predictions from all models
-    dtest = xgb.DMatrix(features, feature_names=feature_cols)
-    individual_predictions = []
+    # Prepare features - latest row, NaNs forward-filled from each column's last valid value
+    features = build_feature_vector(df, feature_cols)
     
-    for model in models:
-        pred = model.predict(dtest)[0]
-        individual_predictions.append(round(float(pred), 4))
+    # Ensemble prediction: score all models in one pass, then average
+    individual_predictions = [round(float(pred), 4) for pred in ensemble_predictor.predict(models, features, feature_cols)]
     
     # Average predictions (ensemble)
     prob_up = np.mean(individual_predictions)
@@ -204,10 +168,11 @@ def generate_signal(df: pd.DataFrame, models: list) -> Dict:
         confidence = "LOW"
         confidence_score = 0.5
     
-    # Valid until next H1 candle
+    # Valid until next H1 candle close
     now = datetime.now(timezone.utc)
-    next_hour = (now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1))
-    valid_until = next_hour.isoformat()
+    if bar_close is None:
+        bar_close = now.replace(minute=0, second=0, microsecond=0)
+    valid_until = (bar_close + timedelta(hours=1)).isoformat()
     
     # Prepare individual model predictions for display
     individual_signals = []
@@ -261,26 +226,28 @@ def generate_signal(df: pd.DataFrame, models: list) -> Dict:
     }
 
 
-def generate_and_save_signal() -> Optional[Dict]:
+def generate_and_save_signal(bar_close: Optional[datetime] = None) -> Optional[Dict]:
     """
     Load data, calculate indicators, generate signal using ML ensemble
     Returns signal dict ready to save to database
     """
     try:
-        # Load ensemble models
-        models = load_ensemble_models()
+        # Get loaded ensemble (reloaded only if the model files changed)
+        models = model_registry.get_models()
         if not models:
             logger.error("No models found. Please train the models first.")
             return None
         
         # Load most recent 250 candles
         df = load_usdjpy_data(count=250)
+        if bar_close is not None:
+            check_fresh(df, bar_close)
         
-        # Calculate indicators
-        df = calculate_indicators(df)
+        # Calculate indicators (only bars newer than the last cycle are processed)
+        df = indicator_engine.apply(df)
         
         # Generate signal using ML ensemble
-        signal = generate_signal(df, models)
+        signal = generate_signal(df, models, bar_close)
         
         logger.info(f"USD/JPY signal generated: {signal['direction']} ({signal['confidence']}, prob={signal.get('ml_probability', 0):.3f})")
         return signal
@@ -0,0 +1,108 @@
+"""
+Account State Cache
+Serves an account's summary, open trades, positions and pending orders from
+one GET accounts/{id} call instead of separate summary / openTrades /
+positions round trips, re-fetching after a short TTL or when invalidated
+(after an order fill or trade close).
+
+Usage:
+    state = AccountStateCache(shared_client(api_key, mode), account_id)
+    balance = float(state.account()["balance"])
+    trades = state.open_trades("EUR_USD")       # same snapshot, no request
+    ...
+    client.post(f"accounts/{account_id}/orders", json=order)
+    state.invalidate()                           # next read re-fetches
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.utils.oanda_client import OandaClient
+
+logger = logging.getLogger(__name__)
+
+# Long enough to cover one strategy cycle, short enough that broker-side
+# closes (SL/TP) are picked up on the next cycle
+DEFAULT_TTL_SECONDS = 10.0
+
+# Lists in the AccountDetails payload; everything else is the summary
+_LIST_FIELDS = ("trades", "positions", "orders")
+
+
+class AccountStateCache:
+    """TTL cache over one account's details snapshot (thread-safe)."""
+
+    def __init__(self, client: OandaClient, account_id: str, ttl: float = DEFAULT_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            client: Shared OANDA client
+            account_id: OANDA account
+            ttl: Seconds a snapshot is served before re-fetching
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.client = client
+        self.account_id = account_id
+        self.ttl = ttl
+        self.clock = clock
+        self._snapshot: Optional[Dict] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.hits = 0
+
+    def invalidate(self):
+        """Drop the snapshot; the next read fetches a fresh one."""
+        with self._lock:
+            self._snapshot = None
+
+    def snapshot(self) -> Dict:
+        """
+        The AccountDetails "account" object, fetched at most once per TTL.
+
+        Raises:
+            OandaAPIError: If the fetch fails (the stale snapshot is not served)
+        """
+        with self._lock:
+            if self._snapshot is not None and self.clock() - self._fetched_at < self.ttl:
+                self.hits += 1
+                return self._snapshot
+            account = self._fetch()
+            self._snapshot = account
+            self._fetched_at = self.clock()
+            self.fetches += 1
+            logger.debug(f"Account {self.account_id} snapshot @ txn {account.get('lastTransactionID')}")
+            return account
+
+    def _fetch(self) -> Dict:
+        """Full AccountDetails snapshot (subclasses may fetch deltas instead)."""
+        response = self.client.get(f"accounts/{self.account_id}")
+        account = response.get("account", {})
+        account.setdefault("lastTransactionID", response.get("lastTransactionID"))
+        return account
+
+    def account(self) -> Dict:
+        """Summary fields (balance, NAV, marginAvailable, ...) without the lists."""
+        return {k: v for k, v in self.snapshot().items() if k not in _LIST_FIELDS}
+
+    def open_trades(self, instrument: Optional[str] = None) -> List[Dict]:
+        """Open trades, optionally for one instrument."""
+        trades = self.snapshot().get("trades", [])
+        if instrument:
+            trades = [t for t in trades if t.get("instrument") == instrument]
+        return trades
+
+    def positions(self, instrument: Optional[str] = None) -> List[Dict]:
+        """Positions with open units (long or short), optionally for one instrument."""
+        positions = [p for p in self.snapshot().get("positions", [])
+                     if p.get("long", {}).get("units", "0") != "0"
+                     or p.get("short", {}).get("units", "0") != "0"]
+        if instrument:
+            positions = [p for p in positions if p.get("instrument") == instrument]
+        return positions
+
+    def pending_orders(self) -> List[Dict]:
+        """Pending orders (including SL/TP orders attached to trades)."""
+        return self.snapshot().get("orders", [])
@@ -0,0 +1,244 @@
+"""
+Incremental Account Sync
+Keeps a local mirror of an OANDA account (summary, open trades, pending
+orders, positions) and advances it with the "changes since transaction ID"
+endpoint instead of re-pulling openTrades / positions snapshots:
+
+    GET accounts/{id}                                   once (or when the delta is unavailable)
+    GET accounts/{id}/changes?sinceTransactionID=N      afterwards: only what changed since N
+
+The mirror and its lastTransactionID are persisted to a JSON state file, so a
+restarted bot resyncs only the delta since its last poll. Bots trading the same
+account share the file: saves take an flock on <file>.lock, write a per-process
+temp file and rename it into place, and never replace a newer mirror with an
+older one.
+
+AccountSync is a drop-in AccountStateCache: reads (account(), open_trades(),
+positions(), pending_orders()) are served locally and poll for changes at
+most once per TTL or after invalidate().
+
+Usage:
+    sync = AccountSync(shared_client(api_key, mode), account_id,
+                       state_path=default_state_path(account_id))
+    if not sync.positions("GBP_USD"):
+        ...
+"""
+
+import fcntl
+import json
+import logging
+import os
+from contextlib import contextmanager
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from app.utils.account_state import DEFAULT_TTL_SECONDS, AccountStateCache
+from app.utils.oanda_client import OandaAPIError, OandaClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_DIR = "/home/myalgo/algo-trader/data/account_sync"
+STATE_VERSION = 1
+
+# 4xx answers to a changes poll that mean "delta unavailable, take a full snapshot"
+# (transaction id out of range / unknown); 429 is retried by the client instead
+RESYNC_STATUS = {400, 404, 416}
+
+
+def default_state_path(account_id: str) -> Path:
+    """Mirror file for an account under DEFAULT_STATE_DIR."""
+    return Path(DEFAULT_STATE_DIR) / f"{account_id}.json"
+
+
+class AccountSync(AccountStateCache):
+    """Local account mirror advanced by transaction-id deltas (thread-safe reads)."""
+
+    def __init__(self, client: OandaClient, account_id: str, state_path: Optional[Path] = None,
+                 ttl: float = DEFAULT_TTL_SECONDS, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            client: Shared OANDA client
+            account_id: OANDA account
+            state_path: JSON file the mirror is persisted to / restored from (None: memory only)
+            ttl: Seconds reads are served before polling for changes
+            clock: Monotonic clock (injectable for tests)
+        """
+        super().__init__(client, account_id, ttl=ttl, clock=clock)
+        self.state_path = Path(state_path) if state_path else None
+        self.summary: Dict = {}
+        self.trades: Dict[str, Dict] = {}
+        self.orders: Dict[str, Dict] = {}
+        self.position_map: Dict[str, Dict] = {}
+        self.last_transaction_id: Optional[str] = None
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self.transactions_applied = 0
+        if self.state_path and self.state_path.exists():
+            self.load()
+
+    # ---- sync ----
+
+    def _fetch(self) -> Dict:
+        if self.last_transaction_id is None:
+            self._full_sync()
+        else:
+            try:
+                self._delta_sync()
+            except OandaAPIError as e:
+                if e.status not in RESYNC_STATUS:
+                    raise
+                logger.warning(f"⚠️ Changes since txn {self.last_transaction_id} unavailable ({e}), "
+                               f"taking a full snapshot")
+                self._full_sync()
+        return self._materialize()
+
+    def _full_sync(self):
+        response = self.client.get(f"accounts/{self.account_id}")
+        account = dict(response.get("account", {}))
+        self.trades = {t["id"]: t for t in account.pop("trades", [])}
+        self.orders = {o["id"]: o for o in account.pop("orders", [])}
+        self.position_map = {p["instrument"]: p for p in account.pop("positions", [])}
+        self.summary = account
+        self.last_transaction_id = response.get("lastTransactionID") or account.get("lastTransactionID")
+        self.full_syncs += 1
+        logger.info(f"📥 Account {self.account_id} full sync @ txn {self.last_transaction_id} "
+                    f"({len(self.trades)} trades, {len(self.orders)} orders)")
+        self.save()
+
+    def _delta_sync(self):
+        since = self.last_transaction_id
+        response = self.client.get(f"accounts/{self.account_id}/changes",
+                                   params={"sinceTransactionID": since})
+        self.apply_changes(response)
+        self.delta_syncs += 1
+        if self.last_transaction_id != since:
+            self.save()
+
+    def apply_changes(self, response: Dict):
+        """Apply an AccountChanges response (changes + state + lastTransactionID)."""
+        changes = response.get("changes", {})
+
+        for order in changes.get("ordersCreated", []):
+            self.orders[order["id"]] = order
+        for key in ("ordersCancelled", "ordersFilled", "ordersTriggered"):
+            for order in changes.get(key, []):
+                self.orders.pop(order["id"], None)
+
+        for key in ("tradesOpened", "tradesReduced"):
+            for trade in changes.get(key, []):
+                self.trades[trade["id"]] = trade
+        for trade in changes.get("tradesClosed", []):
+            self.trades.pop(trade["id"], None)
+
+        for position in changes.get("positions", []):
+            self.position_map[position["instrument"]] = position
+
+        transactions = changes.get("transactions", [])
+        for txn in transactions:
+            if "accountBalance" in txn:
+                self.summary["balance"] = txn["accountBalance"]
+        self.transactions_applied += len(transactions)
+
+        # Price-dependent values (unrealized P/L, NAV, margin) come as current state
+        state = dict(response.get("state", {}))
+        for trade_state in state.pop("trades", []):
+            if trade_state["id"] in self.trades:
+                self.trades[trade_state["id"]].update(trade_state)
+        for position_state in state.pop("positions", []):
+            position = self.position_map.get(position_state["instrument"])
+            if position is not None:
+                position["unrealizedPL"] = position_state.get("netUnrealizedPL", position.get("unrealizedPL"))
+                for side in ("long", "short"):
+                    if f"{side}UnrealizedPL" in position_state and side in position:
+                        position[side]["unrealizedPL"] = position_state[f"{side}UnrealizedPL"]
+        for order_state in state.pop("orders", []):
+            if order_state["id"] in self.orders:
+                self.orders[order_state["id"]].update(order_state)
+        self.summary.update(state)
+
+        self.last_transaction_id = response.get("lastTransactionID", self.last_transaction_id)
+
+    def _materialize(self) -> Dict:
+        account = dict(self.summary)
+        account["trades"] = list(self.trades.values())
+        account["orders"] = list(self.orders.values())
+        account["positions"] = list(self.position_map.values())
+        account["openTradeCount"] = len(self.trades)
+        account["pendingOrderCount"] = len(self.orders)
+        account["lastTransactionID"] = self.last_transaction_id
+        return account
+
+    # ---- persistence ----
+
+    @contextmanager
+    def _state_locked(self):
+        """Exclusive advisory lock on <state_path>.lock (all bots sharing the account)."""
+        lock_path = self.state_path.with_name(self.state_path.name + ".lock")
+        with open(lock_path, 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _stored_transaction_id(self) -> Optional[int]:
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+            if state.get("account_id") != self.account_id:
+                return None
+            return int(state["lastTransactionID"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self):
+        """Atomically write the mirror to state_path unless it holds a newer one (no-op without a path)."""
+        if not self.state_path:
+            return
+        state = {
+            "version": STATE_VERSION,
+            "account_id": self.account_id,
+            "lastTransactionID": self.last_transaction_id,
+            "summary": self.summary,
+            "trades": self.trades,
+            "orders": self.orders,
+            "positions": self.position_map,
+        }
+        tmp_path = self.state_path.with_name(f".{self.state_path.name}.{os.getpid()}.tmp")
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._state_locked():
+                stored = self._stored_transaction_id()
+                if stored is not None and self.last_transaction_id is not None \
+                        and stored > int(self.last_transaction_id):
+                    logger.debug(f"Account mirror {self.state_path} already @ txn {stored}, not saving")
+                    return
+                with open(tmp_path, 'w') as f:
+                    json.dump(state, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.state_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not persist account mirror to {self.state_path}: {e}")
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def load(self):
+        """Restore the mirror from state_path; unusable files are ignored (full sync instead)."""
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring account mirror {self.state_path}: {e}")
+            return
+        if state.get("version") != STATE_VERSION or state.get("account_id") != self.account_id:
+            logger.warning(f"⚠️ Ignoring account mirror {self.state_path}: version/account mismatch")
+            return
+        self.summary = state["summary"]
+        self.trades = state["trades"]
+        self.orders = state["orders"]
+        self.position_map = state["positions"]
+        self.last_transaction_id = state["lastTransactionID"]
+        logger.info(f"📂 Account {self.account_id} mirror restored @ txn {self.last_transaction_id}")
@@ -0,0 +1,151 @@
+"""
+Async News Avoidance Backend
+Non-blocking front-end over the news avoidance service (file or database
+backend) for the FastAPI routes.
+
+- Queries (should_avoid_trading, should_close_positions, get_upcoming_news,
+  next_transition, settings) are answered from the in-memory calendar index;
+  they never touch the disk on the event loop
+- The file is loaded and re-checked for external edits (bots' admin tools,
+  bulk imports) by a background task that runs the read + JSON parse in a
+  worker thread every `poll_seconds`
+- Writes (add/delete/import events, settings) are serialized by an asyncio lock and
+  persisted in a worker thread; the index is rebuilt off the loop before the
+  write returns, so the caller reads its own write
+
+Usage:
+    from app.utils.async_news_avoidance import async_news_avoidance
+
+    result = await async_news_avoidance.should_avoid_trading("GBP_USD")
+    event = await async_news_avoidance.add_news_event("US CPI", "USD", when)
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.utils.simple_news_avoidance import NewsAvoidanceBase, get_news_avoidance_service
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background checks of the news file for external changes
+DEFAULT_POLL_SECONDS = 2.0
+
+
+class AsyncNewsAvoidance:
+    """asyncio-native news avoidance: in-memory reads, threaded persistence."""
+
+    def __init__(self, service: Optional[NewsAvoidanceBase] = None,
+                 poll_seconds: float = DEFAULT_POLL_SECONDS):
+        """
+        Args:
+            service: Service to wrap (default: the process-wide
+                simple_news_avoidance instance, resolved on first use, so the
+                web app holds one calendar and at most one LISTEN connection);
+                switched to watch_file=False
+            poll_seconds: Interval of the background file check (0: only on writes)
+        """
+        self._service = service
+        if service is not None:
+            service.watch_file = False
+        self.poll_seconds = poll_seconds
+        self._write_lock = asyncio.Lock()
+        self._poller: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Task] = None
+
+    @property
+    def service(self) -> NewsAvoidanceBase:
+        if self._service is None:
+            self._service = get_news_avoidance_service()
+            self._service.watch_file = False  # refreshed by the background task instead
+        return self._service
+
+    # ---- lifecycle ----
+
+    async def start(self):
+        """Load the calendar (off the loop) and start the background file check; idempotent."""
+        if self._ready is None:
+            self._ready = asyncio.create_task(self._load())
+        await self._ready
+
+    async def _load(self):
+        await asyncio.to_thread(self.service.refresh)
+        if self.poll_seconds:
+            self._poller = asyncio.create_task(self._poll())
+        logger.info(f"📰 Async news avoidance ready ({len(self.service._get_calendar())} high-impact events)")
+
+    async def stop(self):
+        """Cancel the background file check."""
+        if self._poller:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+        self._ready = None
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                async with self._write_lock:
+                    reloaded = await asyncio.to_thread(self.service.refresh)
+                if reloaded:
+                    logger.info("📰 News file changed on disk, calendar reloaded")
+            except Exception as e:
+                logger.error(f"News calendar refresh failed: {e}")
+
+    # ---- reads (in-memory) ----
+
+    async def should_avoid_trading(self, currency_pair: Optional[str] = None) -> Dict[str, Any]:
+        await self.start()
+        return self.service.should_avoid_trading(currency_pair)
+
+    async def should_close_positions(self, currency_pair: Optional[str] = None) -> Dict[str, Any]:
+        await self.start()
+        return self.service.should_close_positions(currency_pair)
+
+    async def get_upcoming_news(self, hours_ahead: int = 24, currency: Optional[str] = None) -> List[Dict[str, Any]]:
+        await self.start()
+        return self.service.get_upcoming_news(hours_ahead=hours_ahead, currency=currency)
+
+    async def next_transition(self, currency_pair: Optional[str] = None) -> Dict[str, Any]:
+        await self.start()
+        return self.service.next_transition(currency_pair)
+
+    async def get_settings(self) -> Dict[str, Any]:
+        await self.start()
+        return self.service.settings
+
+    # ---- writes (serialized, persisted off the loop) ----
+
+    async def _write(self, fn, *args, **kwargs):
+        await self.start()
+        async with self._write_lock:
+            result = await asyncio.to_thread(fn, *args, **kwargs)
+            await asyncio.to_thread(self.service.refresh)
+            return result
+
+    async def add_news_event(self, title: str, currency: str, event_time: datetime,
+                             impact: str = "high") -> Dict[str, Any]:
+        return await self._write(self.service.add_news_event, title, currency, event_time, impact)
+
+    async def delete_news_event(self, event_id: int) -> bool:
+        return await self._write(self.service.delete_news_event, event_id)
+
+    async def import_events(self, events: List[Dict[str, Any]], skip_existing: bool = True) -> Dict[str, int]:
+        return await self._write(self.service.import_events, events, skip_existing=skip_existing)
+
+    async def update_settings(self, minutes_before: Optional[int] = None, minutes_after: Optional[int] = None,
+                              minutes_before_close: Optional[int] = None,
+                              enabled: Optional[bool] = None) -> Dict[str, Any]:
+        await self._write(self.service.update_settings, minutes_before=minutes_before,
+                          minutes_after=minutes_after, minutes_before_close=minutes_before_close,
+                          enabled=enabled)
+        return self.service.settings
+
+
+# Global instance for the API routes
+async_news_avoidance = AsyncNewsAvoidance()
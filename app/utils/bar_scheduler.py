@@ -0,0 +1,181 @@
+"""
+Bar-Close Scheduler
+Wakes a service loop at each candle close (plus a settle delay) instead of
+sleeping a fixed interval after each cycle.
+
+- Ticks are aligned to the UTC bar grid of the granularity (H1 → every :00).
+- If a cycle overruns past one or more bar closes, the next wait() returns
+  immediately for the most recent close (missed ticks are coalesced, counted).
+- Wake-up drift (actual - scheduled) and close→done latency are tracked.
+
+Usage:
+    scheduler = BarCloseScheduler("H1", settle_seconds=5)
+    while True:
+        tick = scheduler.wait()
+        ... generate for tick.bar_close ...
+        scheduler.record_done(tick)
+"""
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+GRANULARITY_SECONDS = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "M30": 1800,
+    "H1": 3600,
+    "H4": 14400,
+    "D": 86400,
+}
+
+# Longest single sleep, so wall-clock jumps (NTP, suspend) are noticed quickly
+MAX_SLEEP_SECONDS = 30.0
+
+# Recent ticks kept for drift/latency stats
+METRIC_WINDOW = 1000
+
+
+def granularity_seconds(granularity: str) -> int:
+    try:
+        return GRANULARITY_SECONDS[granularity]
+    except KeyError:
+        raise ValueError(f"Unsupported granularity: {granularity}") from None
+
+
+@dataclass
+class BarTick:
+    """One scheduler wake-up."""
+    bar_close: datetime      # Close time of the bar that just completed (UTC)
+    scheduled: float         # Epoch seconds the tick was due (close + settle)
+    woke: float              # Epoch seconds the tick actually fired
+    missed: int = 0          # Bar closes skipped since the previous tick
+    period: int = 3600       # Bar length in seconds
+
+    @property
+    def drift_seconds(self) -> float:
+        return self.woke - self.scheduled
+
+    @property
+    def next_close(self) -> datetime:
+        """Close of the bar now forming (when this tick's output goes stale)."""
+        return datetime.fromtimestamp(self.bar_close.timestamp() + self.period, tz=timezone.utc)
+
+
+class BarCloseScheduler:
+    """Blocking scheduler aligned to candle closes."""
+
+    def __init__(self, granularity: str = "H1", settle_seconds: float = 5.0,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep,
+                 fire_immediately: bool = False):
+        """
+        Args:
+            granularity: Candle granularity (M1, M5, M15, M30, H1, H4, D)
+            settle_seconds: Delay after the close before waking, so the
+                completed candle is available from the data source
+            clock: Epoch-seconds clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+            fire_immediately: First wait() returns at once for the latest
+                completed bar (useful on startup) instead of the next close
+        """
+        self.granularity = granularity
+        self.period = granularity_seconds(granularity)
+        self.settle_seconds = float(settle_seconds)
+        self._clock = clock
+        self._sleep = sleep
+
+        self._last_close: Optional[int] = None
+        if not fire_immediately:
+            # Treat the bar that closed most recently as already handled
+            self._last_close = self.last_close_at(self._clock() - self.settle_seconds)
+
+        self._ticks = 0
+        self._missed = 0
+        self._drifts: Deque[float] = deque(maxlen=METRIC_WINDOW)
+        self._latencies: Deque[float] = deque(maxlen=METRIC_WINDOW)
+
+    # ------------- Bar grid ------------- #
+
+    def last_close_at(self, ts: float) -> int:
+        """Latest bar close (epoch seconds) at or before ts."""
+        return int(ts // self.period) * self.period
+
+    def due_at(self, close: int) -> float:
+        return close + self.settle_seconds
+
+    def next_due(self) -> float:
+        """Epoch seconds of the next tick."""
+        if self._last_close is None:
+            return self._clock()
+        return self.due_at(self._last_close + self.period)
+
+    # ------------- Waiting ------------- #
+
+    def wait(self) -> BarTick:
+        """Block until the next bar close + settle delay, then return the tick."""
+        while True:
+            now = self._clock()
+            latest = self.last_close_at(now - self.settle_seconds)
+            if self._last_close is None or latest > self._last_close:
+                break
+            remaining = self.due_at(self._last_close + self.period) - now
+            self._sleep(min(max(remaining, 0.0), MAX_SLEEP_SECONDS))
+
+        missed = 0
+        if self._last_close is not None:
+            missed = max((latest - self._last_close) // self.period - 1, 0)
+            if missed:
+                logger.warning(f"⚠️ Missed {missed} {self.granularity} bar close(s); "
+                               f"catching up on the latest one")
+
+        first = self._last_close is None
+        tick = BarTick(
+            bar_close=datetime.fromtimestamp(latest, tz=timezone.utc),
+            scheduled=self.due_at(latest),
+            woke=now,
+            missed=missed,
+            period=self.period,
+        )
+        self._last_close = latest
+        self._ticks += 1
+        self._missed += missed
+        if not missed and not first:
+            # Startup and catch-up ticks are late by design; keep them out of the drift stats
+            self._drifts.append(tick.drift_seconds)
+        return tick
+
+    def record_done(self, tick: BarTick) -> float:
+        """Record when the work for a tick finished; returns close→done latency (s)."""
+        latency = self._clock() - tick.bar_close.timestamp()
+        self._latencies.append(latency)
+        return latency
+
+    # ------------- Metrics ------------- #
+
+    @staticmethod
+    def _summary(values: Deque[float]) -> Dict:
+        if not values:
+            return {"last": None, "mean": None, "max": None}
+        return {
+            "last": round(values[-1], 3),
+            "mean": round(sum(values) / len(values), 3),
+            "max": round(max(values), 3),
+        }
+
+    def stats(self) -> Dict:
+        """Tick counts, wake-up drift and close→done latency (seconds)."""
+        return {
+            "granularity": self.granularity,
+            "settle_seconds": self.settle_seconds,
+            "ticks": self._ticks,
+            "missed": self._missed,
+            "drift": self._summary(self._drifts),
+            "latency": self._summary(self._latencies),
+        }
@@ -0,0 +1,286 @@
+"""
+Candle Ingestion
+Appends completed candles to the columnar candle store from a pluggable source,
+so the signal engines compute on fresh bars instead of a frozen CSV export.
+
+Sources:
+- OandaCandleSource  - OANDA v3 instruments/{instrument}/candles (mid prices),
+                       through the pooled, rate-limited shared_client()
+- ReplayCandleSource - a local candle CSV/DataFrame, released bar by bar as a
+                       clock passes each bar's close (tests, backfills, replays)
+
+Each run fetches from the last stored bar onward (the last bar is re-fetched
+so late revisions are picked up), writes with CandleStore.upsert() (idempotent),
+and reports gaps in the bar sequence that are not market closures.
+
+Usage:
+    python3 -m app.utils.candle_ingest --instrument EUR_USD --granularity H1 M1
+    python3 -m app.utils.candle_ingest --instrument EUR_USD --replay data/h1_data/EUR_USD_H1_....csv
+"""
+
+import argparse
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from app.utils.bar_scheduler import granularity_seconds
+from app.utils.candle_store import DEFAULT_STORE_DIR, CandleStore, to_time_ns
+from app.utils.oanda_client import OandaClient, shared_client
+
+logger = logging.getLogger(__name__)
+
+CANDLE_COLUMNS = ["time", "open", "high", "low", "close", "volume"]
+
+# Bars fetched when a store is empty
+DEFAULT_BACKFILL_COUNT = 5000
+
+# OANDA returns at most 5000 candles per request
+OANDA_MAX_COUNT = 5000
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "time": pd.Series(dtype="datetime64[ns, UTC]"),
+        **{col: pd.Series(dtype="float64") for col in ["open", "high", "low", "close"]},
+        "volume": pd.Series(dtype="int64"),
+    })
+
+
+# ------------- Sources ------------- #
+
+class CandleSource(ABC):
+    """Interface: completed candles for an instrument/granularity."""
+
+    @abstractmethod
+    def fetch(self, instrument: str, granularity: str, since: Optional[pd.Timestamp] = None,
+              count: int = DEFAULT_BACKFILL_COUNT) -> pd.DataFrame:
+        """
+        Completed candles with time >= since (or the latest `count` if since is None).
+
+        Returns:
+            DataFrame with time (UTC, bar open), open, high, low, close, volume
+        """
+
+
+class OandaCandleSource(CandleSource):
+    """OANDA v3 REST candles endpoint (mid prices, completed bars only)."""
+
+    def __init__(self, api_key: Optional[str] = None, mode: str = "practice",
+                 client: Optional[OandaClient] = None):
+        """
+        Args:
+            api_key: OANDA token (default: OANDA_API_KEY / OANDA_API_TOKEN env)
+            mode: "practice" or "live"
+            client: OANDA REST client (default: the process-wide shared_client(api_key, mode))
+        """
+        self.client = client or shared_client(api_key, mode)
+
+    def _request(self, instrument: str, params: dict) -> List[dict]:
+        return self.client.get(f"instruments/{instrument}/candles", params=params).get("candles", [])
+
+    @staticmethod
+    def _to_frame(candles: List[dict]) -> pd.DataFrame:
+        complete = [c for c in candles if c.get("complete")]
+        if not complete:
+            return _empty_frame()
+        return pd.DataFrame({
+            "time": pd.to_datetime([c["time"] for c in complete], utc=True),
+            "open": [float(c["mid"]["o"]) for c in complete],
+            "high": [float(c["mid"]["h"]) for c in complete],
+            "low": [float(c["mid"]["l"]) for c in complete],
+            "close": [float(c["mid"]["c"]) for c in complete],
+            "volume": [int(c.get("volume", 0)) for c in complete],
+        })
+
+    def fetch(self, instrument: str, granularity: str, since: Optional[pd.Timestamp] = None,
+              count: int = DEFAULT_BACKFILL_COUNT) -> pd.DataFrame:
+        if since is None:
+            params = {"granularity": granularity, "price": "M", "count": min(count, OANDA_MAX_COUNT)}
+            return self._to_frame(self._request(instrument, params))
+
+        # Page forward from `since` until a short page (caught up)
+        frames = []
+        cursor = pd.Timestamp(since)
+        while True:
+            params = {
+                "granularity": granularity,
+                "price": "M",
+                "from": cursor.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                "count": OANDA_MAX_COUNT,
+            }
+            candles = self._request(instrument, params)
+            frame = self._to_frame(candles)
+            frames.append(frame)
+            if len(candles) < OANDA_MAX_COUNT or frame.empty:
+                break
+            cursor = frame["time"].iloc[-1] + pd.Timedelta(seconds=granularity_seconds(granularity))
+        return pd.concat(frames, ignore_index=True)
+
+
+class ReplayCandleSource(CandleSource):
+    """
+    Serves candles from a CSV/DataFrame as if they were arriving live:
+    a bar is returned once clock() has passed its close time.
+    """
+
+    def __init__(self, candles: Union[str, Path, pd.DataFrame],
+                 clock: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            candles: Candle CSV path or DataFrame (time, open, high, low, close[, volume])
+            clock: Epoch-seconds clock; None releases every bar
+        """
+        df = pd.read_csv(candles) if isinstance(candles, (str, Path)) else candles.copy()
+        df["time"] = pd.to_datetime(df["time"], utc=True)
+        if "volume" not in df.columns:
+            df["volume"] = 0
+        self.df = df[CANDLE_COLUMNS].sort_values("time").reset_index(drop=True)
+        self.clock = clock
+
+    def fetch(self, instrument: str, granularity: str, since: Optional[pd.Timestamp] = None,
+              count: int = DEFAULT_BACKFILL_COUNT) -> pd.DataFrame:
+        df = self.df
+        if self.clock is not None:
+            period = pd.Timedelta(seconds=granularity_seconds(granularity))
+            df = df[df["time"] + period <= pd.Timestamp(self.clock(), unit="s", tz="UTC")]
+        if since is None:
+            return df.tail(count).reset_index(drop=True)
+        return df[df["time"] >= pd.Timestamp(since)].reset_index(drop=True)
+
+
+# ------------- Gap detection ------------- #
+
+def _market_closed(ts: pd.Timestamp) -> bool:
+    """FX weekend: Friday ~21:00 UTC to Sunday ~21:00 UTC (with DST slack)."""
+    weekday, hour = ts.weekday(), ts.hour
+    return weekday == 5 or (weekday == 4 and hour >= 20) or (weekday == 6 and hour < 23)
+
+
+def find_gaps(time_ns: np.ndarray, granularity: str) -> List[Tuple[pd.Timestamp, pd.Timestamp, int]]:
+    """
+    Missing bars in a sorted time sequence, ignoring weekend market closure.
+
+    Returns:
+        (last bar before gap, first bar after gap, missing bar count) tuples
+    """
+    period_ns = granularity_seconds(granularity) * 1_000_000_000
+    times = np.asarray(time_ns, dtype=np.int64)
+    if len(times) < 2:
+        return []
+
+    gaps = []
+    for i in np.flatnonzero(np.diff(times) > period_ns):
+        before = pd.Timestamp(int(times[i]), tz="UTC")
+        after = pd.Timestamp(int(times[i + 1]), tz="UTC")
+        first_missing = before + pd.Timedelta(granularity_seconds(granularity), unit="s")
+        last_missing = after - pd.Timedelta(granularity_seconds(granularity), unit="s")
+        if _market_closed(first_missing) and _market_closed(last_missing) \
+                and after - before <= pd.Timedelta(days=3):
+            continue
+        gaps.append((before, after, int((times[i + 1] - times[i]) // period_ns) - 1))
+    return gaps
+
+
+# ------------- Ingestor ------------- #
+
+@dataclass
+class IngestResult:
+    instrument: str
+    granularity: str
+    fetched: int = 0
+    appended: int = 0
+    updated: int = 0
+    gaps: List[Tuple[pd.Timestamp, pd.Timestamp, int]] = field(default_factory=list)
+    last_time: Optional[pd.Timestamp] = None
+    elapsed_ms: float = 0.0
+
+
+class CandleIngestor:
+    """Keeps one instrument's candle stores up to date from a source."""
+
+    def __init__(self, instrument: str, source: CandleSource,
+                 granularities: Tuple[str, ...] = ("H1",),
+                 root_dir: Union[str, Path] = DEFAULT_STORE_DIR,
+                 backfill_count: int = DEFAULT_BACKFILL_COUNT):
+        """
+        Args:
+            instrument: OANDA instrument (e.g. "EUR_USD")
+            source: Where candles come from
+            granularities: Stores to maintain (e.g. ("H1", "M1"))
+            root_dir: Candle store root
+            backfill_count: Bars fetched when a store is still empty
+        """
+        self.instrument = instrument
+        self.source = source
+        self.granularities = tuple(granularities)
+        self.backfill_count = backfill_count
+        self.stores = {gran: CandleStore(instrument, gran, root_dir) for gran in self.granularities}
+
+    def ingest(self, granularity: str) -> IngestResult:
+        """Fetch and upsert new completed bars for one granularity."""
+        started = time.perf_counter()
+        store = self.stores[granularity]
+        store.refresh()
+        result = IngestResult(self.instrument, granularity)
+
+        last = store.last_time()
+        bars = self.source.fetch(self.instrument, granularity, since=last, count=self.backfill_count)
+        result.fetched = len(bars)
+
+        if len(bars):
+            # Gaps are checked across the join with the stored history too
+            new_times = to_time_ns(bars["time"])
+            check = new_times if last is None else np.concatenate(([last.value], new_times[new_times > last.value]))
+            result.gaps = find_gaps(check, granularity)
+            result.appended, result.updated = store.upsert_frame(bars)
+
+        result.last_time = store.last_time()
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+
+        for before, after, missing in result.gaps:
+            logger.warning(f"⚠️ {self.instrument} {granularity}: {missing} bar(s) missing between "
+                           f"{before} and {after}")
+        if result.appended or result.updated:
+            logger.info(f"📥 {self.instrument} {granularity}: +{result.appended} new, {result.updated} revised "
+                        f"(last bar {result.last_time}, {result.elapsed_ms:.0f} ms)")
+        return result
+
+    def run_once(self) -> List[IngestResult]:
+        """Ingest every configured granularity; a failing one does not stop the others."""
+        results = []
+        for granularity in self.granularities:
+            try:
+                results.append(self.ingest(granularity))
+            except Exception as e:
+                logger.error(f"❌ {self.instrument} {granularity} ingestion failed: {e}")
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append completed candles to the candle store")
+    parser.add_argument("--instrument", required=True, help="e.g. EUR_USD")
+    parser.add_argument("--granularity", nargs="+", default=["H1"], help="e.g. H1 M1")
+    parser.add_argument("--root", default=str(DEFAULT_STORE_DIR), help="Store root directory")
+    parser.add_argument("--replay", help="Ingest from a candle CSV instead of OANDA")
+    parser.add_argument("--mode", default=os.getenv("OANDA_ENV", "practice"), help="OANDA practice/live")
+    parser.add_argument("--backfill", type=int, default=DEFAULT_BACKFILL_COUNT,
+                        help="Bars to fetch when a store is empty")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+
+    source = ReplayCandleSource(args.replay) if args.replay else OandaCandleSource(mode=args.mode)
+    ingestor = CandleIngestor(args.instrument, source, tuple(args.granularity), args.root, args.backfill)
+    for result in ingestor.run_once():
+        print(f"{result.instrument} {result.granularity}: fetched={result.fetched} appended={result.appended} "
+              f"updated={result.updated} gaps={len(result.gaps)} last={result.last_time}")
+
+
+if __name__ == "__main__":
+    main()
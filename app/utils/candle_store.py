@@ -0,0 +1,379 @@
+"""
+Columnar Candle Store
+Memory-mapped, column-per-file storage for OHLC candles.
+
+Each instrument/granularity lives in its own directory:
+
+    <root>/EUR_USD_H1/
+        meta.json     - row count and column dtypes
+        time.bin      - int64 nanoseconds since epoch (UTC)
+        open.bin      - float64
+        high.bin      - float64
+        low.bin       - float64
+        close.bin     - float64
+        volume.bin    - int64
+
+Reads return numpy memmap views, so slicing 20 years of history is zero-copy.
+The row count in meta.json is only advanced after the column data has been
+written, so readers never see a partially appended bar. One writer per store.
+upsert() makes re-writing overlapping batches idempotent: known bars are
+rewritten in place only if their values changed, newer bars are appended.
+
+Usage:
+    python3 -m app.utils.candle_store convert data/h1_data/EUR_USD_H1_20051202_to_20251127.csv \\
+        --instrument EUR_USD --granularity H1
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path("/home/myalgo/algo-trader/data/candle_store")
+
+STORE_VERSION = 1
+
+COLUMNS = {
+    "time": np.dtype("int64"),
+    "open": np.dtype("float64"),
+    "high": np.dtype("float64"),
+    "low": np.dtype("float64"),
+    "close": np.dtype("float64"),
+    "volume": np.dtype("int64"),
+}
+
+PRICE_COLUMNS = ["open", "high", "low", "close"]
+
+
+def to_time_ns(values) -> np.ndarray:
+    """Convert timestamps (strings, datetimes, datetime64) to int64 UTC nanoseconds."""
+    times = pd.to_datetime(values, utc=True)
+    return np.asarray(pd.DatetimeIndex(times).asi8, dtype=np.int64)
+
+
+class CandleStore:
+    """Append-only columnar candle store backed by memory-mapped files."""
+
+    def __init__(self, instrument: str, granularity: str = "H1",
+                 root_dir: Union[str, Path] = DEFAULT_STORE_DIR):
+        self.instrument = instrument
+        self.granularity = granularity
+        self.path = Path(root_dir) / f"{instrument}_{granularity}"
+        self._length: Optional[int] = None
+        self._maps: Dict[str, np.memmap] = {}
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = self._read_meta().get("length", 0) if self.exists() else 0
+        return self._length
+
+    def __repr__(self):
+        return f"<CandleStore({self.instrument} {self.granularity}, rows={len(self)}, path={self.path})>"
+
+    # ------------- Metadata ------------- #
+
+    @property
+    def meta_file(self) -> Path:
+        return self.path / "meta.json"
+
+    def exists(self) -> bool:
+        return self.meta_file.exists()
+
+    def _read_meta(self) -> dict:
+        with open(self.meta_file, "r") as f:
+            return json.load(f)
+
+    def _write_meta(self, length: int):
+        meta = {
+            "version": STORE_VERSION,
+            "instrument": self.instrument,
+            "granularity": self.granularity,
+            "length": length,
+            "columns": {name: dtype.str for name, dtype in COLUMNS.items()},
+        }
+        tmp_file = self.meta_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(meta, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.meta_file)
+
+    def refresh(self):
+        """Re-read the row count (picks up bars appended by another process)."""
+        self._length = None
+        self._maps = {}
+
+    # ------------- Reads (zero-copy) ------------- #
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memmap view of one column."""
+        length = len(self)
+        if length == 0:
+            return np.empty(0, dtype=COLUMNS[name])
+        if name not in self._maps:
+            self._maps[name] = np.memmap(self.path / f"{name}.bin", dtype=COLUMNS[name],
+                                         mode="r", shape=(length,))
+        return self._maps[name]
+
+    def columns(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Views of all columns for rows [start, stop)."""
+        return {name: self.column(name)[start:stop] for name in COLUMNS}
+
+    def tail(self, count: int) -> Dict[str, np.ndarray]:
+        """Views of the last `count` rows."""
+        return self.columns(max(len(self) - count, 0))
+
+    def range(self, start=None, end=None) -> Dict[str, np.ndarray]:
+        """
+        Views of rows with start <= time < end.
+
+        Args:
+            start: Inclusive start (anything pd.to_datetime accepts, or int ns)
+            end: Exclusive end
+        """
+        times = self.column("time")
+        lo = 0 if start is None else int(np.searchsorted(times, self._as_ns(start), side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, self._as_ns(end), side="left"))
+        return self.columns(lo, hi)
+
+    @staticmethod
+    def _as_ns(value) -> int:
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        return int(to_time_ns([value])[0])
+
+    @staticmethod
+    def to_frame(arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Materialize column views as a DataFrame (time as UTC datetimes)."""
+        data = {name: np.array(values) for name, values in arrays.items()}
+        data["time"] = pd.to_datetime(data["time"], utc=True)
+        return pd.DataFrame(data)
+
+    def tail_frame(self, count: int) -> pd.DataFrame:
+        return self.to_frame(self.tail(count))
+
+    def range_frame(self, start=None, end=None) -> pd.DataFrame:
+        return self.to_frame(self.range(start, end))
+
+    def last_time(self) -> Optional[pd.Timestamp]:
+        if len(self) == 0:
+            return None
+        return pd.Timestamp(int(self.column("time")[-1]), tz="UTC")
+
+    # ------------- Writes ------------- #
+
+    @staticmethod
+    def _as_arrays(time_ns, open_, high, low, close, volume=None) -> Dict[str, np.ndarray]:
+        arrays = {
+            "time": np.asarray(time_ns, dtype=COLUMNS["time"]),
+            "open": np.asarray(open_, dtype=COLUMNS["open"]),
+            "high": np.asarray(high, dtype=COLUMNS["high"]),
+            "low": np.asarray(low, dtype=COLUMNS["low"]),
+            "close": np.asarray(close, dtype=COLUMNS["close"]),
+        }
+        count = len(arrays["time"])
+        arrays["volume"] = (np.zeros(count, dtype=COLUMNS["volume"]) if volume is None
+                            else np.asarray(volume, dtype=COLUMNS["volume"]))
+        if any(len(values) != count for values in arrays.values()):
+            raise ValueError("All columns must have the same length")
+        return arrays
+
+    def append(self, time_ns, open_, high, low, close, volume=None) -> int:
+        """
+        Append bars newer than the last stored bar.
+
+        Args:
+            time_ns: int64 UTC nanoseconds, strictly increasing
+            open_, high, low, close: float prices
+            volume: int volumes (zeros if omitted)
+
+        Returns:
+            Number of bars appended
+        """
+        arrays = self._as_arrays(time_ns, open_, high, low, close, volume)
+        count = len(arrays["time"])
+        if count == 0:
+            return 0
+        if np.any(np.diff(arrays["time"]) <= 0):
+            raise ValueError("Bar times must be strictly increasing")
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        length = len(self)
+        if length and arrays["time"][0] <= self.column("time")[-1]:
+            raise ValueError(
+                f"Bar at {pd.Timestamp(int(arrays['time'][0]), tz='UTC')} is not newer than "
+                f"last stored bar {self.last_time()}"
+            )
+
+        for name, values in arrays.items():
+            col_file = self.path / f"{name}.bin"
+            with open(col_file, "ab") as f:
+                # Drop bytes from an append that never reached meta.json
+                f.truncate(length * COLUMNS[name].itemsize)
+                f.write(values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        self._write_meta(length + count)
+        self.refresh()
+        logger.debug(f"Appended {count} bar(s) to {self.path.name} (rows={length + count})")
+        return count
+
+    def append_frame(self, df: pd.DataFrame) -> int:
+        """Append a candle DataFrame (time, open, high, low, close[, volume])."""
+        return self.append(
+            to_time_ns(df["time"]),
+            df["open"].to_numpy(), df["high"].to_numpy(),
+            df["low"].to_numpy(), df["close"].to_numpy(),
+            df["volume"].to_numpy() if "volume" in df.columns else None,
+        )
+
+    def upsert(self, time_ns, open_, high, low, close, volume=None) -> Tuple[int, int]:
+        """
+        Idempotent write: bars already stored are overwritten only if their
+        values changed, newer bars are appended. Safe to call repeatedly with
+        overlapping batches (e.g. re-fetching the last few candles).
+
+        Bars older than the last stored bar that are not already in the store
+        cannot be inserted (the store is append-only) and are skipped.
+
+        Returns:
+            (appended, updated) bar counts
+        """
+        arrays = self._as_arrays(time_ns, open_, high, low, close, volume)
+        if len(arrays["time"]) == 0:
+            return 0, 0
+
+        # Sort, keeping the last copy of any time repeated within the batch
+        order = np.argsort(arrays["time"], kind="stable")
+        keep = np.append(np.diff(arrays["time"][order]) != 0, True)
+        arrays = {name: values[order][keep] for name, values in arrays.items()}
+
+        length = len(self)
+        existing = np.zeros(len(arrays["time"]), dtype=bool)
+        updated = 0
+        if length:
+            times = self.column("time")
+            existing = arrays["time"] <= times[-1]
+            old = {name: values[existing] for name, values in arrays.items()}
+            rows = np.searchsorted(times, old["time"])
+            found = times[rows] == old["time"]  # rows < length since time <= last
+            if not found.all():
+                logger.warning(f"Skipping {int((~found).sum())} bar(s) older than the last stored bar "
+                               f"in {self.path.name} (store is append-only)")
+
+            rows = rows[found]
+            changed = np.zeros(len(rows), dtype=bool)
+            for name in PRICE_COLUMNS + ["volume"]:
+                changed |= self.column(name)[rows] != old[name][found]
+
+            if changed.any():
+                rows = rows[changed]
+                for name in PRICE_COLUMNS + ["volume"]:
+                    col = np.memmap(self.path / f"{name}.bin", dtype=COLUMNS[name], mode="r+", shape=(length,))
+                    col[rows] = old[name][found][changed]
+                    col.flush()
+                    del col
+                updated = len(rows)
+                self.refresh()
+                logger.debug(f"Updated {updated} bar(s) in {self.path.name}")
+
+        new = ~existing
+        appended = self.append(*(arrays[name][new] for name in COLUMNS)) if new.any() else 0
+        return appended, updated
+
+    def upsert_frame(self, df: pd.DataFrame) -> Tuple[int, int]:
+        """upsert() a candle DataFrame (time, open, high, low, close[, volume])."""
+        return self.upsert(
+            to_time_ns(df["time"]),
+            df["open"].to_numpy(), df["high"].to_numpy(),
+            df["low"].to_numpy(), df["close"].to_numpy(),
+            df["volume"].to_numpy() if "volume" in df.columns else None,
+        )
+
+    @classmethod
+    def from_csv(cls, csv_path: Union[str, Path], instrument: str, granularity: str = "H1",
+                 root_dir: Union[str, Path] = DEFAULT_STORE_DIR,
+                 chunksize: int = 500_000) -> "CandleStore":
+        """
+        Convert a candle CSV into a new store (sorted and de-duplicated by time).
+
+        A time-sorted file is streamed: each chunk of `chunksize` rows is
+        written as it is read, so memory stays at one chunk. If a chunk starts
+        before the last stored bar the file is not sorted; the partial store is
+        discarded and the file is converted with a full read + sort instead.
+
+        Raises:
+            FileExistsError: if the store already has data
+        """
+        store = cls(instrument, granularity, root_dir)
+        if len(store):
+            raise FileExistsError(f"Candle store already exists: {store.path}")
+
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            chunk = _sorted_candles(chunk)
+            last = store.last_time()
+            if last is not None and len(chunk) and chunk["time"].iloc[0] < last:
+                logger.warning(f"{Path(csv_path).name} is not time-sorted, converting with a full read")
+                shutil.rmtree(store.path)
+                store.refresh()
+                store.append_frame(_sorted_candles(pd.read_csv(csv_path)))
+                break
+            store.upsert_frame(chunk)  # a bar repeated across the chunk boundary is overwritten
+
+        logger.info(f"Converted {csv_path} → {store.path} ({len(store)} bars)")
+        return store
+
+
+def _sorted_candles(df: pd.DataFrame) -> pd.DataFrame:
+    """Candle frame with UTC times, sorted by time, keeping the last row per time."""
+    df["time"] = pd.to_datetime(df["time"], utc=True)
+    return df.sort_values("time", kind="stable").drop_duplicates("time", keep="last")
+
+
+def open_store(instrument: str, granularity: str = "H1",
+               root_dir: Union[str, Path] = DEFAULT_STORE_DIR) -> Optional[CandleStore]:
+    """Return the store for an instrument if it has been created, else None."""
+    store = CandleStore(instrument, granularity, root_dir)
+    return store if store.exists() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar candle store tools")
+    parser.add_argument("--root", default=str(DEFAULT_STORE_DIR), help="Store root directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("convert", help="Convert a candle CSV into a store")
+    convert.add_argument("csv_path")
+    convert.add_argument("--instrument", required=True, help="e.g. EUR_USD")
+    convert.add_argument("--granularity", default="H1", help="e.g. H1, M1")
+
+    info = sub.add_parser("info", help="Show store size and time range")
+    info.add_argument("--instrument", required=True)
+    info.add_argument("--granularity", default="H1")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+
+    if args.command == "convert":
+        store = CandleStore.from_csv(args.csv_path, args.instrument, args.granularity, args.root)
+    else:
+        store = CandleStore(args.instrument, args.granularity, args.root)
+
+    times = store.column("time")
+    print(store)
+    if len(times):
+        print(f"  From: {pd.Timestamp(int(times[0]), tz='UTC')}")
+        print(f"  To:   {pd.Timestamp(int(times[-1]), tz='UTC')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Tail-seek CSV loader
+Reads only the last N rows of a large, time-sorted candle CSV by seeking from
+the end of the file, so load cost stays constant as history grows.
+"""
+
+import io
+import logging
+import os
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024
+
+
+def _read_csv_full(path: Path, count: int, time_column: str) -> pd.DataFrame:
+    """Full read + sort (fallback for files that are not time-sorted)."""
+    df = pd.read_csv(path)
+    df[time_column] = pd.to_datetime(df[time_column])
+    df = df.sort_values(time_column)
+    df = df.tail(count)
+    return df.reset_index(drop=True)
+
+
+def _read_tail_lines(path: Path, count: int, block_size: int):
+    """Return (header, first data line, last `count` data lines) as bytes."""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        first_line = f.readline()
+
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        chunks = []
+        newlines = 0
+        # One extra newline so the oldest line we keep is never a partial one
+        while pos > data_start and newlines <= count:
+            read_size = min(block_size, pos - data_start)
+            pos -= read_size
+            f.seek(pos)
+            chunk = f.read(read_size)
+            chunks.append(chunk)
+            newlines += chunk.count(b'\n')
+
+    lines = b''.join(reversed(chunks)).splitlines()
+    if pos > data_start and lines:
+        lines = lines[1:]  # partial line at the seek boundary
+    lines = [line for line in lines if line.strip()]
+    return header, first_line, lines[-count:]
+
+
+def read_csv_tail(path: Union[str, Path], count: int, time_column: str = 'time',
+                  block_size: int = BLOCK_SIZE) -> pd.DataFrame:
+    """
+    Load the most recent `count` rows of a time-sorted CSV.
+
+    Only the tail of the file is read and parsed. If the tail is not in time
+    order, or starts before the first row of the file, the file is not sorted
+    and we fall back to a full read + sort.
+
+    Args:
+        path: CSV file with a header row
+        count: Number of rows to return
+        time_column: Name of the timestamp column (default: 'time')
+        block_size: Bytes read per backwards seek
+
+    Returns:
+        DataFrame of the last `count` rows, time parsed, index reset
+    """
+    path = Path(path)
+    if count <= 0:
+        return pd.read_csv(path, nrows=0)
+
+    header, first_line, lines = _read_tail_lines(path, count, block_size)
+    if not lines:
+        return _read_csv_full(path, count, time_column)
+
+    header = header.rstrip(b'\r\n') + b'\n'
+    df = pd.read_csv(io.BytesIO(header + b'\n'.join(lines)))
+    df[time_column] = pd.to_datetime(df[time_column])
+
+    first_time = pd.to_datetime(pd.read_csv(io.BytesIO(header + first_line))[time_column].iloc[0])
+    if not df[time_column].is_monotonic_increasing or first_time > df[time_column].iloc[0]:
+        logger.warning(f"{path.name} is not time-sorted, falling back to full read")
+        return _read_csv_full(path, count, time_column)
+
+    return df.reset_index(drop=True)
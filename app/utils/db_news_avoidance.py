@@ -0,0 +1,412 @@
+"""
+Database News Avoidance Service
+News avoidance on the red_folder_events table instead of the JSON file.
+
+- Events live in red_folder_events (indexed on currency, event_time), settings
+  in system_settings under the "news_avoidance" key
+- Writes are single-row INSERT/DELETE statements (bulk imports one executemany),
+  not a rewrite of the whole calendar
+- Each process keeps the same in-memory NewsCalendar index as the file service
+  (both extend NewsAvoidanceBase).
+  On Postgres a background thread LISTENs on the "red_folder_events" channel
+  (notified by the table trigger and by settings updates) and the index is
+  reloaded only after a notification, so checks never query the database.
+  Without LISTEN (other dialects, or listen=False) a cheap change marker
+  (row count, max id, max updated_at, settings timestamp) is polled at most
+  every poll_seconds
+
+Select it for the shared instance with NEWS_AVOIDANCE_BACKEND=db.
+
+Usage:
+    from app.utils.db_news_avoidance import DbNewsAvoidanceService
+
+    service = DbNewsAvoidanceService()
+    service.import_json_file("/home/myalgo/algo-trader/data/news_events.json")
+    service.should_avoid_trading("GBP_USD")
+"""
+
+import json
+import logging
+import select
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select as sa_select, text
+
+from app.models.red_folder_event import RedFolderEvent
+from app.models.system_settings import SystemSettings
+from app.utils.news_calendar import NewsCalendar, parse_event_time
+from app.utils.simple_news_avoidance import NewsAvoidanceBase
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel (see the red_folder_events trigger migration)
+NEWS_CHANNEL = "red_folder_events"
+# system_settings key holding the avoidance settings as JSON
+SETTINGS_KEY = "news_avoidance"
+# Change-marker poll interval when LISTEN is unavailable
+DEFAULT_POLL_SECONDS = 5.0
+
+DEFAULT_SETTINGS = {"minutes_before": 30, "minutes_after": 60, "minutes_before_close": 3, "enabled": True}
+
+
+def _to_db_time(value: datetime) -> datetime:
+    """Aware or naive (UTC) datetime → naive UTC, as stored in red_folder_events."""
+    return parse_event_time(value).replace(tzinfo=None)
+
+
+def _row_to_event(row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "currency": row.currency,
+        "event_time": parse_event_time(row.event_time),
+        "impact": row.impact,
+        "created_at": row.created_at,
+    }
+
+
+class DbNewsAvoidanceService(NewsAvoidanceBase):
+    """News avoidance backed by red_folder_events with a LISTEN/NOTIFY-invalidated cache."""
+
+    def __init__(self,
+                 session_factory=None,
+                 minutes_before: int = 30,
+                 minutes_after: int = 60,
+                 minutes_before_close: int = 3,
+                 watch_file: bool = True,
+                 listen: bool = True,
+                 poll_seconds: float = DEFAULT_POLL_SECONDS):
+        """
+        Args:
+            session_factory: Sync sessionmaker (default: app.db.db.SyncSessionLocal)
+            minutes_before, minutes_after, minutes_before_close: Defaults until
+                settings are stored in system_settings
+            watch_file: Check for changes on every query (cheap with LISTEN);
+                False: only refresh() reloads (AsyncNewsAvoidance)
+            listen: LISTEN for change notifications when the database is Postgres
+            poll_seconds: Minimum interval between change-marker queries without LISTEN
+        """
+        super().__init__(minutes_before, minutes_after, minutes_before_close, watch_file)
+        if session_factory is None:
+            from app.db.db import SyncSessionLocal
+            session_factory = SyncSessionLocal
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+
+        # Bumped by the listener thread on every notification
+        self._version = 0
+        self._loaded_version = -1
+        self._last_poll = 0.0
+        self._listener: Optional[threading.Thread] = None
+        self._stop_listening = threading.Event()
+
+        bind = self.session_factory.kw.get("bind")
+        self.listening = listen and bind is not None and bind.dialect.name == "postgresql"
+        if self.listening:
+            self._start_listener(bind)
+
+        logger.info(f"Database news avoidance service initialized "
+                    f"({'LISTEN/NOTIFY' if self.listening else f'polling every {poll_seconds:g}s'})")
+
+    # ---- change notifications ----
+
+    def _start_listener(self, engine):
+        self._listener = threading.Thread(target=self._listen, args=(engine,),
+                                          name="news-calendar-listener", daemon=True)
+        self._listener.start()
+
+    def _listen(self, engine):
+        """LISTEN loop: bump the version on every notification; reconnect on errors."""
+        while not self._stop_listening.is_set():
+            conn = None
+            try:
+                conn = engine.raw_connection()
+                dbapi_conn = conn.driver_connection
+                dbapi_conn.autocommit = True
+                with dbapi_conn.cursor() as cur:
+                    cur.execute(f"LISTEN {NEWS_CHANNEL}")
+                self._version += 1  # notifications may have been missed while disconnected
+                while not self._stop_listening.is_set():
+                    if select.select([dbapi_conn], [], [], 1.0)[0]:
+                        dbapi_conn.poll()
+                        if dbapi_conn.notifies:
+                            dbapi_conn.notifies.clear()
+                            self._version += 1
+            except Exception as e:
+                logger.error(f"News calendar listener error: {e}, reconnecting")
+                self._stop_listening.wait(5)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def close(self):
+        """Stop the listener thread."""
+        self._stop_listening.set()
+        if self._listener:
+            self._listener.join(timeout=5)
+
+    def _notify(self, session):
+        if self.listening:
+            session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                            {"channel": NEWS_CHANNEL, "payload": "changed"})
+
+    # ---- loading ----
+
+    def _marker(self, session) -> tuple:
+        """Changes on every insert, delete and update of the events or the settings row."""
+        count, max_id, updated_at = session.execute(sa_select(
+            func.count(RedFolderEvent.id), func.max(RedFolderEvent.id), func.max(RedFolderEvent.updated_at))).one()
+        settings_at = session.execute(sa_select(SystemSettings.updated_at)
+                                      .where(SystemSettings.key == SETTINGS_KEY)).scalar_one_or_none()
+        return count, max_id, updated_at, settings_at
+
+    def _load_settings(self, session) -> Dict[str, Any]:
+        value = session.execute(sa_select(SystemSettings.value)
+                                .where(SystemSettings.key == SETTINGS_KEY)).scalar_one_or_none()
+        settings = dict(DEFAULT_SETTINGS, minutes_before=self.minutes_before, minutes_after=self.minutes_after,
+                        minutes_before_close=self.minutes_before_close)
+        if value:
+            try:
+                settings.update(json.loads(value))
+            except ValueError as e:
+                logger.error(f"Invalid news avoidance settings in system_settings: {e}")
+        return settings
+
+    def refresh(self) -> bool:
+        """
+        Reload events and settings if the table changed since the last load.
+
+        With LISTEN every notification (or own write) reloads; a notification
+        can stand for an UPDATE the change marker would not reveal. Otherwise
+        the marker is polled at most every poll_seconds.
+
+        Returns:
+            True if the index was rebuilt
+        """
+        if self._calendar is not None:
+            if self.listening:
+                if self._version == self._loaded_version:
+                    return False
+            elif time.monotonic() - self._last_poll < self.poll_seconds and self._calendar_key is not None:
+                return False
+
+        version = self._version
+        session = self.session_factory()
+        try:
+            key = self._marker(session)
+            self._last_poll = time.monotonic()
+            if self._calendar is not None and not self.listening and key == self._calendar_key:
+                return False
+            rows = session.execute(sa_select(RedFolderEvent).where(RedFolderEvent.impact == "high")
+                                   .order_by(RedFolderEvent.event_time)).scalars().all()
+            settings = self._load_settings(session)
+        finally:
+            session.close()
+
+        self._calendar = NewsCalendar(_row_to_event(row) for row in rows)
+        self._settings = settings
+        self._enabled = settings.get("enabled", True)
+        self.minutes_before = settings["minutes_before"]
+        self.minutes_after = settings["minutes_after"]
+        self.minutes_before_close = settings["minutes_before_close"]
+        self._calendar_key = key
+        self._loaded_version = version
+        self.calendar_reloads += 1
+        logger.debug(f"News calendar reloaded from database: {len(self._calendar)} high-impact events")
+        return True
+
+    def _invalidate(self):
+        """Force a reload on the next check (own writes, before the notification arrives)."""
+        self._calendar_key = None
+        self._version += 1
+
+    # ---- writes ----
+
+    def add_news_event(self,
+                       title: str,
+                       currency: str,
+                       event_time: datetime,
+                       impact: str = "high",
+                       created_by: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Add a news event (one INSERT).
+
+        Args:
+            title: Event title (e.g., "Non-Farm Payrolls")
+            currency: Currency affected (e.g., "USD")
+            event_time: When the event occurs (naive = UTC)
+            impact: Impact level ("high", "medium", "low")
+            created_by: Admin user id
+
+        Returns:
+            Created event dictionary
+        """
+        session = self.session_factory()
+        try:
+            row = RedFolderEvent(title=title, currency=currency.upper(), event_time=_to_db_time(event_time),
+                                 impact=impact, created_by=created_by, created_at=datetime.utcnow())
+            session.add(row)
+            session.flush()
+            self._notify(session)
+            session.commit()
+            event = _row_to_event(row)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error adding news event: {e}")
+            raise
+        finally:
+            session.close()
+        self._invalidate()
+        logger.info(f"Added news event: {title} at {event_time} for {currency}")
+        return event
+
+    def delete_news_event(self, event_id: int) -> bool:
+        """
+        Delete a news event by ID.
+
+        Returns:
+            True if deleted, False if not found
+        """
+        session = self.session_factory()
+        try:
+            deleted = session.execute(delete(RedFolderEvent).where(RedFolderEvent.id == event_id)).rowcount
+            if deleted:
+                self._notify(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error deleting news event: {e}")
+            return False
+        finally:
+            session.close()
+        if not deleted:
+            logger.warning(f"News event with ID {event_id} not found")
+            return False
+        self._invalidate()
+        logger.info(f"Deleted news event with ID: {event_id}")
+        return True
+
+    def import_events(self, events: Iterable[Dict[str, Any]], created_by: Optional[int] = None,
+                      skip_existing: bool = True) -> Dict[str, int]:
+        """
+        Bulk insert calendar events in one transaction (one notification).
+
+        Args:
+            events: Dicts with title, currency, event_time (datetime or stored
+                string; naive = UTC) and optional impact (default "high")
+            created_by: Admin user id recorded on the rows
+            skip_existing: Skip events whose (currency, event_time, title) is
+                already stored (re-importing a calendar is a no-op)
+
+        Returns:
+            {"inserted": n, "skipped": n}; skipped counts repeats within the
+            batch as well as stored events, like the file backend
+        """
+        rows, seen = [], set()
+        skipped = 0
+        now = datetime.utcnow()
+        for event in events:
+            key = (event["currency"].upper(), _to_db_time(parse_event_time(event["event_time"])), event["title"])
+            if key in seen:
+                skipped += 1
+                continue
+            seen.add(key)
+            rows.append({"currency": key[0], "event_time": key[1], "title": key[2],
+                         "impact": event.get("impact") or "high", "created_by": created_by, "created_at": now})
+        if not rows:
+            return {"inserted": 0, "skipped": skipped}
+
+        session = self.session_factory()
+        try:
+            if skip_existing:
+                times = [r["event_time"] for r in rows]
+                existing = set(session.execute(
+                    sa_select(RedFolderEvent.currency, RedFolderEvent.event_time, RedFolderEvent.title)
+                    .where(RedFolderEvent.event_time.between(min(times), max(times)))
+                    .where(RedFolderEvent.currency.in_({r["currency"] for r in rows}))
+                ).all())
+                fresh = [r for r in rows if (r["currency"], r["event_time"], r["title"]) not in existing]
+                skipped += len(rows) - len(fresh)
+                rows = fresh
+            if rows:
+                session.execute(insert(RedFolderEvent), rows)
+                self._notify(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error importing news events: {e}")
+            raise
+        finally:
+            session.close()
+        if rows:
+            self._invalidate()
+        logger.info(f"Imported {len(rows)} news events ({skipped} duplicates or already stored)")
+        return {"inserted": len(rows), "skipped": skipped}
+
+    def import_json_file(self, data_file: str = "/home/myalgo/algo-trader/data/news_events.json") -> Dict[str, int]:
+        """
+        Move a SimpleNewsAvoidanceService JSON file into the database (events and settings).
+
+        Returns:
+            import_events() counts
+        """
+        with open(data_file) as f:
+            data = json.load(f)
+        counts = self.import_events(data.get("events", []))
+        settings = data.get("settings")
+        if settings and not self._stored_settings_exist():
+            self.update_settings(**{k: settings[k] for k in DEFAULT_SETTINGS if k in settings})
+        return counts
+
+    def _stored_settings_exist(self) -> bool:
+        session = self.session_factory()
+        try:
+            return session.get(SystemSettings, SETTINGS_KEY) is not None
+        finally:
+            session.close()
+
+    def update_settings(self, minutes_before: Optional[int] = None,
+                        minutes_after: Optional[int] = None,
+                        minutes_before_close: Optional[int] = None,
+                        enabled: Optional[bool] = None):
+        """
+        Update news avoidance settings (system_settings "news_avoidance").
+
+        Args:
+            minutes_before: Minutes before news to stop trading
+            minutes_after: Minutes after news to resume trading
+            minutes_before_close: Minutes before news to close positions
+            enabled: Whether news avoidance is enabled
+        """
+        changes = {k: v for k, v in (("minutes_before", minutes_before), ("minutes_after", minutes_after),
+                                     ("minutes_before_close", minutes_before_close), ("enabled", enabled))
+                   if v is not None}
+        session = self.session_factory()
+        try:
+            settings = self._load_settings(session)
+            settings.update(changes)
+            row = session.get(SystemSettings, SETTINGS_KEY)
+            if row is None:
+                session.add(SystemSettings(key=SETTINGS_KEY, value=json.dumps(settings), updated_at=datetime.utcnow()))
+            else:
+                row.value = json.dumps(settings)
+                row.updated_at = datetime.utcnow()
+            self._notify(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error updating settings: {e}")
+            raise
+        finally:
+            session.close()
+        for name, value in changes.items():
+            if name != "enabled":
+                setattr(self, name, value)
+        self._invalidate()
+        logger.info("News avoidance settings updated")
@@ -0,0 +1,103 @@
+"""
+Batched Ensemble Predictor
+Scores one feature row with every booster of the ML5 ensemble in a single pass.
+
+- Feature row is read straight from the column arrays; the last-valid-value
+  lookup for NaNs is a numpy scan instead of pd.isna()/last_valid_index()/df.loc.
+- One DMatrix is shared by all members (as before); feature names are now
+  validated once per loaded booster instead of on every predict call.
+- Members can optionally be fanned out over a thread pool (parallel=True; off
+  by default, it only pays off on multi-core hosts).
+"""
+
+import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+
+def build_feature_vector(df: pd.DataFrame, feature_cols: Sequence[str]) -> np.ndarray:
+    """
+    Feature row for the latest bar, shape (1, n_features).
+
+    NaNs in the latest row are replaced with the column's last valid value,
+    or 0.0 if the column has none (same rules as the original per-column loop).
+    """
+    columns = [df[col].to_numpy(dtype=np.float64, copy=False) for col in feature_cols]
+    features = np.array([values[-1] for values in columns], dtype=np.float64)
+
+    for i in np.flatnonzero(np.isnan(features)):
+        valid = np.flatnonzero(~np.isnan(columns[i]))
+        if len(valid):
+            features[i] = columns[i][valid[-1]]
+
+    features = features.reshape(1, -1)
+    if np.isnan(features).any():
+        logger.warning("Features still contain NaN after processing, filling with 0")
+        features = np.nan_to_num(features, nan=0.0)
+
+    return features
+
+
+class EnsemblePredictor:
+    """Runs all ensemble members on one feature row."""
+
+    def __init__(self, parallel: bool = False, max_workers: Optional[int] = None):
+        """
+        Args:
+            parallel: Score members concurrently in a thread pool
+            max_workers: Thread pool size (default: one per member, up to 8)
+        """
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._validated = weakref.WeakSet()
+
+    def _validate(self, model: xgb.Booster, feature_names: List[str]):
+        """Check a booster's feature names once, then skip per-call validation."""
+        if model in self._validated:
+            return
+        if model.feature_names is not None and list(model.feature_names) != feature_names:
+            raise ValueError(f"Model features {model.feature_names} do not match {feature_names}")
+        self._validated.add(model)
+
+    def predict(self, models: List[xgb.Booster], features: np.ndarray,
+                feature_names: Sequence[str]) -> np.ndarray:
+        """
+        Args:
+            models: Loaded ensemble boosters
+            features: Feature row, shape (1, n_features)
+            feature_names: Column names of the feature row (training order)
+
+        Returns:
+            Probability of price going UP from each member, in model order
+        """
+        feature_names = list(feature_names)
+        for model in models:
+            self._validate(model, feature_names)
+
+        dmatrix = xgb.DMatrix(features, feature_names=feature_names)
+
+        def predict_one(model: xgb.Booster) -> float:
+            return float(model.predict(dmatrix, validate_features=False)[0])
+
+        if self.parallel and len(models) > 1:
+            if self._executor is None:
+                workers = self.max_workers or min(len(models), 8)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ensemble")
+            predictions = list(self._executor.map(predict_one, models))
+        else:
+            predictions = [predict_one(model) for model in models]
+
+        return np.array(predictions, dtype=np.float64)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,70 @@
+"""
+Latest Signal Per Instrument
+One query for "the newest ml_signal_history row of every instrument", replacing
+SELECT DISTINCT instrument + one ORDER BY timestamp DESC LIMIT 1 per instrument.
+
+A recursive CTE walks the distinct instruments through the
+(instrument, timestamp DESC) index - each step is one min(instrument) > prev
+probe, a "loose index scan" - and each instrument's newest row id is another
+single index probe. Cost grows with the number of instruments, not with the
+history size. Plain SQL that runs on Postgres and SQLite alike.
+
+DISTINCT ON and a row_number() window return the same rows but read every
+index entry / row; they are kept for the benchmark comparison
+(scripts/bench_multisignals.py).
+
+Usage:
+    result = await db.execute(latest_signals_statement())
+    latest = {s.instrument: s for s in result.scalars().all()}
+"""
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import aliased
+
+from app.models.ml_signal_history import MLSignalHistory
+
+_LATEST_SQL = """
+WITH RECURSIVE instruments(instrument) AS (
+    SELECT min(instrument) FROM ml_signal_history
+    UNION ALL
+    SELECT (SELECT min(h.instrument) FROM ml_signal_history h WHERE h.instrument > i.instrument)
+    FROM instruments i
+    WHERE i.instrument IS NOT NULL
+)
+SELECT ml_signal_history.*
+FROM ml_signal_history
+WHERE ml_signal_history.id IN (
+    SELECT (SELECT h.id FROM ml_signal_history h
+            WHERE h.instrument = i.instrument
+            ORDER BY h.timestamp DESC
+            LIMIT 1)
+    FROM instruments i
+    WHERE i.instrument IS NOT NULL
+)
+ORDER BY ml_signal_history.instrument
+"""
+
+
+def latest_signals_statement():
+    """Statement selecting the newest MLSignalHistory per instrument, ordered by instrument."""
+    return select(MLSignalHistory).from_statement(text(_LATEST_SQL))
+
+
+def distinct_on_statement():
+    """DISTINCT ON (instrument) form (Postgres only)."""
+    return (select(MLSignalHistory)
+            .distinct(MLSignalHistory.instrument)
+            .order_by(MLSignalHistory.instrument, MLSignalHistory.timestamp.desc()))
+
+
+def window_statement():
+    """row_number() window form."""
+    ranked = select(
+        MLSignalHistory,
+        func.row_number().over(
+            partition_by=MLSignalHistory.instrument,
+            order_by=MLSignalHistory.timestamp.desc(),
+        ).label("rank"),
+    ).subquery()
+    latest = aliased(MLSignalHistory, ranked)
+    return select(latest).where(ranked.c.rank == 1).order_by(latest.instrument)
@@ -0,0 +1,164 @@
+"""
+Model Registry
+Keeps the XGBoost ensemble boosters loaded for the lifetime of a signal service.
+
+Boosters are deserialized once at startup. Each get_models() call stats the
+model files (cheap); if a file's mtime/size changed, its SHA-256 is compared
+and the ensemble is hot-reloaded only when the content actually differs.
+A failed reload (e.g. a file caught mid-copy) keeps serving the previous set.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEEDS = tuple(range(43, 48))  # Models are saved with seeds 43-47
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Loaded ensemble for one instrument, with file-change hot reload."""
+
+    def __init__(self, model_dir: Path, instrument: str, seeds: Sequence[int] = DEFAULT_SEEDS):
+        """
+        Args:
+            model_dir: Directory holding {instrument}_xgboost_seed{N}.json files
+            instrument: Instrument prefix of the model files (e.g. "EUR_USD")
+            seeds: Ensemble seeds to load (default: 43-47)
+        """
+        self.model_dir = Path(model_dir)
+        self.instrument = instrument
+        self.seeds = list(seeds)
+
+        self._lock = threading.Lock()
+        self._models: List[xgb.Booster] = []
+        self._files: List[Path] = []
+        self._stat_keys: Dict[Path, Tuple[int, int]] = {}
+        self._hashes: Dict[Path, str] = {}
+        self._load_seconds: Optional[float] = None
+        self._loaded_at: Optional[datetime] = None
+        self._reloads = 0
+
+    # ------------- Model files ------------- #
+
+    def ensemble_paths(self) -> List[Path]:
+        return [self.model_dir / f"{self.instrument}_xgboost_seed{seed}.json" for seed in self.seeds]
+
+    def single_model_path(self) -> Path:
+        return self.model_dir / f"{self.instrument}_xgboost.json"
+
+    def _current_files(self) -> List[Path]:
+        """Ensemble files if any exist, otherwise the single-model fallback."""
+        files = [path for path in self.ensemble_paths() if path.exists()]
+        if not files and self.single_model_path().exists():
+            files = [self.single_model_path()]
+        return files
+
+    @staticmethod
+    def _stat_key(path: Path) -> Tuple[int, int]:
+        st = path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    # ------------- Loading ------------- #
+
+    def load(self) -> List[xgb.Booster]:
+        """(Re)load all boosters from disk. Keeps the previous set on failure."""
+        with self._lock:
+            return self._load_locked()
+
+    def _load_locked(self) -> List[xgb.Booster]:
+        started = time.perf_counter()
+        files = self._current_files()
+        models = []
+        stat_keys = {}
+        hashes = {}
+
+        try:
+            for path in files:
+                stat_keys[path] = self._stat_key(path)
+                hashes[path] = _file_sha256(path)
+                model = xgb.Booster()
+                model.load_model(str(path))
+                models.append(model)
+                logger.debug(f"Loaded ensemble model: {path.name}")
+        except Exception as e:
+            logger.warning(f"Error loading models from {self.model_dir}: {e}; keeping {len(self._models)} loaded model(s)")
+            return self._models
+
+        if files and files[0] == self.single_model_path():
+            logger.info("Ensemble models not found, using single model")
+
+        if self._loaded_at is not None:
+            self._reloads += 1
+        self._models = models
+        self._files = files
+        self._stat_keys = stat_keys
+        self._hashes = hashes
+        self._load_seconds = time.perf_counter() - started
+        self._loaded_at = datetime.now(timezone.utc)
+
+        logger.info(f"Loaded {len(models)} {self.instrument} model(s) in {self._load_seconds * 1000:.1f} ms")
+        return self._models
+
+    def _changed_files(self) -> bool:
+        """True if the set of model files or any file's content changed."""
+        files = self._current_files()
+        if files != self._files:
+            return True
+
+        for path in files:
+            try:
+                stat_key = self._stat_key(path)
+            except FileNotFoundError:
+                return True
+            if stat_key == self._stat_keys.get(path):
+                continue
+            # Touched: only reload if the bytes actually differ
+            if _file_sha256(path) != self._hashes.get(path):
+                return True
+            self._stat_keys[path] = stat_key
+        return False
+
+    def get_models(self) -> List[xgb.Booster]:
+        """Loaded boosters, hot-reloading first if the model files changed."""
+        with self._lock:
+            if self._loaded_at is None:
+                return self._load_locked()
+            try:
+                if self._changed_files():
+                    logger.info(f"🔄 {self.instrument} model files changed, reloading ensemble")
+                    return self._load_locked()
+            except Exception as e:
+                logger.warning(f"Model change check failed: {e}")
+            return self._models
+
+    def stats(self) -> Dict:
+        """Loaded model set and load latency (for logs/health checks)."""
+        with self._lock:
+            return {
+                "instrument": self.instrument,
+                "model_dir": str(self.model_dir),
+                "ensemble_size": len(self._models),
+                "models": [
+                    {"file": path.name, "sha256": self._hashes.get(path, "")[:12]}
+                    for path in self._files
+                ],
+                "load_ms": round(self._load_seconds * 1000, 1) if self._load_seconds is not None else None,
+                "loaded_at": self._loaded_at.isoformat() if self._loaded_at else None,
+                "reloads": self._reloads,
+            }
@@ -0,0 +1,231 @@
+"""
+News Calendar Index
+In-memory, time-sorted index of news events for the news avoidance checks.
+
+Events are parsed once, normalized to UTC and kept sorted; high-impact events
+are additionally indexed per currency, so window queries ("any USD event
+between t0 and t1?") are two binary searches instead of a scan of the whole
+file.
+
+BlackoutTimeline compiles a calendar plus the avoidance settings into merged
+per-currency intervals:
+    blackout: [event - minutes_before, event + minutes_after]   no new trades
+    close:    [event - minutes_before_close, event)             flatten positions
+so a caller can ask when the state next changes (and sleep until then), and
+a backtest can mask a whole candle array with two searchsorted calls.
+
+Usage:
+    calendar = NewsCalendar(data["events"])
+    hits = calendar.window(start, end, currencies=["EUR", "USD"])
+
+    timeline = BlackoutTimeline(calendar, minutes_before=30, minutes_after=60, minutes_before_close=3)
+    timeline.next_transition(["GBP", "USD"], now)   # {"time": ..., "blackout": True, "close": False}
+    blocked = timeline.mask(["GBP", "USD"], candles["time"])
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def parse_event_time(value: Any) -> Optional[datetime]:
+    """
+    Stored event_time → timezone-aware UTC datetime.
+
+    Accepts "...Z", offset-aware ISO strings and naive ISO strings (stored as
+    UTC by the admin form), or datetimes (naive = UTC). Returns None for
+    anything else.
+    """
+    if isinstance(value, str):
+        if value.endswith('Z'):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        else:
+            value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class _Series:
+    """Events sorted by time with a parallel list of epoch seconds for bisect."""
+
+    __slots__ = ("times", "events")
+
+    def __init__(self, events: List[Dict[str, Any]]):
+        self.events = events
+        self.times = [e["event_time"].timestamp() for e in events]
+
+    def between(self, start: float, end: float, include_start: bool, include_end: bool) -> List[Dict[str, Any]]:
+        lo = (bisect_left if include_start else bisect_right)(self.times, start)
+        hi = (bisect_right if include_end else bisect_left)(self.times, end)
+        return self.events[lo:hi]
+
+
+class NewsCalendar:
+    """Sorted, currency-indexed view of high-impact news events."""
+
+    def __init__(self, events: Iterable[Dict[str, Any]], impact: str = "high"):
+        """
+        Args:
+            events: Event dicts (title, currency, event_time, impact, ...);
+                event_time may be a datetime or a stored string
+            impact: Impact level indexed (others are ignored by the checks)
+        """
+        indexed = []
+        for event in events:
+            if event.get("impact") != impact:
+                continue
+            try:
+                event_time = parse_event_time(event.get("event_time"))
+            except ValueError:
+                event_time = None
+            if event_time is None:
+                continue
+            indexed.append(dict(event, event_time=event_time))
+        indexed.sort(key=lambda e: e["event_time"])  # stable: ties keep file order
+
+        self.all = _Series(indexed)
+        by_currency: Dict[str, List[Dict[str, Any]]] = {}
+        for event in indexed:
+            by_currency.setdefault(event.get("currency"), []).append(event)
+        self.by_currency = {currency: _Series(evts) for currency, evts in by_currency.items()}
+
+    def __len__(self) -> int:
+        return len(self.all.events)
+
+    def window(self, start: datetime, end: datetime, currencies: Optional[List[str]] = None,
+               include_start: bool = True, include_end: bool = True) -> List[Dict[str, Any]]:
+        """
+        Indexed events with start <= event_time <= end, oldest first.
+
+        Args:
+            start, end: Aware datetimes bounding the window
+            currencies: Restrict to these currencies (None/empty: all)
+            include_start, include_end: Whether the bounds are inclusive
+        """
+        t0, t1 = start.timestamp(), end.timestamp()
+        if not currencies:
+            return self.all.between(t0, t1, include_start, include_end)
+        hits: List[Dict[str, Any]] = []
+        for currency in dict.fromkeys(currencies):
+            series = self.by_currency.get(currency)
+            if series is not None:
+                hits.extend(series.between(t0, t1, include_start, include_end))
+        if len(currencies) > 1:
+            hits.sort(key=lambda e: e["event_time"])
+        return hits
+
+
+# ------------- Blackout timeline ------------- #
+
+_MINUTE_NS = 60_000_000_000
+
+
+def _merge(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Union of half-open [start, end) intervals → sorted, disjoint, non-touching."""
+    if len(starts) == 0:
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], np.maximum.accumulate(ends[order])
+    # A new run starts where an interval begins after everything before it has ended
+    new_run = np.ones(len(starts), dtype=bool)
+    new_run[1:] = starts[1:] > ends[:-1]
+    run_ends = np.r_[np.flatnonzero(new_run)[1:] - 1, len(starts) - 1]
+    return starts[new_run], ends[run_ends]
+
+
+def _to_ns(t) -> int:
+    return int(t) if isinstance(t, (int, np.integer)) else pd.Timestamp(t).value
+
+
+class BlackoutTimeline:
+    """Merged blackout / forced-close intervals per currency (epoch ns, half-open)."""
+
+    KINDS = ("blackout", "close")
+
+    def __init__(self, calendar: NewsCalendar, minutes_before: float, minutes_after: float,
+                 minutes_before_close: float):
+        """
+        Args:
+            calendar: Indexed events
+            minutes_before: Minutes before an event new trades stop
+            minutes_after: Minutes after an event trading resumes
+            minutes_before_close: Minutes before an event positions are closed
+        """
+        self.calendar = calendar
+        self.settings = (minutes_before, minutes_after, minutes_before_close)
+        before, after, close = (int(round(m * _MINUTE_NS)) for m in self.settings)
+        self._by_currency: Dict[str, Dict[str, Tuple[np.ndarray, np.ndarray]]] = {}
+        for currency, series in calendar.by_currency.items():
+            t = np.array([pd.Timestamp(e["event_time"]).value for e in series.events], dtype=np.int64)
+            self._by_currency[currency] = {
+                # +1 ns: trading resumes strictly after event + minutes_after (the checks are inclusive)
+                "blackout": _merge(t - before, t + after + 1),
+                "close": _merge(t - close, t),
+            }
+        self._union_cache: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def intervals(self, currencies: Optional[Sequence[str]] = None,
+                  kind: str = "blackout") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Merged (starts, ends) epoch-ns arrays for any of `currencies` (None/empty: all).
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"kind must be one of {self.KINDS}")
+        names = tuple(sorted(set(currencies))) if currencies else tuple(sorted(self._by_currency))
+        key = (kind, names)
+        if key not in self._union_cache:
+            parts = [self._by_currency[c][kind] for c in names if c in self._by_currency]
+            if len(parts) == 1:
+                merged = parts[0]
+            elif parts:
+                merged = _merge(np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]))
+            else:
+                merged = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+            self._union_cache[key] = merged
+        return self._union_cache[key]
+
+    def _inside(self, starts: np.ndarray, ends: np.ndarray, t: int) -> Tuple[bool, Optional[int]]:
+        """(inside an interval at t, next boundary after t)."""
+        idx = int(np.searchsorted(starts, t, side="right")) - 1
+        if idx >= 0 and t < ends[idx]:
+            return True, int(ends[idx])
+        return False, int(starts[idx + 1]) if idx + 1 < len(starts) else None
+
+    def state_at(self, currencies: Optional[Sequence[str]], t) -> Dict[str, bool]:
+        """{"blackout": bool, "close": bool} at t (datetime or epoch ns)."""
+        t = _to_ns(t)
+        return {kind: self._inside(*self.intervals(currencies, kind), t)[0] for kind in self.KINDS}
+
+    def next_transition(self, currencies: Optional[Sequence[str]], t) -> Optional[Dict[str, Any]]:
+        """
+        The next time after t at which either state changes, and the states from then on.
+
+        Returns:
+            {"time": aware UTC datetime, "time_ns": int, "blackout": bool, "close": bool}
+            (states as of time_ns),
+            or None when nothing changes anymore
+        """
+        t = _to_ns(t)
+        boundaries = [self._inside(*self.intervals(currencies, kind), t)[1] for kind in self.KINDS]
+        upcoming = [b for b in boundaries if b is not None]
+        if not upcoming:
+            return None
+        when = min(upcoming)
+        # datetime has µs resolution: round up so "time" is never before the change
+        return {"time": pd.Timestamp(-(-when // 1000) * 1000, tz="UTC").to_pydatetime(), "time_ns": when,
+                **self.state_at(currencies, when)}
+
+    def mask(self, currencies: Optional[Sequence[str]], time_ns: np.ndarray, kind: str = "blackout") -> np.ndarray:
+        """Boolean array: True where time_ns (epoch ns) falls inside a `kind` interval."""
+        starts, ends = self.intervals(currencies, kind)
+        time_ns = np.asarray(time_ns, dtype=np.int64)
+        idx = np.searchsorted(starts, time_ns, side="right") - 1
+        inside = idx >= 0
+        inside[inside] = time_ns[inside] < ends[idx[inside]]
+        return inside
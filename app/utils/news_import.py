@@ -0,0 +1,248 @@
+"""
+News Calendar Import
+Parses economic calendar files (CSV, ICS, JSON) into validated, de-duplicated
+news events for a single bulk import.
+
+Accepted shapes:
+    CSV   header row with title, currency, event_time (ISO) - or date + time
+          columns; aliases: event/name → title, country → currency,
+          datetime/date → event_time
+    ICS   VEVENT blocks: SUMMARY → title, DTSTART (UTC "Z", TZID= or floating),
+          currency from X-CURRENCY / CATEGORIES / a leading "USD" in the summary,
+          impact from X-IMPACT
+    JSON  a list of events, or {"events": [...]} (our news file, ForexFactory export)
+
+Times without an offset are read in `tz` (default UTC). Rows are validated in
+one pass; duplicates (title + currency + time) within the file are dropped.
+
+Usage:
+    batch = parse_calendar(Path("calendar_2026.csv").read_text(), filename="calendar_2026.csv")
+    if not batch["errors"]:
+        service.import_events(batch["events"])
+"""
+
+import csv
+import io
+import json
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.utils.news_calendar import parse_event_time
+
+IMPACTS = ("high", "medium", "low")
+FORMATS = ("csv", "ics", "json")
+
+_CURRENCY = re.compile(r"^[A-Z]{3}$")
+_SUMMARY_CURRENCY = re.compile(r"^\[?([A-Z]{3})\]?[\s:\-]")
+_ALIASES = {
+    "title": ("title", "event", "name", "summary"),
+    "currency": ("currency", "country", "ccy"),
+    "event_time": ("event_time", "datetime", "timestamp"),
+    "date": ("date",),
+    "time": ("time",),
+    "impact": ("impact", "importance"),
+}
+
+
+def detect_format(filename: Optional[str] = None, content_type: Optional[str] = None,
+                  content: str = "") -> str:
+    """Calendar format from the file extension, content type, or the content itself."""
+    if filename:
+        ext = filename.rsplit(".", 1)[-1].lower()
+        if ext in FORMATS:
+            return ext
+        if ext == "ical":
+            return "ics"
+    if content_type:
+        content_type = content_type.split(";")[0].strip().lower()
+        if content_type in ("text/csv", "application/csv"):
+            return "csv"
+        if content_type == "text/calendar":
+            return "ics"
+        if content_type == "application/json":
+            return "json"
+    head = content.lstrip()[:64]
+    if head.startswith("BEGIN:VCALENDAR"):
+        return "ics"
+    if head[:1] in ("[", "{"):
+        return "json"
+    return "csv"
+
+
+def _parse_time(value: Any, tz) -> datetime:
+    """Stored time → aware UTC; naive values are local to tz."""
+    if isinstance(value, str):
+        value = value.strip()
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        raise ValueError("missing event time")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz)
+    return value.astimezone(timezone.utc)
+
+
+def _parse_clock(value: str) -> Tuple[int, int]:
+    """"13:30", "1:30pm", "8am" → (hour, minute)."""
+    match = re.fullmatch(r"(\d{1,2})(?::(\d{2}))?(?::\d{2})?\s*([ap]m)?", value.strip().lower())
+    if not match:
+        raise ValueError(f"invalid time {value!r}")
+    hour, minute, ampm = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if ampm:
+        hour = hour % 12 + (12 if ampm == "pm" else 0)
+    if hour > 23 or minute > 59:
+        raise ValueError(f"invalid time {value!r}")
+    return hour, minute
+
+
+def _field(row: Dict[str, Any], name: str) -> Any:
+    for alias in _ALIASES[name]:
+        if row.get(alias) not in (None, ""):
+            return row[alias]
+    return None
+
+
+def _normalize(row: Dict[str, Any], tz) -> Dict[str, Any]:
+    """Raw row (any supported column names) → event dict; raises ValueError if invalid."""
+    row = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+    title = str(_field(row, "title") or "").strip()
+    if not title:
+        raise ValueError("missing title")
+
+    currency = str(_field(row, "currency") or "").strip().upper()
+    if not _CURRENCY.match(currency):
+        raise ValueError(f"invalid currency {currency!r}")
+
+    event_time = _field(row, "event_time")
+    date = _field(row, "date")
+    clock = _field(row, "time")
+    if event_time is None and date and clock:
+        day = datetime.fromisoformat(str(date).strip()[:10])
+        hour, minute = _parse_clock(str(clock))
+        event_time = day.replace(hour=hour, minute=minute)
+    elif event_time is None:
+        event_time = date  # full timestamp in a "date" column (ForexFactory export)
+    try:
+        event_time = _parse_time(event_time, tz)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"invalid event time {event_time!r}: {e}")
+
+    impact = str(_field(row, "impact") or "high").strip().lower()
+    if impact not in IMPACTS:
+        raise ValueError(f"invalid impact {impact!r}")
+
+    return {"title": title, "currency": currency, "event_time": event_time, "impact": impact}
+
+
+# ------------- Format readers (raw rows) ------------- #
+
+def _csv_rows(content: str) -> Iterable[Dict[str, Any]]:
+    return csv.DictReader(io.StringIO(content.lstrip("\ufeff")))
+
+
+def _json_rows(content: str) -> List[Dict[str, Any]]:
+    data = json.loads(content)
+    if isinstance(data, dict):
+        data = data.get("events", [])
+    if not isinstance(data, list):
+        raise ValueError("JSON calendar must be a list of events or {\"events\": [...]}")
+    return [row if isinstance(row, dict) else {} for row in data]
+
+
+def _ics_time(value: str, params: Dict[str, str]) -> datetime:
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        raise ValueError("all-day event has no time")
+    stamp = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        return stamp.replace(tzinfo=timezone.utc)
+    if "TZID" in params:
+        return stamp.replace(tzinfo=ZoneInfo(params["TZID"]))
+    return stamp  # floating: read in the import timezone
+
+
+def _ics_rows(content: str) -> List[Dict[str, Any]]:
+    # Unfold continuation lines (RFC 5545 §3.1)
+    lines = re.sub(r"\r?\n[ \t]", "", content).splitlines()
+    rows, event = [], None
+    for line in lines:
+        if line == "BEGIN:VEVENT":
+            event = {}
+        elif line == "END:VEVENT":
+            if event is not None:
+                rows.append(event)
+            event = None
+        elif event is not None and ":" in line:
+            head, value = line.split(":", 1)
+            name, *param_parts = head.split(";")
+            params = dict(p.split("=", 1) for p in param_parts if "=" in p)
+            value = value.replace("\\,", ",").replace("\\;", ";").strip()
+            name = name.upper()
+            if name == "SUMMARY":
+                event["title"] = value
+                match = _SUMMARY_CURRENCY.match(value)
+                if match:
+                    event.setdefault("_summary_currency", match.group(1))
+            elif name == "DTSTART":
+                try:
+                    event["event_time"] = _ics_time(value, params)
+                except (ValueError, KeyError) as e:
+                    event["event_time"] = f"{value} ({e})"
+            elif name in ("X-CURRENCY", "CATEGORIES"):
+                if name == "X-CURRENCY" or "currency" not in event:
+                    event["currency"] = value.split(",")[0]
+            elif name == "X-IMPACT":
+                event["impact"] = value
+    for event in rows:
+        summary_currency = event.pop("_summary_currency", None)
+        if not _CURRENCY.match(str(event.get("currency", "")).strip().upper()) and summary_currency:
+            event["currency"] = summary_currency
+    return rows
+
+
+_READERS = {"csv": _csv_rows, "ics": _ics_rows, "json": _json_rows}
+
+
+def parse_calendar(content: str, fmt: Optional[str] = None, filename: Optional[str] = None,
+                   content_type: Optional[str] = None, tz: str = "UTC") -> Dict[str, Any]:
+    """
+    Parse and validate a calendar file in one pass.
+
+    Args:
+        content: File contents
+        fmt: "csv", "ics" or "json" (default: detected)
+        filename, content_type: Hints for format detection
+        tz: Timezone for times without an offset (e.g. "America/New_York")
+
+    Returns:
+        {"format": str, "events": [valid, de-duplicated events, file order],
+         "errors": [{"row": n, "error": str}], "duplicates": n, "rows": n}
+    """
+    fmt = (fmt or detect_format(filename, content_type, content)).lower()
+    if fmt not in _READERS:
+        raise ValueError(f"Unsupported calendar format {fmt!r} (use one of {FORMATS})")
+    zone = ZoneInfo(tz)
+
+    events, errors, seen = [], [], set()
+    duplicates = rows = 0
+    for rows, raw in enumerate(_READERS[fmt](content), start=1):
+        try:
+            event = _normalize(raw, zone)
+        except ValueError as e:
+            errors.append({"row": rows, "error": str(e)})
+            continue
+        key = event_key(event)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        events.append(event)
+    return {"format": fmt, "events": events, "errors": errors, "duplicates": duplicates, "rows": rows}
+
+
+def event_key(event: Dict[str, Any]) -> Tuple[str, str, datetime]:
+    """De-duplication key: (title, currency, UTC time)."""
+    return (str(event["title"]).strip(), str(event["currency"]).strip().upper(),
+            parse_event_time(event["event_time"]))
@@ -0,0 +1,354 @@
+"""
+Shared OANDA REST Client
+One pooled HTTP client for every bot and service that talks to the OANDA v3 API.
+
+- Keep-alive connection pooling (one requests.Session per api key/mode,
+  shared in-process via shared_client())
+- Per-account token-bucket rate limiting (OANDA allows ~100 requests/s)
+- Retries with exponential backoff and full jitter on connection errors,
+  timeouts, 429 and 5xx; POSTs (orders) are only retried on a connect
+  timeout or an explicit 429/503 rejection, so a retry cannot place an
+  order twice
+- Latency histograms per endpoint (ids normalized), exposed via latency_stats()
+  (count, errors, mean, p50/p95/p99, max, bucket counts)
+- AsyncOandaClient: asyncio front-end over the same pooled client
+
+Usage:
+    client = shared_client(api_key, mode="practice")
+    summary = client.get(f"accounts/{account_id}/summary")
+    fill = client.post(f"accounts/{account_id}/orders", json={"order": {...}})
+
+    async_client = AsyncOandaClient(client)
+    summary = await async_client.get(f"accounts/{account_id}/summary")
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+BASE_URLS = {
+    "practice": "https://api-fxpractice.oanda.com/v3",
+    "live": "https://api-fxtrade.oanda.com/v3",
+}
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RATE_PER_SECOND = 100.0
+
+BACKOFF_BASE_SECONDS = 0.25
+BACKOFF_MAX_SECONDS = 8.0
+
+# Status codes worth retrying
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# ...and the subset that guarantees a POST was not executed
+REJECTED_STATUS = {429, 503}
+
+# Latency histogram bucket upper bounds (ms); the last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Account ids (101-001-1234567-001), trade/order/transaction ids, @client ids
+_ID_SEGMENT = re.compile(r"^(\d[\d-]*|@.+)$")
+
+
+class OandaAPIError(Exception):
+    """OANDA request failed after retries (HTTP error or transport failure)."""
+
+    def __init__(self, message: str, status: Optional[int] = None, error_code: Optional[str] = None,
+                 response: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.error_code = error_code
+        self.response = response
+
+
+# ------------- Rate limiting ------------- #
+
+class RateLimiter:
+    """Token bucket: `rate` requests per second with bursts up to `burst`."""
+
+    def __init__(self, rate: float = DEFAULT_RATE_PER_SECOND, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; returns how long the caller must wait before using it."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+# ------------- Latency histograms ------------- #
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (thread-safe)."""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, ms: float, error: bool = False):
+        with self._lock:
+            self.counts[bisect_left(self.buckets_ms, ms)] += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            if error:
+                self.errors += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (max for the open bucket)."""
+        total = sum(self.counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return float(self.buckets_ms[i]) if i < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict:
+        count = sum(self.counts)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / count, 1) if count else None,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip([f"<={b}" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]}"], self.counts)),
+        }
+
+
+def endpoint_key(method: str, path: str) -> str:
+    """'GET accounts/101-001-1-001/trades/42/orders' → 'GET accounts/{id}/trades/{id}/orders'."""
+    parts = [("{id}" if _ID_SEGMENT.match(part) else part) for part in path.split("?")[0].strip("/").split("/")]
+    return f"{method} {'/'.join(parts)}"
+
+
+def _account_of(path: str) -> str:
+    parts = path.strip("/").split("/")
+    return parts[1] if len(parts) > 1 and parts[0] == "accounts" else ""
+
+
+# ------------- Client ------------- #
+
+class OandaClient:
+    """Pooled, rate-limited, retrying OANDA v3 REST client (thread-safe)."""
+
+    def __init__(self, api_key: Optional[str] = None, mode: str = "practice",
+                 base_url: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+                 pool_size: int = 10, session: Optional[requests.Session] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            api_key: OANDA token (default: OANDA_API_KEY / OANDA_API_TOKEN env)
+            mode: "practice" or "live"
+            base_url: Override the REST host (tests)
+            timeout: Per-request timeout in seconds
+            max_retries: Retries after the first attempt
+            rate_per_second: Request budget per account
+            pool_size: Keep-alive connections kept open
+            session: requests session to use (one is created otherwise)
+            sleep: Backoff/rate-limit sleep (injectable for tests)
+        """
+        self.api_key = api_key or os.getenv("OANDA_API_KEY") or os.getenv("OANDA_API_TOKEN")
+        if not self.api_key:
+            raise ValueError("OANDA_API_KEY or OANDA_API_TOKEN must be set")
+        self.mode = mode
+        self.base_url = (base_url or BASE_URLS["live" if mode == "live" else "practice"]).rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_per_second = rate_per_second
+        self.sleep = sleep
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept-Datetime-Format": "RFC3339",
+        })
+
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    # ---- bookkeeping ----
+
+    def _limiter(self, account: str) -> RateLimiter:
+        with self._lock:
+            if account not in self._limiters:
+                self._limiters[account] = RateLimiter(self.rate_per_second)
+            return self._limiters[account]
+
+    def _histogram(self, key: str) -> LatencyHistogram:
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = LatencyHistogram()
+            return self._histograms[key]
+
+    def latency_stats(self) -> Dict[str, Dict]:
+        """Per-endpoint latency summaries."""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {key: hist.summary() for key, hist in sorted(histograms.items())}
+
+    @staticmethod
+    def backoff_seconds(attempt: int) -> float:
+        """Full-jitter exponential backoff for retry `attempt` (0-based)."""
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    # ---- requests ----
+
+    def request(self, method: str, path: str, params: Optional[dict] = None,
+                json: Optional[dict] = None) -> dict:
+        """
+        Send a request and return the decoded JSON body.
+
+        Raises:
+            OandaAPIError: on a non-retryable HTTP error or once retries are exhausted
+        """
+        method = method.upper()
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        histogram = self._histogram(endpoint_key(method, path))
+        limiter = self._limiter(_account_of(path))
+        idempotent = method != "POST"
+
+        for attempt in range(self.max_retries + 1):
+            wait = limiter.reserve()
+            if wait > 0:
+                self.sleep(wait)
+
+            started = time.perf_counter()
+            retry_after = None
+            try:
+                response = self.session.request(method, url, params=params, json=json, timeout=self.timeout)
+            except requests.RequestException as e:
+                histogram.record((time.perf_counter() - started) * 1000, error=True)
+                retryable = idempotent or isinstance(e, requests.ConnectTimeout)
+                error = OandaAPIError(f"{method} {path}: {e}")
+            else:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if response.ok:
+                    histogram.record(elapsed_ms)
+                    return response.json() if response.content else {}
+
+                histogram.record(elapsed_ms, error=True)
+                error = _api_error(method, path, response)
+                retryable = response.status_code in (RETRY_STATUS if idempotent else REJECTED_STATUS)
+                retry_after = response.headers.get("Retry-After")
+
+            if not retryable or attempt == self.max_retries:
+                logger.error(f"❌ OANDA {error} (attempt {attempt + 1}/{self.max_retries + 1})")
+                raise error
+
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else self.backoff_seconds(attempt)
+            logger.warning(f"⚠️ OANDA {error}; retrying in {delay:.2f}s "
+                           f"(attempt {attempt + 1}/{self.max_retries + 1})")
+            self.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    def get(self, path: str, params: Optional[dict] = None) -> dict:
+        return self.request("GET", path, params=params)
+
+    def post(self, path: str, json: Optional[dict] = None) -> dict:
+        return self.request("POST", path, json=json)
+
+    def put(self, path: str, json: Optional[dict] = None) -> dict:
+        return self.request("PUT", path, json=json)
+
+    def close(self):
+        self.session.close()
+
+
+def _api_error(method: str, path: str, response: requests.Response) -> OandaAPIError:
+    body = None
+    message = response.reason
+    try:
+        body = response.json()
+        message = body.get("errorMessage", message)
+    except ValueError:
+        pass
+    error_code = (body or {}).get("errorCode")
+    code = f" [{error_code}]" if error_code else ""
+    return OandaAPIError(f"{method} {path}: {response.status_code} {message}{code}",
+                         status=response.status_code, error_code=error_code, response=body)
+
+
+class AsyncOandaClient:
+    """
+    asyncio front-end for OandaClient.
+
+    Requests run in worker threads over the shared pooled session, so async
+    callers get the same keep-alive connections, rate limits and histograms
+    as the sync bots without blocking the event loop.
+    """
+
+    def __init__(self, client: Optional[OandaClient] = None, **kwargs):
+        self.client = client or OandaClient(**kwargs)
+
+    async def request(self, method: str, path: str, params: Optional[dict] = None,
+                      json: Optional[dict] = None) -> dict:
+        return await asyncio.to_thread(self.client.request, method, path, params, json)
+
+    async def get(self, path: str, params: Optional[dict] = None) -> dict:
+        return await self.request("GET", path, params=params)
+
+    async def post(self, path: str, json: Optional[dict] = None) -> dict:
+        return await self.request("POST", path, json=json)
+
+    async def put(self, path: str, json: Optional[dict] = None) -> dict:
+        return await self.request("PUT", path, json=json)
+
+    async def gather(self, calls: List[Tuple[str, str]]) -> List:
+        """Run (method, path) requests concurrently; failures come back as exceptions."""
+        return await asyncio.gather(*(self.request(method, path) for method, path in calls),
+                                    return_exceptions=True)
+
+    def latency_stats(self) -> Dict[str, Dict]:
+        return self.client.latency_stats()
+
+
+# ------------- Process-wide sharing ------------- #
+
+_shared: Dict[Tuple[str, str], OandaClient] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_client(api_key: Optional[str] = None, mode: str = "practice") -> OandaClient:
+    """The process-wide client for an api key/mode (created on first use)."""
+    api_key = api_key or os.getenv("OANDA_API_KEY") or os.getenv("OANDA_API_TOKEN")
+    key = (api_key or "", "live" if mode == "live" else "practice")
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = OandaClient(api_key, mode=key[1])
+        return _shared[key]
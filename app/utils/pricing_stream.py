@@ -0,0 +1,253 @@
+"""
+Streaming Pricing Feed
+Consumes the OANDA v3 pricing stream and builds candles in-process, so a bot
+gets each closed bar exactly once (within one heartbeat of the close) and the
+live spread from the same connection, instead of polling the candles and
+pricing endpoints.
+
+Stream protocol (newline-delimited JSON over one long-lived HTTP response):
+    {"type": "PRICE", "instrument": "GBP_USD", "time": "...Z", "tradeable": true,
+     "bids": [{"price": "1.26512", ...}], "asks": [{"price": "1.26524", ...}], ...}
+    {"type": "HEARTBEAT", "time": "...Z"}           (every ~5 s)
+
+Bars are built from mid prices (OHLC of (bid + ask) / 2, volume = tick count),
+bucketed on the UTC grid of the granularity. A bar closes when a price or
+heartbeat timestamped in a later bucket arrives; minutes without ticks produce
+no bar (as with OANDA candles).
+
+Usage:
+    stream = OandaPricingStream(account_id, ["GBP_USD"])
+    feed = StreamingCandleFeed(stream, "GBP_USD")
+    for candle, spread_pips in feed.candles():
+        action = strategy.on_candle(candle, spread_pips)
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import requests
+
+from app.utils.bar_scheduler import granularity_seconds
+from app.utils.oanda_client import OandaClient, shared_client
+
+logger = logging.getLogger(__name__)
+
+# Reconnect backoff (seconds)
+RECONNECT_MIN_SECONDS = 1.0
+RECONNECT_MAX_SECONDS = 30.0
+
+# OANDA heartbeats every 5 s; no data for this long means the stream is dead
+READ_TIMEOUT_SECONDS = 20.0
+
+
+def parse_time_ns(ts: str) -> int:
+    """RFC3339 timestamp (nanosecond precision, Z suffix) → epoch ns."""
+    return pd.Timestamp(ts).value
+
+
+@dataclass
+class PriceTick:
+    time_ns: int
+    bid: float
+    ask: float
+
+    @property
+    def mid(self) -> float:
+        return (self.bid + self.ask) / 2
+
+
+# ------------- Stream ------------- #
+
+class OandaPricingStream:
+    """
+    Iterator over PRICE / HEARTBEAT messages, reconnecting with backoff.
+
+    The stream uses the pooled session of the shared OANDA client (auth
+    headers, keep-alive adapter; the stream host gets its own connection
+    pool, so the long-lived response never holds a REST connection). It
+    bypasses OandaClient.request(): that decodes a complete body and applies
+    per-request retries, rate limiting and latency histograms, none of which
+    fit a response that never ends; reconnects are handled here instead.
+    """
+
+    def __init__(self, account_id: str, instruments: Sequence[str], api_key: Optional[str] = None,
+                 mode: str = "practice", stream_url: Optional[str] = None,
+                 client: Optional[OandaClient] = None,
+                 read_timeout: float = READ_TIMEOUT_SECONDS,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            account_id: OANDA account
+            instruments: Instruments to subscribe to
+            api_key: OANDA token (default: OANDA_API_KEY / OANDA_API_TOKEN env)
+            mode: "practice" or "live"
+            stream_url: Override the stream host (e.g. a local fake server)
+            client: OANDA client whose session is used (default: shared_client(api_key, mode))
+            read_timeout: Seconds without any line (heartbeats included) before reconnecting
+            sleep: Backoff sleep (injectable for tests)
+        """
+        self.client = client or shared_client(api_key, mode)
+        host = stream_url or ("https://stream-fxtrade.oanda.com" if self.client.mode == "live"
+                              else "https://stream-fxpractice.oanda.com")
+        self.url = f"{host.rstrip('/')}/v3/accounts/{account_id}/pricing/stream"
+        self.instruments = list(instruments)
+        self.session = self.client.session
+        self.read_timeout = read_timeout
+        self.sleep = sleep
+        self.connects = 0
+        self.messages = 0
+
+    def _lines(self) -> Iterator[bytes]:
+        params = {"instruments": ",".join(self.instruments), "snapshot": "true"}
+        with self.session.get(self.url, params=params, stream=True,
+                              timeout=(10.0, self.read_timeout)) as response:
+            response.raise_for_status()
+            self.connects += 1
+            logger.info(f"📡 Pricing stream connected ({','.join(self.instruments)})")
+            yield from response.iter_lines()
+
+    def messages_forever(self, max_reconnects: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Parsed stream messages; reconnects on disconnect, error or silence.
+
+        Args:
+            max_reconnects: Stop after this many reconnects (None: never stop)
+        """
+        backoff = RECONNECT_MIN_SECONDS
+        reconnects = 0
+        while True:
+            try:
+                for line in self._lines():
+                    if not line:
+                        continue
+                    self.messages += 1
+                    backoff = RECONNECT_MIN_SECONDS
+                    yield json.loads(line)
+                logger.warning("⚠️ Pricing stream closed by server")
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"⚠️ Pricing stream error: {e}")
+
+            reconnects += 1
+            if max_reconnects is not None and reconnects > max_reconnects:
+                return
+            logger.info(f"🔄 Reconnecting pricing stream in {backoff:.0f}s")
+            self.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_MAX_SECONDS)
+
+
+# ------------- Bar building ------------- #
+
+class BarBuilder:
+    """Mid-price OHLC bars from ticks on a fixed UTC grid."""
+
+    def __init__(self, granularity: str = "M1", pip: float = 0.0001):
+        self.period_ns = granularity_seconds(granularity) * 1_000_000_000
+        self.pip = pip
+        self._bucket: Optional[int] = None
+        self._bar: Optional[Dict] = None
+        self._spread: Optional[float] = None
+        self.last_emitted: Optional[int] = None
+        self.late_ticks = 0
+
+    @property
+    def spread_pips(self) -> Optional[float]:
+        """Spread of the latest tick (None before the first tick)."""
+        return self._spread
+
+    def _close(self) -> Tuple[Dict, float]:
+        bar, spread = self._bar, self._spread
+        self.last_emitted = self._bucket
+        self._bar = None
+        return bar, spread
+
+    def advance(self, time_ns: int) -> List[Tuple[Dict, float]]:
+        """Close the forming bar if time_ns is past its bucket (heartbeats)."""
+        if self._bar is not None and time_ns >= self._bucket + self.period_ns:
+            return [self._close()]
+        return []
+
+    def on_tick(self, tick: PriceTick) -> List[Tuple[Dict, float]]:
+        """
+        Add a tick; returns the bar(s) it closed as (candle, spread_pips at close).
+        """
+        bucket = tick.time_ns - tick.time_ns % self.period_ns
+        if (self.last_emitted is not None and bucket <= self.last_emitted) or \
+                (self._bucket is not None and bucket < self._bucket):
+            self.late_ticks += 1  # belongs to a bar already emitted
+            return []
+
+        closed = self.advance(tick.time_ns)
+        mid = tick.mid
+        self._spread = (tick.ask - tick.bid) / self.pip
+        if self._bar is None:
+            self._bucket = bucket
+            self._bar = {
+                "time": datetime.fromtimestamp(bucket // 1_000_000_000, tz=timezone.utc),
+                "open": mid, "high": mid, "low": mid, "close": mid, "volume": 1,
+            }
+        else:
+            bar = self._bar
+            if mid > bar["high"]:
+                bar["high"] = mid
+            if mid < bar["low"]:
+                bar["low"] = mid
+            bar["close"] = mid
+            bar["volume"] += 1
+        return closed
+
+
+class StreamingCandleFeed:
+    """Closed candles + live spread for one instrument from a pricing stream."""
+
+    def __init__(self, stream: OandaPricingStream, instrument: str, granularity: str = "M1",
+                 pip: float = 0.0001):
+        self.stream = stream
+        self.instrument = instrument
+        self.builder = BarBuilder(granularity, pip)
+        self.last_price_time: Optional[int] = None
+        self.malformed = 0
+
+    @property
+    def spread_pips(self) -> Optional[float]:
+        """Spread of the latest tick in pips."""
+        return self.builder.spread_pips
+
+    def candles(self, max_reconnects: Optional[int] = None) -> Iterator[Tuple[Dict, float]]:
+        """
+        Yield (candle, spread_pips) once per closed bar, oldest first.
+
+        candle has the on_candle shape: time (UTC datetime, bar open), open,
+        high, low, close, volume. Messages that cannot be parsed (missing
+        time, odd timestamp or price) are logged and skipped, so one bad line
+        never ends the feed.
+        """
+        for msg in self.stream.messages_forever(max_reconnects):
+            try:
+                closed = self._on_message(msg)
+            except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+                self.malformed += 1
+                logger.warning(f"⚠️ Skipping malformed pricing message ({type(e).__name__}: {e}): {msg}")
+                continue
+            yield from closed
+
+    def _on_message(self, msg: Dict) -> List[Tuple[Dict, float]]:
+        """Bars closed by one stream message."""
+        kind = msg.get("type")
+        if kind == "HEARTBEAT":
+            return self.builder.advance(parse_time_ns(msg["time"]))
+        if kind == "PRICE" and msg.get("instrument") == self.instrument:
+            if not msg.get("bids") or not msg.get("asks"):
+                return []
+            tick = PriceTick(
+                time_ns=parse_time_ns(msg["time"]),
+                bid=float(msg["bids"][0]["price"]),
+                ask=float(msg["asks"][0]["price"]),
+            )
+            self.last_price_time = tick.time_ns
+            return self.builder.on_tick(tick)
+        return []
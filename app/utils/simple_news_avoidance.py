@@ -1,190 +1,148 @@
+import fcntl
 import json
 import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import os
+import threading
 import pytz
 
+from app.utils.news_calendar import BlackoutTimeline, NewsCalendar, parse_event_time
+
 logger = logging.getLogger(__name__)
 
-class SimpleNewsAvoidanceService:
+class NewsAvoidanceBase(ABC):
     """
-    Simple file-based news avoidance service.
-    Stores news events in a JSON file instead of database.
+    News avoidance checks shared by the file and database backends.
+
+    Every check is answered from an in-memory NewsCalendar index of the
+    high-impact events. Subclasses load it in refresh() (only when their
+    store has changed) and implement the writes; a backend missing any of
+    them cannot be instantiated.
     """
-    
-    def __init__(self, 
-                 data_file: str = "/home/myalgo/algo-trader/data/news_events.json",
+
+    def __init__(self,
                  minutes_before: int = 30,
                  minutes_after: int = 60,
-                 minutes_before_close: int = 3):
+                 minutes_before_close: int = 3,
+                 watch_file: bool = True):
         """
-        Initialize the simple news avoidance service.
-        
         Args:
-            data_file: Path to JSON file storing news events
             minutes_before: Minutes before news to stop NEW trades (default: 30)
             minutes_after: Minutes after news to resume trading (default: 60)
             minutes_before_close: Minutes before news to CLOSE all positions (default: 3)
+            watch_file: Check the store for changes on every query (default). When
+                False, the index is only reloaded by refresh() (e.g. from a
+                background task), so queries never touch the store
         """
-        self.data_file = Path(data_file)
         self.minutes_before = minutes_before
         self.minutes_after = minutes_after
         self.minutes_before_close = minutes_before_close
-        
-        # Ensure data directory exists (handle gracefully)
-        try:
-            self.data_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Initialize file if it doesn't exist
-            if not self.data_file.exists():
-                self._initialize_file()
-            else:
-                # Load settings from file to override defaults
-                try:
-                    data = self._load_data()
-                    if "settings" in data:
-                        settings = data["settings"]
-                        if "minutes_before" in settings:
-                            self.minutes_before = settings["minutes_before"]
-                        if "minutes_after" in settings:
-                            self.minutes_after = settings["minutes_after"]
-                        if "minutes_before_close" in settings:
-                            self.minutes_before_close = settings["minutes_before_close"]
-                except Exception as e:
-                    logger.warning(f"Could not load settings from file: {e}, using defaults")
-        except Exception as e:
-            logger.warning(f"Could not create data directory {self.data_file.parent}: {e}")
-            # Continue without file-based news avoidance
-            
+
+        # In-memory calendar index, keyed by a backend-specific change marker
+        self.watch_file = watch_file
+        self._calendar: Optional[NewsCalendar] = None
+        self._calendar_key: Optional[tuple] = None
+        self._settings: Dict[str, Any] = {}
+        self._enabled = True
+        self._timeline: Optional[BlackoutTimeline] = None
+        self.calendar_reloads = 0
+
         # Set timezone for EST/EDT
         self.eastern_tz = pytz.timezone('America/New_York')
-            
-        logger.info(f"Simple news avoidance service initialized with file: {self.data_file}")
-        logger.info(f"Settings: {self.minutes_before} min before, {self.minutes_after} min after, {self.minutes_before_close} min before close")
-    
-    def _initialize_file(self):
-        """Initialize the JSON file with default structure."""
-        default_data = {
-            "events": [],
-            "settings": {
-                "minutes_before": self.minutes_before,
-                "minutes_after": self.minutes_after,
-                "minutes_before_close": self.minutes_before_close,
-                "enabled": True
-            }
-        }
-        
-        with open(self.data_file, 'w') as f:
-            json.dump(default_data, f, indent=2, default=str)
-        
-        logger.info(f"Initialized news events file: {self.data_file}")
+
+    @abstractmethod
+    def refresh(self) -> bool:
+        """
+        Rebuild the calendar index if the store changed since the last load.
+
+        Returns:
+            True if the index was rebuilt
+        """
+
+    @abstractmethod
+    def add_news_event(self, title: str, currency: str, event_time: datetime,
+                       impact: str = "high") -> Dict[str, Any]:
+        """Add a news event; returns the created event dictionary."""
+
+    @abstractmethod
+    def delete_news_event(self, event_id: int) -> bool:
+        """Delete a news event by ID; False if not found."""
+
+    @abstractmethod
+    def import_events(self, events: List[Dict[str, Any]], created_by: Optional[int] = None,
+                      skip_existing: bool = True) -> Dict[str, int]:
+        """Bulk add events in one write; returns {"inserted": n, "skipped": n}."""
+
+    @abstractmethod
+    def update_settings(self, minutes_before: Optional[int] = None,
+                        minutes_after: Optional[int] = None,
+                        minutes_before_close: Optional[int] = None,
+                        enabled: Optional[bool] = None):
+        """Update news avoidance settings."""
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Settings of the last load."""
+        self._get_calendar()
+        return dict(self._settings)
     
-    def _load_data(self) -> Dict[str, Any]:
-        """Load news events from JSON file."""
-        try:
-            if not self.data_file.exists():
-                return {"events": [], "settings": {"minutes_before": 30, "minutes_after": 60, "minutes_before_close": 3, "enabled": True}}
-                
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-            
-            # Convert string timestamps back to datetime objects
-            for event in data.get("events", []):
-                if isinstance(event.get("event_time"), str):
-                    # Handle timezone conversion
-                    event_time_str = event["event_time"]
-                    if event_time_str.endswith('Z'):
-                        # UTC time (explicit)
-                        event["event_time"] = datetime.fromisoformat(event_time_str.replace('Z', '+00:00'))
-                    elif '+' in event_time_str or (event_time_str.count('-') > 2):
-                        # Timezone-aware time (e.g., 2025-11-20T13:30:00+00:00 or -05:00)
-                        event["event_time"] = datetime.fromisoformat(event_time_str)
-                    else:
-                        # Timezone-naive time - assume UTC (since we store UTC times as timezone-naive)
-                        naive_dt = datetime.fromisoformat(event_time_str)
-                        if naive_dt.tzinfo is None:
-                            # Treat as UTC since that's how we store them from the admin form
-                            event["event_time"] = naive_dt.replace(tzinfo=timezone.utc)
-                        else:
-                            event["event_time"] = naive_dt
-                        
-                if isinstance(event.get("created_at"), str):
-                    event["created_at"] = datetime.fromisoformat(event["created_at"].replace('Z', '+00:00'))
-            
-            # Load settings from file and update instance variables
-            if "settings" in data:
-                settings = data["settings"]
-                if "minutes_before" in settings:
-                    self.minutes_before = settings["minutes_before"]
-                if "minutes_after" in settings:
-                    self.minutes_after = settings["minutes_after"]
-                if "minutes_before_close" in settings:
-                    self.minutes_before_close = settings["minutes_before_close"]
-            
-            return data
-        except Exception as e:
-            logger.error(f"Error loading news data: {e}")
-            return {"events": [], "settings": {"minutes_before": 30, "minutes_after": 60, "minutes_before_close": 3, "enabled": True}}
+    def _get_calendar(self) -> NewsCalendar:
+        """Indexed high-impact events; reloads only when the store has changed."""
+        if self.watch_file or self._calendar is None:
+            self.refresh()
+        return self._calendar
     
-    def _save_data(self, data: Dict[str, Any]):
-        """Save news events to JSON file."""
-        try:
-            # Ensure directory exists before saving
-            self.data_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2, default=lambda x: x.isoformat() if hasattr(x, 'isoformat') else str(x))
-            logger.debug("News data saved successfully")
-        except Exception as e:
-            logger.error(f"Error saving news data: {e}")
-            # Don't raise - just log the error
+    def blackout_timeline(self) -> BlackoutTimeline:
+        """Merged blackout / close intervals for the current events and settings."""
+        calendar = self._get_calendar()
+        settings = (self.minutes_before, self.minutes_after, self.minutes_before_close)
+        timeline = self._timeline
+        if timeline is None or timeline.calendar is not calendar or timeline.settings != settings:
+            timeline = BlackoutTimeline(calendar, *settings)
+            self._timeline = timeline
+        return timeline
     
-    def add_news_event(self, 
-                      title: str, 
-                      currency: str, 
-                      event_time: datetime, 
-                      impact: str = "high") -> Dict[str, Any]:
+    def next_transition(self, currency_pair: Optional[str] = None,
+                        now: Optional[datetime] = None) -> Dict[str, Any]:
         """
-        Add a new news event.
+        Current avoidance state and when it next changes, so a bot can sleep until then.
         
         Args:
-            title: Event title (e.g., "Non-Farm Payrolls")
-            currency: Currency affected (e.g., "USD")
-            event_time: When the event occurs
-            impact: Impact level ("high", "medium", "low")
+            currency_pair: Trading pair (e.g., "GBP_USD"); None for all currencies
+            now: Reference time (default: now, UTC)
             
         Returns:
-            Created event dictionary
+            Dictionary with avoid_trading / close_positions now, and next_transition
+            ({"time", "avoid_trading", "close_positions"} or None if nothing is scheduled)
+            plus seconds_until it
         """
-        try:
-            data = self._load_data()
-            
-            # Generate new ID
-            new_id = max([event.get("id", 0) for event in data.get("events", [])], default=0) + 1
-            
-            # Create new event
-            new_event = {
-                "id": new_id,
-                "title": title,
-                "currency": currency.upper(),
-                "event_time": event_time,
-                "impact": impact,
-                "created_at": datetime.utcnow()
+        now = now or datetime.now(timezone.utc)
+        timeline = self.blackout_timeline()
+        if not self._enabled:
+            return {"avoid_trading": False, "close_positions": False,
+                    "next_transition": None, "seconds_until": None}
+        
+        currencies = self._extract_currencies_from_pair(currency_pair)
+        state = timeline.state_at(currencies, now)
+        upcoming = timeline.next_transition(currencies, now)
+        result = {
+            "avoid_trading": state["blackout"],
+            "close_positions": state["close"],
+            "next_transition": None,
+            "seconds_until": None,
+        }
+        if upcoming:
+            result["next_transition"] = {
+                "time": upcoming["time"],
+                "avoid_trading": upcoming["blackout"],
+                "close_positions": upcoming["close"],
             }
-            
-            # Add to events list
-            data["events"].append(new_event)
-            
-            # Save back to file
-            self._save_data(data)
-            
-            logger.info(f"Added news event: {title} at {event_time} for {currency}")
-            return new_event
-            
-        except Exception as e:
-            logger.error(f"Error adding news event: {e}")
-            raise
+            result["seconds_until"] = (upcoming["time"] - now).total_seconds()
+        return result
     
     def get_upcoming_news(self, 
                          hours_ahead: int = 24, 
@@ -200,43 +158,17 @@ class SimpleNewsAvoidanceService:
             List of upcoming news events
         """
         try:
-            data = self._load_data()
+            calendar = self._get_calendar()
             now = datetime.now(timezone.utc)
             end_time = now + timedelta(hours=hours_ahead)
             
+            currencies = [currency.upper()] if currency else None
             upcoming_events = []
-            
-            for event in data.get("events", []):
-                # Ensure event_time is timezone-aware UTC for comparison
-                event_time = event["event_time"]
-                if isinstance(event_time, datetime):
-                    if event_time.tzinfo is None:
-                        # Timezone-naive - assume UTC
-                        event_time = event_time.replace(tzinfo=timezone.utc)
-                    else:
-                        # Convert to UTC if it has timezone info
-                        event_time = event_time.astimezone(timezone.utc)
-                else:
-                    # Skip if not a datetime
-                    continue
-                
-                # Check if event is in the future and within time range
-                if (event_time >= now and 
-                    event_time <= end_time and
-                    event["impact"] == "high"):
-                    
-                    # Filter by currency if specified
-                    if currency and event["currency"] != currency.upper():
-                        continue
-                    
-                    # Add minutes until event
-                    event_copy = event.copy()
-                    event_copy["event_time"] = event_time
-                    event_copy["minutes_until"] = int((event_time - now).total_seconds() / 60)
-                    upcoming_events.append(event_copy)
-            
-            # Sort by event time
-            upcoming_events.sort(key=lambda x: x["event_time"])
+            for event in calendar.window(now, end_time, currencies):
+                # Add minutes until event
+                event_copy = event.copy()
+                event_copy["minutes_until"] = int((event["event_time"] - now).total_seconds() / 60)
+                upcoming_events.append(event_copy)
             
             logger.info(f"Found {len(upcoming_events)} upcoming high-impact news events")
             return upcoming_events
@@ -259,10 +191,10 @@ class SimpleNewsAvoidanceService:
             Dictionary with close decision and details
         """
         try:
-            data = self._load_data()
+            calendar = self._get_calendar()
             
             # Check if news avoidance is enabled
-            if not data.get("settings", {}).get("enabled", True):
+            if not self._enabled:
                 return {
                     "close_positions": False,
                     "reason": "News avoidance disabled",
@@ -276,37 +208,9 @@ class SimpleNewsAvoidanceService:
             # Get relevant currencies from trading pair
             relevant_currencies = self._extract_currencies_from_pair(currency_pair)
             
-            # Check for imminent events
-            imminent_event = None
-            
-            for event in data.get("events", []):
-                # Ensure event_time is timezone-aware UTC for comparison
-                event_time = event["event_time"]
-                if isinstance(event_time, datetime):
-                    if event_time.tzinfo is None:
-                        # Timezone-naive - assume UTC
-                        event_time = event_time.replace(tzinfo=timezone.utc)
-                    else:
-                        # Convert to UTC if it has timezone info
-                        event_time = event_time.astimezone(timezone.utc)
-                else:
-                    # Skip if not a datetime
-                    continue
-                
-                # Only check future events within the close window
-                if (event_time > now and 
-                    event_time <= end_check and
-                    event["impact"] == "high"):
-                    
-                    # Check if event affects the trading pair
-                    if relevant_currencies and event["currency"] not in relevant_currencies:
-                        continue
-                    
-                    # Get the closest imminent event
-                    event_copy = event.copy()
-                    event_copy["event_time"] = event_time
-                    if not imminent_event or event_time < imminent_event["event_time"]:
-                        imminent_event = event_copy
+            # Closest future event within the close window
+            imminent = calendar.window(now, end_check, relevant_currencies, include_start=False)
+            imminent_event = imminent[0] if imminent else None
             
             # If imminent event found, signal to close positions
             if imminent_event:
@@ -348,10 +252,10 @@ class SimpleNewsAvoidanceService:
             Dictionary with avoidance decision and details
         """
         try:
-            data = self._load_data()
+            calendar = self._get_calendar()
             
             # Check if news avoidance is enabled
-            if not data.get("settings", {}).get("enabled", True):
+            if not self._enabled:
                 return {
                     "avoid_trading": False,
                     "reason": "News avoidance disabled",
@@ -360,57 +264,17 @@ class SimpleNewsAvoidanceService:
                 }
             
             now = datetime.now(timezone.utc)
-            start_check = now - timedelta(minutes=self.minutes_after)
-            end_check = now + timedelta(minutes=self.minutes_before)
             
             # Get relevant currencies from trading pair
             relevant_currencies = self._extract_currencies_from_pair(currency_pair)
             
-            # Check for events in the avoidance window
-            current_event = None
-            next_event = None
-            
-            for event in data.get("events", []):
-                # Ensure event_time is timezone-aware UTC for comparison
-                event_time = event["event_time"]
-                if isinstance(event_time, datetime):
-                    if event_time.tzinfo is None:
-                        # Timezone-naive - assume UTC
-                        event_time = event_time.replace(tzinfo=timezone.utc)
-                    else:
-                        # Convert to UTC if it has timezone info
-                        event_time = event_time.astimezone(timezone.utc)
-                else:
-                    # Skip if not a datetime
-                    continue
-                
-                # Now compare with UTC-aware datetimes
-                if (event_time >= start_check and 
-                    event_time <= end_check and
-                    event["impact"] == "high"):
-                    
-                    # Check if event affects the trading pair
-                    if relevant_currencies and event["currency"] not in relevant_currencies:
-                        continue
-                    
-                    # Use the normalized event_time for comparisons
-                    if event_time <= now:
-                        # Past event, check if still in post-news waiting period
-                        time_since = (now - event_time).total_seconds() / 60
-                        if time_since <= self.minutes_after:
-                            # Create a copy of event with normalized time for consistency
-                            event_copy = event.copy()
-                            event_copy["event_time"] = event_time
-                            current_event = event_copy
-                    else:
-                        # Future event, check if in pre-news avoidance period
-                        time_until = (event_time - now).total_seconds() / 60
-                        if time_until <= self.minutes_before:
-                            # Create a copy of event with normalized time for consistency
-                            event_copy = event.copy()
-                            event_copy["event_time"] = event_time
-                            if not next_event or event_time < next_event["event_time"]:
-                                next_event = event_copy
+            # Latest event still in its post-news waiting period...
+            recent = calendar.window(now - timedelta(minutes=self.minutes_after), now, relevant_currencies)
+            current_event = recent[-1] if recent else None
+            # ...and the closest event inside the pre-news avoidance period
+            upcoming = calendar.window(now, now + timedelta(minutes=self.minutes_before), relevant_currencies,
+                                       include_start=False)
+            next_event = upcoming[0] if upcoming else None
             
             # Determine avoidance decision
             if current_event:
@@ -479,7 +343,308 @@ class SimpleNewsAvoidanceService:
             return [base, quote]
         
         return []
+
+
+class SimpleNewsAvoidanceService(NewsAvoidanceBase):
+    """
+    Simple file-based news avoidance service.
+    Stores news events in a JSON file instead of database.
+
+    The calendar index (NewsAvoidanceBase) is rebuilt only when the file
+    changes, not re-parsed per call.
+
+    The file is shared by the web app and the bots, so every write is a
+    read-modify-write under an exclusive flock on <file>.lock, replaces the
+    file atomically (temp file + fsync + rename: readers see the old or the
+    new file, never a torn one) and bumps the counter in <file>.version.
+    """
     
+    def __init__(self, 
+                 data_file: str = "/home/myalgo/algo-trader/data/news_events.json",
+                 minutes_before: int = 30,
+                 minutes_after: int = 60,
+                 minutes_before_close: int = 3,
+                 watch_file: bool = True):
+        """
+        Initialize the simple news avoidance service.
+        
+        Args:
+            data_file: Path to JSON file storing news events
+            minutes_before: Minutes before news to stop NEW trades (default: 30)
+            minutes_after: Minutes after news to resume trading (default: 60)
+            minutes_before_close: Minutes before news to CLOSE all positions (default: 3)
+            watch_file: Check the file for changes on every query (default). When
+                False, the index is only reloaded by refresh() (e.g. from a
+                background task), so queries never touch the disk
+        """
+        super().__init__(minutes_before, minutes_after, minutes_before_close, watch_file)
+        self.data_file = Path(data_file)
+        self.lock_file = self.data_file.with_name(self.data_file.name + ".lock")
+        self.version_file = self.data_file.with_name(self.data_file.name + ".version")
+        # Calendar index is keyed by (version, inode, mtime_ns, size)
+        self.data_version = 0
+        
+        # Ensure data directory exists (handle gracefully)
+        try:
+            self.data_file.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Initialize file if it doesn't exist
+            if not self.data_file.exists():
+                self._initialize_file()
+            else:
+                # Load settings from file to override defaults
+                try:
+                    data = self._load_data()
+                    if "settings" in data:
+                        settings = data["settings"]
+                        if "minutes_before" in settings:
+                            self.minutes_before = settings["minutes_before"]
+                        if "minutes_after" in settings:
+                            self.minutes_after = settings["minutes_after"]
+                        if "minutes_before_close" in settings:
+                            self.minutes_before_close = settings["minutes_before_close"]
+                except Exception as e:
+                    logger.warning(f"Could not load settings from file: {e}, using defaults")
+        except Exception as e:
+            logger.warning(f"Could not create data directory {self.data_file.parent}: {e}")
+            # Continue without file-based news avoidance
+            
+        logger.info(f"Simple news avoidance service initialized with file: {self.data_file}")
+        logger.info(f"Settings: {self.minutes_before} min before, {self.minutes_after} min after, {self.minutes_before_close} min before close")
+    
+    def _initialize_file(self):
+        """Initialize the JSON file with default structure."""
+        default_data = {
+            "events": [],
+            "settings": {
+                "minutes_before": self.minutes_before,
+                "minutes_after": self.minutes_after,
+                "minutes_before_close": self.minutes_before_close,
+                "enabled": True
+            }
+        }
+        
+        with self._locked():
+            if self.data_file.exists():
+                return  # another process won the race
+            self._replace_data(default_data)
+        
+        logger.info(f"Initialized news events file: {self.data_file}")
+    
+    @contextmanager
+    def _locked(self):
+        """Exclusive advisory lock for a read-modify-write of the file (all writers, all processes)."""
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+    
+    def _read_version(self) -> int:
+        """Write counter from the version sidecar (0 if never written)."""
+        try:
+            return int(self.version_file.read_text() or 0)
+        except (OSError, ValueError):
+            return 0
+    
+    def _write_atomic(self, path: Path, text: str):
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, 'w') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+    
+    def _load_data(self) -> Dict[str, Any]:
+        """Load news events from JSON file."""
+        try:
+            if not self.data_file.exists():
+                return {"events": [], "settings": {"minutes_before": 30, "minutes_after": 60, "minutes_before_close": 3, "enabled": True}}
+                
+            with open(self.data_file, 'r') as f:
+                data = json.load(f)
+            
+            # Convert string timestamps back to datetime objects
+            for event in data.get("events", []):
+                if isinstance(event.get("event_time"), str):
+                    # Naive times are UTC (that's how the admin form stores them)
+                    event["event_time"] = parse_event_time(event["event_time"])
+                        
+                if isinstance(event.get("created_at"), str):
+                    event["created_at"] = datetime.fromisoformat(event["created_at"].replace('Z', '+00:00'))
+            
+            # Load settings from file and update instance variables
+            if "settings" in data:
+                settings = data["settings"]
+                if "minutes_before" in settings:
+                    self.minutes_before = settings["minutes_before"]
+                if "minutes_after" in settings:
+                    self.minutes_after = settings["minutes_after"]
+                if "minutes_before_close" in settings:
+                    self.minutes_before_close = settings["minutes_before_close"]
+            
+            return data
+        except Exception as e:
+            logger.error(f"Error loading news data: {e}")
+            return {"events": [], "settings": {"minutes_before": 30, "minutes_after": 60, "minutes_before_close": 3, "enabled": True}}
+    
+    def refresh(self) -> bool:
+        """
+        Rebuild the calendar index if the file changed since the last load.
+        
+        A version sidecar read plus a stat: our writers bump the version, and
+        the inode/mtime/size still catch hand edits that don't.
+        
+        Returns:
+            True if the index was rebuilt
+        """
+        version = self._read_version()
+        try:
+            stat = self.data_file.stat()
+            key = (version, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            key = None
+        if self._calendar is not None and key == self._calendar_key:
+            return False
+        data = self._load_data()
+        settings = data.get("settings", {})
+        self._calendar = NewsCalendar(data.get("events", []))
+        self._settings = settings
+        self._enabled = settings.get("enabled", True)
+        self._calendar_key = key
+        self.data_version = version
+        self.calendar_reloads += 1
+        logger.debug(f"News calendar reloaded: {len(self._calendar)} high-impact events (version {version})")
+        return True
+    
+    def _save_data(self, data: Dict[str, Any]):
+        """Save news events to JSON file (caller holds _locked())."""
+        try:
+            self._replace_data(data)
+            logger.debug("News data saved successfully")
+        except Exception as e:
+            logger.error(f"Error saving news data: {e}")
+            # Don't raise - just log the error
+    
+    def add_news_event(self, 
+                      title: str, 
+                      currency: str, 
+                      event_time: datetime, 
+                      impact: str = "high") -> Dict[str, Any]:
+        """
+        Add a new news event.
+        
+        Args:
+            title: Event title (e.g., "Non-Farm Payrolls")
+            currency: Currency affected (e.g., "USD")
+            event_time: When the event occurs
+            impact: Impact level ("high", "medium", "low")
+            
+        Returns:
+            Created event dictionary
+        """
+        try:
+            with self._locked():
+                data = self._load_data()
+                
+                # Generate new ID
+                new_id = max([event.get("id", 0) for event in data.get("events", [])], default=0) + 1
+                
+                # Create new event
+                new_event = {
+                    "id": new_id,
+                    "title": title,
+                    "currency": currency.upper(),
+                    "event_time": event_time,
+                    "impact": impact,
+                    "created_at": datetime.utcnow()
+                }
+                
+                # Add to events list
+                data["events"].append(new_event)
+                
+                # Save back to file
+                self._save_data(data)
+                
+            logger.info(f"Added news event: {title} at {event_time} for {currency}")
+            return new_event
+            
+        except Exception as e:
+            logger.error(f"Error adding news event: {e}")
+            raise
+
+    def import_events(self, events: List[Dict[str, Any]], created_by: Optional[int] = None,
+                      skip_existing: bool = True) -> Dict[str, int]:
+        """
+        Bulk add events with one load and one atomic file write.
+
+        Args:
+            events: Dicts with title, currency, event_time (naive = UTC) and
+                optional impact (default "high"), e.g. from news_import.parse_calendar
+            created_by: Unused by the file store (kept for the database backend)
+            skip_existing: Skip events whose (title, currency, event_time) is
+                already stored (re-importing a calendar is a no-op)
+
+        Returns:
+            {"inserted": n, "skipped": n}
+        """
+        from app.utils.news_import import event_key
+
+        with self._locked():
+            data = self._load_data()
+            stored = data.setdefault("events", [])
+            seen = set()
+            if skip_existing:
+                for event in stored:
+                    try:
+                        seen.add(event_key(event))
+                    except (KeyError, TypeError, ValueError):
+                        continue
+
+            next_id = max([event.get("id", 0) for event in stored], default=0) + 1
+            now = datetime.utcnow()
+            inserted = skipped = 0
+            for event in events:
+                key = event_key(event)
+                if key in seen:
+                    skipped += 1
+                    continue
+                seen.add(key)
+                stored.append({
+                    "id": next_id,
+                    "title": key[0],
+                    "currency": key[1],
+                    "event_time": key[2],
+                    "impact": event.get("impact") or "high",
+                    "created_at": now
+                })
+                next_id += 1
+                inserted += 1
+
+            if inserted:
+                self._replace_data(data)
+        logger.info(f"Imported {inserted} news events ({skipped} already stored)")
+        return {"inserted": inserted, "skipped": skipped}
+
+    def _replace_data(self, data: Dict[str, Any]):
+        """
+        Replace the file atomically and bump the version; raises on failure.
+        
+        Caller holds _locked(). The data file is renamed into place before the
+        version is bumped, so a reader that sees version N can read at least N.
+        """
+        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        text = json.dumps(data, indent=2, default=lambda x: x.isoformat() if hasattr(x, 'isoformat') else str(x))
+        self._write_atomic(self.data_file, text)
+        self._write_atomic(self.version_file, str(self._read_version() + 1))
+        self._calendar_key = None
+
     def delete_news_event(self, event_id: int) -> bool:
         """
         Delete a news event by ID.
@@ -491,19 +656,20 @@ class SimpleNewsAvoidanceService:
             True if deleted, False if not found
         """
         try:
-            data = self._load_data()
-            
-            # Find and remove the event
-            original_count = len(data["events"])
-            data["events"] = [event for event in data["events"] if event.get("id") != event_id]
-            
-            if len(data["events"]) < original_count:
-                self._save_data(data)
-                logger.info(f"Deleted news event with ID: {event_id}")
-                return True
-            else:
-                logger.warning(f"News event with ID {event_id} not found")
-                return False
+            with self._locked():
+                data = self._load_data()
+                
+                # Find and remove the event
+                original_count = len(data["events"])
+                data["events"] = [event for event in data["events"] if event.get("id") != event_id]
+                
+                if len(data["events"]) < original_count:
+                    self._save_data(data)
+                    logger.info(f"Deleted news event with ID: {event_id}")
+                    return True
+                else:
+                    logger.warning(f"News event with ID {event_id} not found")
+                    return False
                 
         except Exception as e:
             logger.error(f"Error deleting news event: {e}")
@@ -523,33 +689,70 @@ class SimpleNewsAvoidanceService:
             enabled: Whether news avoidance is enabled
         """
         try:
-            data = self._load_data()
-            
-            if "settings" not in data:
-                data["settings"] = {}
-            
-            if minutes_before is not None:
-                data["settings"]["minutes_before"] = minutes_before
-                self.minutes_before = minutes_before
+            with self._locked():
+                data = self._load_data()
                 
-            if minutes_after is not None:
-                data["settings"]["minutes_after"] = minutes_after
-                self.minutes_after = minutes_after
+                if "settings" not in data:
+                    data["settings"] = {}
                 
-            if minutes_before_close is not None:
-                data["settings"]["minutes_before_close"] = minutes_before_close
-                self.minutes_before_close = minutes_before_close
+                if minutes_before is not None:
+                    data["settings"]["minutes_before"] = minutes_before
+                    self.minutes_before = minutes_before
                 
-            if enabled is not None:
-                data["settings"]["enabled"] = enabled
-            
-            self._save_data(data)
+                if minutes_after is not None:
+                    data["settings"]["minutes_after"] = minutes_after
+                    self.minutes_after = minutes_after
+                
+                if minutes_before_close is not None:
+                    data["settings"]["minutes_before_close"] = minutes_before_close
+                    self.minutes_before_close = minutes_before_close
+                
+                if enabled is not None:
+                    data["settings"]["enabled"] = enabled
+                
+                self._save_data(data)
             logger.info("News avoidance settings updated")
             
         except Exception as e:
             logger.error(f"Error updating settings: {e}")
             raise
 
-# Global instance for easy access
-simple_news_avoidance = SimpleNewsAvoidanceService()
+def news_avoidance_backend() -> str:
+    """Configured backend: "db" (NEWS_AVOIDANCE_BACKEND=db) or "file"."""
+    return "db" if os.getenv("NEWS_AVOIDANCE_BACKEND", "file").lower() == "db" else "file"
+
+
+def create_news_avoidance_service(**kwargs) -> NewsAvoidanceBase:
+    """
+    News avoidance service for the configured backend.
+    
+    NEWS_AVOIDANCE_BACKEND=db uses the red_folder_events table
+    (DbNewsAvoidanceService); anything else the JSON file.
+    """
+    if news_avoidance_backend() == "db":
+        from app.utils.db_news_avoidance import DbNewsAvoidanceService
+        return DbNewsAvoidanceService(**kwargs)
+    return SimpleNewsAvoidanceService(**kwargs)
+
+
+_shared_service: Optional[NewsAvoidanceBase] = None
+_shared_lock = threading.Lock()
+
+
+def get_news_avoidance_service() -> NewsAvoidanceBase:
+    """Process-wide service for the configured backend, created on first use."""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = create_news_avoidance_service()
+        return _shared_service
+
+
+def __getattr__(name: str):
+    # Global instance for easy access. Built on first access rather than at
+    # import, so importing this module opens no database connection or
+    # LISTEN thread; every user in a process shares the one instance.
+    if name == "simple_news_avoidance":
+        return get_news_avoidance_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
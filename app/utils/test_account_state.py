@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test the account state cache against a local fake REST server.
+
+Usage:
+    python3 app/utils/test_account_state.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.account_state import AccountStateCache
+from app.utils.oanda_client import OandaAPIError, OandaClient
+from app.utils.test_oanda_client import ACCOUNT, FakeOandaServer
+
+DETAILS = {
+    "account": {
+        "balance": "1000.0", "NAV": "1001.5", "marginAvailable": "950.0",
+        "trades": [{"id": "11", "instrument": "EUR_USD", "currentUnits": "1000"},
+                   {"id": "12", "instrument": "USD_JPY", "currentUnits": "-2000"}],
+        "positions": [{"instrument": "EUR_USD", "long": {"units": "1000"}, "short": {"units": "0"}},
+                      {"instrument": "GBP_USD", "long": {"units": "0"}, "short": {"units": "0"}}],
+        "orders": [{"id": "13", "type": "STOP_LOSS", "tradeID": "11"}],
+    },
+    "lastTransactionID": "13",
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _gets(server):
+    return sum(1 for method, path, _ in server.requests if method == "GET")
+
+
+def test_one_fetch_per_cycle():
+    """Summary, trades, positions and orders within the TTL cost one request."""
+    print("\n🗂️ Test 1: One snapshot serves a whole cycle")
+    server = FakeOandaServer({f"/v3/accounts/{ACCOUNT}": [(200, DETAILS)]})
+    clock = FakeClock()
+    try:
+        state = AccountStateCache(OandaClient(api_key="test-token", base_url=server.url), ACCOUNT,
+                                  ttl=10, clock=clock)
+        assert [t["id"] for t in state.open_trades("EUR_USD")] == ["11"]
+        assert len(state.open_trades()) == 2
+        account = state.account()
+        assert account["balance"] == "1000.0" and "trades" not in account
+        assert account["lastTransactionID"] == "13"
+        assert [p["instrument"] for p in state.positions()] == ["EUR_USD"]
+        assert state.positions("GBP_USD") == [] and len(state.pending_orders()) == 1
+        assert _gets(server) == 1 and state.hits == 5
+
+        clock.now = 9.9
+        state.open_trades("EUR_USD")
+        assert _gets(server) == 1
+
+        clock.now = 10.0  # expired
+        state.open_trades("EUR_USD")
+        assert _gets(server) == 2
+    finally:
+        server.close()
+    print(f"   ✅ {state.hits + state.fetches} reads → {state.fetches} requests (TTL expiry only)")
+
+
+def test_invalidate_and_errors():
+    """invalidate() forces a re-fetch; a failed fetch raises instead of serving stale data."""
+    print("\n♻️ Test 2: Invalidation after fills and fetch errors")
+    after_fill = {"account": {**DETAILS["account"], "balance": "998.0", "trades": []},
+                  "lastTransactionID": "15"}
+    server = FakeOandaServer({f"/v3/accounts/{ACCOUNT}": [(200, DETAILS), (200, after_fill),
+                                                           (404, {"errorMessage": "gone"})]})
+    try:
+        client = OandaClient(api_key="test-token", base_url=server.url, sleep=lambda s: None)
+        state = AccountStateCache(client, ACCOUNT, ttl=60)
+        assert len(state.open_trades()) == 2
+        state.invalidate()
+        assert state.open_trades() == [] and state.account()["balance"] == "998.0"
+        assert state.fetches == 2
+
+        state.invalidate()
+        try:
+            state.account()
+            raise AssertionError("expected OandaAPIError")
+        except OandaAPIError as e:
+            assert e.status == 404
+    finally:
+        server.close()
+    print("   ✅ Re-fetched after invalidate(), errors propagate")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Account State Cache")
+    print("=" * 70)
+    test_one_fetch_per_cycle()
+    test_invalidate_and_errors()
+    print("\n🎉 All account state tests passed!")
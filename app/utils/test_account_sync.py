@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Test incremental account sync against a local fake broker.
+
+Usage:
+    python3 app/utils/test_account_sync.py
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.account_sync import AccountSync
+from app.utils.oanda_client import OandaClient
+
+ACCOUNT = "101-001-7654321-001"
+
+
+class FakeBroker:
+    """
+    In-memory OANDA account behind a local HTTP server.
+
+    Serves GET accounts/{id} (full snapshot) and GET accounts/{id}/changes
+    (everything touched after sinceTransactionID, current object states);
+    transactions older than `horizon` are forgotten and answered with 416.
+    """
+
+    def __init__(self, balance: float = 10_000.0, horizon: int = 1_000):
+        self.balance = balance
+        self.horizon = horizon
+        self.txn = 1
+        self.trades, self.orders, self.positions = {}, {}, {}
+        self.log = []  # (txn, kind, key) for the changes endpoint
+        self.requests = []
+        self._lock = threading.Lock()
+        broker = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                broker.requests.append(url.path)
+                with broker._lock:
+                    if url.path.endswith("/changes"):
+                        since = int(parse_qs(url.query)["sinceTransactionID"][0])
+                        status, payload = broker.changes(since)
+                    else:
+                        status, payload = 200, broker.snapshot()
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v3"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # ---- broker actions ----
+
+    def _next(self) -> str:
+        self.txn += 1
+        return str(self.txn)
+
+    def _position(self, instrument: str):
+        units = {"long": 0, "short": 0}
+        for t in self.trades.values():
+            if t["instrument"] == instrument:
+                units["long" if int(t["currentUnits"]) > 0 else "short"] += int(t["currentUnits"])
+        self.positions[instrument] = {"instrument": instrument, "unrealizedPL": "0.0",
+                                      "long": {"units": str(units["long"]), "unrealizedPL": "0.0"},
+                                      "short": {"units": str(units["short"]), "unrealizedPL": "0.0"}}
+        self.log.append((self.txn, "position", instrument))
+
+    def open(self, instrument: str, units: int, price: float, sl: float) -> str:
+        with self._lock:
+            trade_id = self._next()
+            self.trades[trade_id] = {"id": trade_id, "instrument": instrument, "price": f"{price:.5f}",
+                                     "initialUnits": str(units), "currentUnits": str(units), "state": "OPEN"}
+            self.log.append((self.txn, "fill", {"id": trade_id, "type": "ORDER_FILL",
+                                                "accountBalance": f"{self.balance:.4f}"}))
+            self.log.append((self.txn, "tradesOpened", trade_id))
+            order_id = self._next()
+            self.orders[order_id] = {"id": order_id, "type": "STOP_LOSS", "tradeID": trade_id,
+                                     "price": f"{sl:.5f}", "state": "PENDING"}
+            self.log.append((self.txn, "ordersCreated", order_id))
+            self._position(instrument)
+            return trade_id
+
+    def reduce(self, trade_id: str, units: int, pl: float):
+        with self._lock:
+            self._next()
+            trade = self.trades[trade_id]
+            sign = 1 if int(trade["currentUnits"]) > 0 else -1
+            trade["currentUnits"] = str(int(trade["currentUnits"]) - sign * units)
+            self.balance += pl
+            self.log.append((self.txn, "fill", {"id": str(self.txn), "type": "ORDER_FILL",
+                                                "accountBalance": f"{self.balance:.4f}"}))
+            self.log.append((self.txn, "tradesReduced", trade_id))
+            self._position(trade["instrument"])
+
+    def close(self, trade_id: str, pl: float):
+        with self._lock:
+            self._next()
+            trade = self.trades.pop(trade_id)
+            self.balance += pl
+            self.log.append((self.txn, "fill", {"id": str(self.txn), "type": "ORDER_FILL",
+                                                "accountBalance": f"{self.balance:.4f}"}))
+            self.log.append((self.txn, "tradesClosed", dict(trade, state="CLOSED", currentUnits="0")))
+            for order_id in [o["id"] for o in self.orders.values() if o["tradeID"] == trade_id]:
+                self.log.append((self.txn, "ordersCancelled", dict(self.orders.pop(order_id), state="CANCELLED")))
+            self._position(trade["instrument"])
+
+    # ---- endpoints ----
+
+    def snapshot(self) -> dict:
+        return {"account": {"id": ACCOUNT, "balance": f"{self.balance:.4f}", "NAV": f"{self.balance:.4f}",
+                            "trades": list(self.trades.values()), "orders": list(self.orders.values()),
+                            "positions": list(self.positions.values())},
+                "lastTransactionID": str(self.txn)}
+
+    def changes(self, since: int):
+        if since < self.txn - self.horizon:
+            return 416, {"errorMessage": "sinceTransactionID out of range", "errorCode": "INVALID_RANGE"}
+        changes = {"ordersCreated": [], "ordersCancelled": [], "tradesOpened": [], "tradesReduced": [],
+                   "tradesClosed": [], "positions": [], "transactions": []}
+        seen = set()
+        for txn, kind, key in self.log:
+            if txn <= since:
+                continue
+            if kind == "fill":
+                changes["transactions"].append(key)
+            elif kind == "position":
+                if ("position", key) not in seen:
+                    changes["positions"].append(self.positions[key])
+                seen.add(("position", key))
+            elif kind in ("tradesClosed", "ordersCancelled"):
+                changes[kind].append(key)
+            elif (kind, key) not in seen:
+                seen.add((kind, key))
+                source = self.orders if kind.startswith("orders") else self.trades
+                if key in source:
+                    changes[kind].append(source[key])
+                elif kind == "tradesOpened":  # opened and closed in the window: listed in both
+                    changes[kind].append({"id": key})
+        state = {"NAV": f"{self.balance:.4f}",
+                 "trades": [{"id": t["id"], "unrealizedPL": "1.5"} for t in self.trades.values()]}
+        return 200, {"changes": changes, "state": state, "lastTransactionID": str(self.txn)}
+
+
+def _mirror(sync: AccountSync) -> dict:
+    return {
+        "balance": float(sync.account()["balance"]),
+        "trades": {t["id"]: t["currentUnits"] for t in sync.open_trades()},
+        "orders": sorted(o["id"] for o in sync.pending_orders()),
+        "positions": {p["instrument"]: (p["long"]["units"], p["short"]["units"]) for p in sync.positions()},
+    }
+
+
+def _truth(broker: FakeBroker) -> dict:
+    return {
+        "balance": broker.balance,
+        "trades": {t["id"]: t["currentUnits"] for t in broker.trades.values()},
+        "orders": sorted(broker.orders),
+        "positions": {p["instrument"]: (p["long"]["units"], p["short"]["units"])
+                      for p in broker.positions.values()
+                      if p["long"]["units"] != "0" or p["short"]["units"] != "0"},
+    }
+
+
+def _sync(broker, **kwargs) -> AccountSync:
+    client = OandaClient(api_key="test-token", base_url=broker.url, sleep=lambda s: None)
+    return AccountSync(client, ACCOUNT, ttl=0, **kwargs)
+
+
+def test_mirror_tracks_broker_with_deltas():
+    """After one snapshot, every poll is a delta and the mirror matches the broker."""
+    print("\n🔄 Test 1: Mirror advanced by changes since transaction ID")
+    broker = FakeBroker()
+    try:
+        a = broker.open("EUR_USD", 1000, 1.10000, 1.09500)
+        sync = _sync(broker)
+        assert _mirror(sync) == _truth(broker)
+
+        b = broker.open("GBP_USD", -2000, 1.26000, 1.26500)
+        assert _mirror(sync) == _truth(broker)
+        broker.reduce(b, 500, pl=12.5)
+        broker.close(a, pl=-4.0)
+        assert _mirror(sync) == _truth(broker)
+        c = broker.open("EUR_USD", 3000, 1.10100, 1.09900)
+        broker.close(c, pl=7.0)  # opened and closed between two polls
+        broker.close(b, pl=3.0)
+        assert _mirror(sync) == _truth(broker) and sync.open_trades() == []
+        assert sync.open_trades("GBP_USD") == [] and sync.positions() == []
+    finally:
+        broker.shutdown()
+
+    full = broker.requests.count(f"/v3/accounts/{ACCOUNT}")
+    delta = broker.requests.count(f"/v3/accounts/{ACCOUNT}/changes")
+    assert full == 1 and sync.full_syncs == 1 and delta == sync.delta_syncs
+    print(f"   ✅ Mirror == broker after 7 actions: 1 snapshot, {delta} delta polls, "
+          f"{sync.transactions_applied} transactions applied")
+
+
+def test_restart_resyncs_delta_only():
+    """A restarted sync restores the persisted mirror and only fetches the delta."""
+    print("\n💾 Test 2: Persisted transaction ID across restarts")
+    broker = FakeBroker()
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path = Path(tmp) / f"{ACCOUNT}.json"
+        try:
+            a = broker.open("USD_JPY", 5000, 150.000, 149.500)
+            first = _sync(broker, state_path=state_path)
+            _mirror(first)
+            assert json.loads(state_path.read_text())["lastTransactionID"] == str(broker.txn)
+
+            broker.close(a, pl=25.0)  # happens while the bot is down
+            broker.open("EUR_USD", 1000, 1.10000, 1.09500)
+            broker.requests.clear()
+            restarted = _sync(broker, state_path=state_path)
+            assert restarted.last_transaction_id == first.last_transaction_id
+            assert _mirror(restarted) == _truth(broker)
+            assert broker.requests == [f"/v3/accounts/{ACCOUNT}/changes"] * 4  # no snapshot
+            assert restarted.full_syncs == 0
+            assert json.loads(state_path.read_text())["lastTransactionID"] == str(broker.txn)
+        finally:
+            broker.shutdown()
+    print("   ✅ Restart resumed from the saved transaction ID without a snapshot")
+
+
+def test_out_of_range_falls_back_to_snapshot():
+    """A transaction ID beyond the broker's horizon triggers one full resync."""
+    print("\n⏪ Test 3: Full resync when the delta is unavailable")
+    broker = FakeBroker(horizon=3)
+    try:
+        a = broker.open("EUR_USD", 1000, 1.10000, 1.09500)
+        sync = _sync(broker)
+        _mirror(sync)
+        broker.close(a, pl=1.0)
+        for _ in range(3):
+            broker.open("GBP_USD", 1000, 1.26000, 1.25500)
+        assert _mirror(sync) == _truth(broker)
+        assert sync.full_syncs == 2
+        broker.open("EUR_USD", 1000, 1.10000, 1.09500)
+        assert _mirror(sync) == _truth(broker) and sync.full_syncs == 2
+    finally:
+        broker.shutdown()
+    print("   ✅ Out-of-range transaction ID resynced from a snapshot, then deltas resumed")
+
+
+def _saver(state_path: str, bot: int, saves: int):
+    sync = AccountSync(None, ACCOUNT)
+    sync.state_path = Path(state_path)
+    for i in range(saves):
+        sync.last_transaction_id = str(bot + 10 * i)
+        sync.summary = {"balance": str(i), "bot": bot, "padding": "x" * 20_000}
+        sync.save()
+
+
+def test_bots_sharing_an_account_file():
+    """Bots on one account save the same mirror file concurrently without corrupting or rewinding it."""
+    print("\n👥 Test 4: Concurrent saves from several bots")
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path = Path(tmp) / f"{ACCOUNT}.json"
+        bots, saves = 4, 50
+        procs = [multiprocessing.Process(target=_saver, args=(str(state_path), bot, saves)) for bot in range(bots)]
+        for p in procs:
+            p.start()
+        reads = 0
+        while any(p.is_alive() for p in procs):
+            if state_path.exists():
+                json.loads(state_path.read_text())  # raises on a torn file
+                reads += 1
+        for p in procs:
+            p.join()
+            assert p.exitcode == 0
+
+        state = json.loads(state_path.read_text())
+        assert state["lastTransactionID"] == str(bots - 1 + 10 * (saves - 1))  # newest mirror wins
+        assert sorted(os.listdir(tmp)) == [f"{ACCOUNT}.json", f"{ACCOUNT}.json.lock"]
+
+        stale = AccountSync(None, ACCOUNT, state_path=state_path)
+        stale.last_transaction_id = "5"
+        stale.save()
+        assert json.loads(state_path.read_text())["lastTransactionID"] == state["lastTransactionID"]
+    print(f"   ✅ {bots * saves} saves from {bots} processes, {reads} clean reads, no rewind, no temp files")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Incremental Account Sync")
+    print("=" * 70)
+    test_mirror_tracks_broker_with_deltas()
+    test_restart_resyncs_delta_only()
+    test_out_of_range_falls_back_to_snapshot()
+    test_bots_sharing_an_account_file()
+    print("\n🎉 All account sync tests passed!")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test the async news avoidance backend used by the API routes.
+
+Usage:
+    python3 app/utils/test_async_news_avoidance.py
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import app.api.routes.news_avoidance as routes
+import app.utils.simple_news_avoidance as news
+from app.utils.async_news_avoidance import AsyncNewsAvoidance
+from app.utils.simple_news_avoidance import SimpleNewsAvoidanceService
+
+
+class RecordingService(SimpleNewsAvoidanceService):
+    """Records the thread every file check runs on."""
+
+    def __init__(self, *args, **kwargs):
+        self.refresh_threads = []
+        super().__init__(*args, **kwargs)
+
+    def refresh(self) -> bool:
+        self.refresh_threads.append(threading.get_ident())
+        return super().refresh()
+
+
+def _write(path: Path, events):
+    path.write_text(json.dumps({"events": events, "settings": {
+        "minutes_before": 30, "minutes_after": 60, "minutes_before_close": 3, "enabled": True}}))
+
+
+async def _reads_stay_on_memory(path: Path):
+    service = RecordingService(data_file=str(path))
+    backend = AsyncNewsAvoidance(service, poll_seconds=0.05)
+    loop_thread = threading.get_ident()
+    service.refresh_threads.clear()
+
+    results = await asyncio.gather(*(backend.should_avoid_trading("EUR_USD") for _ in range(200)))
+    assert all(not r["avoid_trading"] for r in results)
+    assert service.refresh_threads and loop_thread not in service.refresh_threads
+
+    # Read-your-write through the lock, file I/O off the loop
+    soon = datetime.now(timezone.utc) + timedelta(minutes=10)
+    event = await backend.add_news_event("US CPI", "USD", soon)
+    assert (await backend.should_avoid_trading("EUR_USD"))["next_event"]["title"] == "US CPI"
+    assert await backend.delete_news_event(event["id"])
+    assert not (await backend.should_avoid_trading("EUR_USD"))["avoid_trading"]
+    settings = await backend.update_settings(minutes_before=45)
+    assert settings["minutes_before"] == 45 and (await backend.get_settings())["minutes_before"] == 45
+
+    # External edit is picked up by the background check
+    _write(path, [{"id": 1, "title": "GBP BoE", "currency": "GBP", "impact": "high",
+                   "event_time": (datetime.now(timezone.utc) + timedelta(minutes=2)).isoformat()}])
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    for _ in range(100):
+        await asyncio.sleep(0.02)
+        if (await backend.should_close_positions("GBP_USD"))["close_positions"]:
+            break
+    else:
+        raise AssertionError("external edit not picked up")
+
+    await backend.stop()
+    assert loop_thread not in service.refresh_threads
+    return len(service.refresh_threads)
+
+
+async def _routes_use_backend(path: Path):
+    service = SimpleNewsAvoidanceService(data_file=str(path))
+    original = routes.async_news_avoidance
+    routes.async_news_avoidance = AsyncNewsAvoidance(service, poll_seconds=0)
+    try:
+        soon = datetime.now(timezone.utc) + timedelta(minutes=2)
+        created = await routes.create_news_event(routes.NewsEventCreate(title="JPY BoJ", currency="jpy",
+                                                                        event_time=soon))
+        assert created["currency"] == "JPY"
+        assert (await routes.check_should_close_positions("USD_JPY"))["close_positions"]
+        assert (await routes.get_next_transition("USD_JPY"))["close_positions"]
+        assert [e["title"] for e in await routes.get_upcoming_news(hours_ahead=1)] == ["JPY BoJ"]
+        assert (await routes.update_settings(enabled=False))["enabled"] is False
+        assert not (await routes.check_should_avoid_trading("USD_JPY"))["avoid_trading"]
+    finally:
+        await routes.async_news_avoidance.stop()
+        routes.async_news_avoidance = original
+
+
+def test_reads_never_touch_disk_on_loop():
+    """Checks are served from memory; loads, writes and refreshes run in worker threads."""
+    print("\n⚡ Test 1: Event loop stays free of file I/O")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        _write(path, [])
+        refreshes = asyncio.run(_reads_stay_on_memory(path))
+    print(f"   ✅ 200 concurrent checks, 3 writes, 1 external edit: {refreshes} file checks, all off the loop")
+
+
+def test_routes_use_async_backend():
+    """The API handlers go through the async backend."""
+    print("\n🌐 Test 2: API routes")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        _write(path, [])
+        asyncio.run(_routes_use_backend(path))
+    print("   ✅ Create, check, transition, upcoming and settings routes")
+
+
+def test_one_shared_service_per_process():
+    """Imports create no service; the async backend wraps the module's shared instance."""
+    print("\n🔗 Test 3: One service per process")
+    probe = ("import app.api.routes.news_avoidance, app.utils.simple_news_avoidance as news; "
+             "assert news._shared_service is None")
+    subprocess.run([sys.executable, "-c", probe], cwd=project_root, check=True,
+                   env=dict(os.environ, NEWS_AVOIDANCE_BACKEND="db"))
+
+    saved = news._shared_service
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        _write(path, [])
+        try:
+            news._shared_service = SimpleNewsAvoidanceService(data_file=str(path))
+            backend = AsyncNewsAvoidance(poll_seconds=0)
+            assert backend.service is news.simple_news_avoidance is news.get_news_avoidance_service()
+            assert not news.simple_news_avoidance.watch_file
+        finally:
+            news._shared_service = saved
+    print("   ✅ Nothing built at import; AsyncNewsAvoidance() shares simple_news_avoidance")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Async News Avoidance Backend")
+    print("=" * 70)
+    test_reads_never_touch_disk_on_loop()
+    test_routes_use_async_backend()
+    test_one_shared_service_per_process()
+    print("\n🎉 All async news avoidance tests passed!")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test the bar-close scheduler with a simulated clock.
+
+Usage:
+    python3 app/utils/test_bar_scheduler.py
+"""
+
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.bar_scheduler import BarCloseScheduler
+
+START = datetime(2025, 11, 27, 10, 17, 42, tzinfo=timezone.utc).timestamp()
+
+
+class FakeClock:
+    """time.time()/time.sleep() pair that advances instantly."""
+
+    def __init__(self, now: float):
+        self.now = now
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _scheduler(clock: FakeClock, **kwargs) -> BarCloseScheduler:
+    return BarCloseScheduler("H1", settle_seconds=5, clock=clock.time, sleep=clock.sleep, **kwargs)
+
+
+def test_wakes_at_bar_close_plus_settle():
+    """First tick fires at the next H1 close + settle delay, then every hour."""
+    print("\n⏰ Test 1: Aligned to bar close")
+    clock = FakeClock(START)
+    scheduler = _scheduler(clock)
+
+    tick = scheduler.wait()
+    assert tick.bar_close == datetime(2025, 11, 27, 11, 0, tzinfo=timezone.utc)
+    assert clock.now == tick.bar_close.timestamp() + 5
+    assert tick.drift_seconds == 0 and tick.missed == 0
+    assert tick.next_close == datetime(2025, 11, 27, 12, 0, tzinfo=timezone.utc)
+    assert max(clock.sleeps) <= 30  # sleeps in short slices
+
+    clock.now += 42  # a cycle's worth of work
+    scheduler.record_done(tick)
+    tick = scheduler.wait()
+    assert tick.bar_close == datetime(2025, 11, 27, 12, 0, tzinfo=timezone.utc)
+    assert clock.now == tick.bar_close.timestamp() + 5
+
+    stats = scheduler.stats()
+    assert stats["ticks"] == 2 and stats["missed"] == 0
+    assert stats["latency"]["last"] == 47.0
+    print("   ✅ Ticks at HH:00:05 every hour")
+
+
+def test_missed_ticks_catch_up():
+    """An overrunning cycle fires once for the latest close, counting the misses."""
+    print("\n⏰ Test 2: Missed-tick catch-up")
+    clock = FakeClock(START)
+    scheduler = _scheduler(clock)
+    scheduler.wait()  # 11:00
+
+    clock.now += 3 * 3600 + 600  # stalled until 14:10
+    clock.sleeps.clear()
+    tick = scheduler.wait()
+    assert clock.sleeps == []  # no waiting, fires immediately
+    assert tick.bar_close == datetime(2025, 11, 27, 14, 0, tzinfo=timezone.utc)
+    assert tick.missed == 2  # 12:00 and 13:00 coalesced into 14:00
+    assert scheduler.stats()["missed"] == 2
+
+    tick = scheduler.wait()
+    assert tick.bar_close == datetime(2025, 11, 27, 15, 0, tzinfo=timezone.utc)
+    assert tick.missed == 0
+    print("   ✅ Overrun fires once for the latest close")
+
+
+def test_fire_immediately():
+    """fire_immediately returns the latest completed bar without sleeping."""
+    print("\n⏰ Test 3: Fire immediately on startup")
+    clock = FakeClock(START)
+    scheduler = _scheduler(clock, fire_immediately=True)
+    tick = scheduler.wait()
+    assert clock.sleeps == []
+    assert tick.bar_close == datetime(2025, 11, 27, 10, 0, tzinfo=timezone.utc)
+    assert scheduler.wait().bar_close == datetime(2025, 11, 27, 11, 0, tzinfo=timezone.utc)
+    print("   ✅ Startup tick for the 10:00 close, then 11:00")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Bar-Close Scheduler")
+    print("=" * 70)
+    test_wakes_at_bar_close_plus_settle()
+    test_missed_ticks_catch_up()
+    test_fire_immediately()
+    print("\n🎉 All scheduler tests passed!")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test candle ingestion into the columnar store with a replay source.
+
+Usage:
+    python3 app/utils/test_candle_ingest.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.candle_ingest import CandleIngestor, OandaCandleSource, ReplayCandleSource, find_gaps
+from app.utils.oanda_client import OandaClient
+from app.utils.candle_store import CandleStore, to_time_ns
+
+
+def _h1_candles(start: str, periods: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0005, periods))
+    return pd.DataFrame({
+        "time": pd.date_range(start, periods=periods, freq="h", tz="UTC"),
+        "open": close - 0.0001,
+        "high": close + 0.0008,
+        "low": close - 0.0008,
+        "close": close,
+        "volume": rng.integers(100, 1000, periods),
+    })
+
+
+def test_replay_ingest_is_incremental_and_idempotent():
+    """Bars appear as the clock passes their close; re-running adds nothing."""
+    print("\n📥 Test 1: Incremental, idempotent ingestion")
+    candles = _h1_candles("2025-11-24 00:00", 48)  # Mon-Tue
+    now = [candles["time"].iloc[10].timestamp() + 3600 + 5]  # 10:00 bar just closed
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = ReplayCandleSource(candles, clock=lambda: now[0])
+        ingestor = CandleIngestor("EUR_USD", source, ("H1",), tmp, backfill_count=5)
+
+        result = ingestor.ingest("H1")
+        assert result.appended == 5 and result.last_time == candles["time"].iloc[10]
+
+        again = ingestor.ingest("H1")
+        assert (again.appended, again.updated) == (0, 0)
+
+        now[0] += 3 * 3600  # three more bars close
+        result = ingestor.ingest("H1")
+        assert result.appended == 3 and result.gaps == []
+
+        store = CandleStore("EUR_USD", "H1", tmp)
+        expected = candles.iloc[6:14].reset_index(drop=True)
+        stored = store.tail_frame(100)
+        assert stored["time"].equals(expected["time"])
+        assert np.array_equal(stored["close"].to_numpy(), expected["close"].to_numpy())
+
+        # A revised last bar is rewritten in place, not duplicated
+        source.df.loc[13, "close"] += 0.0002
+        result = ingestor.ingest("H1")
+        assert (result.appended, result.updated) == (0, 1)
+        assert len(store.tail_frame(100)) == 8
+    print("   ✅ 5 backfilled, 0 on re-run, +3 after 3 closes, 1 revised in place")
+
+
+def test_gap_detection_ignores_weekend():
+    """Missing weekday bars are reported; the Friday-Sunday closure is not."""
+    print("\n🕳️  Test 2: Gap detection")
+    week = _h1_candles("2025-11-20 00:00", 24 * 6)  # Thu → Tue
+    open_market = week[~week["time"].map(lambda t: t.weekday() == 5
+                                         or (t.weekday() == 4 and t.hour >= 21)
+                                         or (t.weekday() == 6 and t.hour < 22))]
+    assert find_gaps(to_time_ns(open_market["time"]), "H1") == []
+
+    holed = open_market.drop(open_market.index[5:8])
+    gaps = find_gaps(to_time_ns(holed["time"]), "H1")
+    assert len(gaps) == 1 and gaps[0][2] == 3
+    print("   ✅ Weekend ignored, 3-bar weekday hole reported")
+
+
+def test_oanda_source_keeps_complete_candles():
+    """The OANDA source parses mid prices and drops the forming candle."""
+    print("\n🌐 Test 3: OANDA candle parsing")
+
+    class FakeResponse:
+        ok = True
+        content = b"{}"
+
+        def json(self):
+            return {"candles": [
+                {"time": "2025-11-27T09:00:00.000000000Z", "complete": True, "volume": 812,
+                 "mid": {"o": "1.15870", "h": "1.15912", "l": "1.15851", "c": "1.15893"}},
+                {"time": "2025-11-27T10:00:00.000000000Z", "complete": False, "volume": 40,
+                 "mid": {"o": "1.15893", "h": "1.15900", "l": "1.15880", "c": "1.15888"}},
+            ]}
+
+    class FakeSession:
+        def __init__(self):
+            self.headers = {}
+            self.calls = []
+
+        def mount(self, prefix, adapter):
+            pass
+
+        def request(self, method, url, params=None, json=None, timeout=None):
+            self.calls.append((url, params))
+            return FakeResponse()
+
+    session = FakeSession()
+    source = OandaCandleSource(client=OandaClient(api_key="test-token", session=session))
+    df = source.fetch("EUR_USD", "H1", since=pd.Timestamp("2025-11-27 09:00", tz="UTC"))
+    assert len(df) == 1 and df["close"].iloc[0] == 1.15893 and df["volume"].iloc[0] == 812
+    url, params = session.calls[0]
+    assert url.endswith("/instruments/EUR_USD/candles") and params["from"].startswith("2025-11-27T09:00:00")
+    assert list(source.client.latency_stats()) == ["GET instruments/EUR_USD/candles"]
+    print("   ✅ Complete candle kept, forming candle dropped, request went through the pooled client")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Candle Ingestion")
+    print("=" * 70)
+    test_replay_ingest_is_incremental_and_idempotent()
+    test_gap_detection_ignores_weekend()
+    test_oanda_source_keeps_complete_candles()
+    print("\n🎉 All ingestion tests passed!")
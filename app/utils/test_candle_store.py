@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the columnar candle store: CSV conversion, append, upsert, range and tail.
+
+Usage:
+    python3 app/utils/test_candle_store.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.candle_store import CandleStore, open_store, to_time_ns
+
+
+def _candles(n: int, start: str = "2024-01-01", seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.001, n))
+    return pd.DataFrame({
+        "time": pd.date_range(start, periods=n, freq="h", tz="UTC"),
+        "open": close - 0.0002,
+        "high": close + 0.0005,
+        "low": close - 0.0005,
+        "close": close,
+        "volume": rng.integers(100, 5000, n),
+    })
+
+
+def _frame(store: CandleStore) -> pd.DataFrame:
+    return store.range_frame()
+
+
+def test_from_csv_streams_chunks():
+    """Conversion with small chunks equals the sorted, de-duplicated CSV."""
+    print("\n📦 Test 1: CSV → store in chunks")
+    df = _candles(1_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = Path(tmp) / "EUR_USD_H1.csv"
+        dup = df.iloc[[299]].assign(close=9.9)  # repeated bar right after a chunk boundary (keep last)
+        pd.concat([df.iloc[:300], dup, df.iloc[300:]]).to_csv(csv, index=False)
+        expected = df.copy()
+        expected.loc[299, "close"] = 9.9
+
+        store = CandleStore.from_csv(csv, "EUR_USD", "H1", tmp, chunksize=100)
+        assert len(store) == 1_000
+        pd.testing.assert_frame_equal(_frame(store), expected)
+        try:
+            CandleStore.from_csv(csv, "EUR_USD", "H1", tmp)
+            raise AssertionError("existing store overwritten")
+        except FileExistsError:
+            pass
+
+        shuffled = Path(tmp) / "shuffled.csv"
+        df.sample(frac=1, random_state=5).to_csv(shuffled, index=False)
+        store = CandleStore.from_csv(shuffled, "GBP_USD", "H1", tmp, chunksize=100)
+        pd.testing.assert_frame_equal(_frame(store), df)
+    print("   ✅ Sorted file streamed 100 rows at a time; shuffled file converted with a full sort")
+
+
+def test_append_upsert_range_tail():
+    """Writes round-trip through the memmapped columns; reads see other writers after refresh()."""
+    print("\n🔁 Test 2: append / upsert / range / tail")
+    df = _candles(500)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CandleStore("USD_JPY", "H1", tmp)
+        assert open_store("USD_JPY", "H1", tmp) is None and store.last_time() is None
+        assert store.append_frame(df.iloc[:300]) == 300
+        try:
+            store.append_frame(df.iloc[250:260])
+            raise AssertionError("older bars appended")
+        except ValueError:
+            pass
+
+        revised = df.iloc[295:400].copy()
+        revised.loc[299, "close"] += 0.01  # late revision of the last stored bar
+        assert store.upsert_frame(revised) == (100, 1)
+        assert store.upsert_frame(revised) == (0, 0)  # idempotent
+        expected = df.iloc[:400].copy()
+        expected.loc[299, "close"] += 0.01
+
+        reader = open_store("USD_JPY", "H1", tmp)
+        pd.testing.assert_frame_equal(_frame(reader), expected)
+        pd.testing.assert_frame_equal(reader.tail_frame(10), expected.tail(10).reset_index(drop=True))
+        window = reader.range_frame(df["time"].iloc[100], df["time"].iloc[150])
+        pd.testing.assert_frame_equal(window, expected.iloc[100:150].reset_index(drop=True))
+        assert len(reader.range(int(to_time_ns([df["time"].iloc[390]])[0]))["time"]) == 10
+
+        store.append_frame(df.iloc[400:])
+        assert len(reader) == 400  # cached row count until refresh()
+        reader.refresh()
+        assert len(reader) == 500 and reader.last_time() == df["time"].iloc[-1]
+    print("   ✅ 300 appended, 100 upserted + 1 revised, range/tail match, refresh sees new rows")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Candle Store")
+    print("=" * 70)
+    test_from_csv_streams_chunks()
+    test_append_upsert_range_tail()
+    print("\n🎉 All candle store tests passed!")
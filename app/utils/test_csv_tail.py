@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the tail-seek CSV loader against a full pandas read.
+
+Usage:
+    python3 app/utils/test_csv_tail.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.csv_tail import read_csv_tail
+
+
+def _candles(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.001, n))
+    return pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=n, freq="h", tz="UTC").strftime("%Y-%m-%d %H:%M:%S+00:00"),
+        "open": close.round(5),
+        "high": (close + 0.0005).round(5),
+        "low": (close - 0.0005).round(5),
+        "close": close.round(5),
+        "volume": rng.integers(100, 5000, n),
+    })
+
+
+def _expected(path: Path, count: int) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    df["time"] = pd.to_datetime(df["time"])
+    return df.sort_values("time").tail(count).reset_index(drop=True)
+
+
+def test_matches_full_read():
+    """Any count and block size gives exactly pd.read_csv(...).tail(n)."""
+    print("\n📄 Test 1: Tail read == full read + tail")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "EUR_USD_H1.csv"
+        _candles(2_000).to_csv(path, index=False)
+        for count in (1, 2, 50, 333, 1_999, 2_000):
+            for block_size in (37, 4096, 64 * 1024):  # boundaries inside lines, many blocks, one block
+                pd.testing.assert_frame_equal(read_csv_tail(path, count, block_size=block_size),
+                                              _expected(path, count))
+        assert len(read_csv_tail(path, 0)) == 0
+    print("   ✅ 6 counts x 3 block sizes identical to the full read")
+
+
+def test_short_file_and_line_endings():
+    """Files shorter than n, without a trailing newline, or with CRLF endings."""
+    print("\n✂️  Test 2: Short files and line endings")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "short.csv"
+        _candles(5).to_csv(path, index=False)
+        pd.testing.assert_frame_equal(read_csv_tail(path, 500), _expected(path, 500))
+        assert len(read_csv_tail(path, 500)) == 5
+
+        text = path.read_text()
+        path.write_text(text.rstrip("\n"))  # no trailing newline
+        pd.testing.assert_frame_equal(read_csv_tail(path, 3, block_size=16), _expected(path, 3))
+        pd.testing.assert_frame_equal(read_csv_tail(path, 5), _expected(path, 5))
+
+        path.write_bytes(text.replace("\n", "\r\n").encode())
+        pd.testing.assert_frame_equal(read_csv_tail(path, 3, block_size=16), _expected(path, 3))
+
+        path.write_text(text.splitlines()[0] + "\n")  # header only
+        assert len(read_csv_tail(path, 10)) == 0
+    print("   ✅ Short file returns every row; missing trailing newline and CRLF handled")
+
+
+def test_unsorted_file_falls_back():
+    """Out-of-order tails, or a sorted tail older than the first row, use the full read + sort."""
+    print("\n🔀 Test 3: Unsorted files")
+    df = _candles(1_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "shuffled.csv"
+        df.sample(frac=1, random_state=3).to_csv(path, index=False)
+        pd.testing.assert_frame_equal(read_csv_tail(path, 100), _expected(path, 100))
+
+        # Two sorted halves, newer half first: the tail is in order but not the latest rows
+        path = Path(tmp) / "rotated.csv"
+        pd.concat([df.iloc[500:], df.iloc[:500]]).to_csv(path, index=False)
+        pd.testing.assert_frame_equal(read_csv_tail(path, 100), _expected(path, 100))
+        assert str(read_csv_tail(path, 1)["time"].iloc[0]) == str(pd.Timestamp(df["time"].iloc[-1]))
+    print("   ✅ Shuffled and rotated files return the latest rows in time order")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing CSV Tail Loader")
+    print("=" * 70)
+    test_matches_full_read()
+    test_short_file_and_line_endings()
+    test_unsorted_file_falls_back()
+    print("\n🎉 All CSV tail tests passed!")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test the red_folder_events backed news avoidance service.
+
+Runs against a throwaway SQLite database (no LISTEN there, so cross-process
+invalidation goes through the change-marker poll).
+
+Usage:
+    python3 app/utils/test_db_news_avoidance.py
+"""
+
+import json
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.models.red_folder_event import RedFolderEvent
+from app.models.system_settings import SystemSettings
+from app.utils.db_news_avoidance import DbNewsAvoidanceService
+from app.utils.simple_news_avoidance import NewsAvoidanceBase, SimpleNewsAvoidanceService
+
+
+def _session_factory(tmp: str):
+    engine = create_engine(f"sqlite:///{tmp}/news.db")
+    Base.metadata.create_all(engine, tables=[RedFolderEvent.__table__, SystemSettings.__table__])
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False), statements
+
+
+def test_checks_and_writes():
+    """Same decisions as the file service; writes are single statements."""
+    print("\n🗄️ Test 1: Checks and O(1) writes on red_folder_events")
+    now = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        factory, statements = _session_factory(tmp)
+        service = DbNewsAvoidanceService(factory)
+        assert not service.listening
+        assert isinstance(service, NewsAvoidanceBase) and not isinstance(service, SimpleNewsAvoidanceService)
+
+        class ReadOnlyBackend(NewsAvoidanceBase):
+            def refresh(self):
+                return False
+        try:
+            ReadOnlyBackend()
+            raise AssertionError("backend without writes instantiated")
+        except TypeError:
+            pass  # incomplete backends fail at construction, not on the first write
+        assert "ix_red_folder_events_currency_event_time" in {
+            ix["name"] for ix in inspect(factory.kw["bind"]).get_indexes("red_folder_events")}
+
+        cpi = service.add_news_event("US CPI", "usd", now + timedelta(minutes=10))
+        service.add_news_event("EUR PMI", "EUR", now + timedelta(minutes=2), impact="medium")
+        boj = service.add_news_event("JPY BoJ", "JPY", (now + timedelta(minutes=2)).replace(tzinfo=None))
+        assert cpi["currency"] == "USD" and cpi["event_time"].tzinfo is not None
+
+        assert service.should_avoid_trading("EUR_USD")["next_event"]["title"] == "US CPI"
+        assert service.should_close_positions("USD_JPY")["next_event"]["title"] == "JPY BoJ"
+        assert not service.should_close_positions("EUR_GBP")["close_positions"]  # medium ignored
+        assert [e["title"] for e in service.get_upcoming_news(1)] == ["JPY BoJ", "US CPI"]
+
+        statements.clear()
+        assert service.delete_news_event(boj["id"])
+        assert not service.delete_news_event(boj["id"])
+        writes = [s for s in statements if s.lstrip().upper().startswith(("INSERT", "DELETE", "UPDATE"))]
+        assert len(writes) == 2, writes
+        assert not service.should_close_positions("USD_JPY")["close_positions"]
+
+        service.update_settings(minutes_before=5, enabled=True)
+        assert not service.should_avoid_trading("EUR_USD")["avoid_trading"]
+        assert service.settings["minutes_before"] == 5
+    print("   ✅ Avoid/close/upcoming decisions, single-statement add/delete, settings in system_settings")
+
+
+def test_bulk_import_and_cross_process_refresh():
+    """Imports are idempotent; other processes pick up changes without a restart."""
+    print("\n📥 Test 2: Bulk import and cache invalidation across instances")
+    now = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        factory, statements = _session_factory(tmp)
+        writer = DbNewsAvoidanceService(factory)
+        reader = DbNewsAvoidanceService(factory, poll_seconds=0)
+        assert not reader.should_avoid_trading("GBP_USD")["avoid_trading"]
+
+        path = Path(tmp) / "news_events.json"
+        events = [{"id": i, "title": f"Event {i}", "currency": ["USD", "GBP", "JPY"][i % 3],
+                   "event_time": (now + timedelta(hours=i)).isoformat(), "impact": "high"} for i in range(1, 301)]
+        events.append({"id": 999, "title": "BoE", "currency": "GBP",
+                       "event_time": (now + timedelta(minutes=1)).strftime("%Y-%m-%dT%H:%M:%S.%fZ"), "impact": "high"})
+        path.write_text(json.dumps({"events": events, "settings": {
+            "minutes_before": 20, "minutes_after": 45, "minutes_before_close": 3, "enabled": True}}))
+
+        statements.clear()
+        assert writer.import_json_file(str(path)) == {"inserted": 301, "skipped": 0}
+        assert sum(s.lstrip().upper().startswith("INSERT INTO RED_FOLDER_EVENTS") for s in statements) == 1
+        assert writer.import_json_file(str(path)) == {"inserted": 0, "skipped": 301}
+
+        # Repeats within one batch count as skipped, as in the file backend
+        batch = [{"title": "US CPI", "currency": "usd", "event_time": now + timedelta(days=30)}] * 3
+        file_service = SimpleNewsAvoidanceService(data_file=str(Path(tmp) / "file_events.json"))
+        assert writer.import_events(batch) == file_service.import_events(batch) == {"inserted": 1, "skipped": 2}
+        assert writer.import_events(batch) == file_service.import_events(batch) == {"inserted": 0, "skipped": 3}
+
+        # Another instance (process) sees the import on its next check
+        assert reader.should_close_positions("GBP_USD")["next_event"]["title"] == "BoE"
+        assert reader.settings["minutes_after"] == 45
+        reloads = reader.calendar_reloads
+        for _ in range(50):
+            reader.should_avoid_trading("GBP_USD")
+        assert reader.calendar_reloads == reloads  # unchanged table: no reload
+    print(f"   ✅ 301 events in one executemany, re-import skipped, reader reloaded {reader.calendar_reloads}x")
+
+
+def test_updated_rows_are_reloaded():
+    """Editing an event in place (same count, same max id) still reaches other instances."""
+    print("\n✏️ Test 3: Reload after UPDATE")
+    now = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        factory, _ = _session_factory(tmp)
+        writer = DbNewsAvoidanceService(factory)
+        reader = DbNewsAvoidanceService(factory, poll_seconds=0)
+        nfp = writer.add_news_event("NFP", "USD", now + timedelta(hours=5))
+        assert not reader.should_avoid_trading("EUR_USD")["avoid_trading"]
+
+        # Polling: the ORM update bumps updated_at, so the marker changes
+        session = factory()
+        row = session.get(RedFolderEvent, nfp["id"])
+        row.event_time = (now + timedelta(minutes=10)).replace(tzinfo=None)
+        session.commit()
+        session.close()
+        reloads = reader.calendar_reloads
+        assert reader.should_avoid_trading("EUR_USD")["next_event"]["title"] == "NFP"
+        assert reader.calendar_reloads == reloads + 1
+
+        # LISTEN: a notification reloads even when the marker can't tell
+        listener = DbNewsAvoidanceService(factory, listen=False)
+        listener.listening = True  # as if on Postgres; notifications simulated below
+        assert listener.should_avoid_trading("EUR_USD")["avoid_trading"]
+        with factory.kw["bind"].begin() as conn:
+            conn.execute(text("UPDATE red_folder_events SET title = 'Non-Farm Payrolls'"))
+        assert listener.should_avoid_trading("EUR_USD")["next_event"]["title"] == "NFP"  # no notification yet
+        listener._version += 1
+        assert listener.should_avoid_trading("EUR_USD")["next_event"]["title"] == "Non-Farm Payrolls"
+    print("   ✅ Moved event picked up by polling, in-place edit picked up on notification")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Database News Avoidance Service")
+    print("=" * 70)
+    test_checks_and_writes()
+    test_bulk_import_and_cross_process_refresh()
+    test_updated_rows_are_reloaded()
+    print("\n🎉 All database news avoidance tests passed!")
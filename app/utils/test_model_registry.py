@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test ensemble loading and hot reload in the model registry.
+
+Usage:
+    python3 app/utils/test_model_registry.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.model_registry import DEFAULT_SEEDS, ModelRegistry
+
+INSTRUMENT = "EUR_USD"
+
+
+def _save_booster(path: Path, seed: int, rounds: int = 5):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, 4))
+    y = (X[:, 0] + rng.normal(0, 0.5, 200) > 0).astype(int)
+    booster = xgb.train({"objective": "binary:logistic", "max_depth": 2, "seed": seed},
+                        xgb.DMatrix(X, label=y), num_boost_round=rounds)
+    booster.save_model(str(path))
+
+
+def _model_dir(tmp: str) -> Path:
+    model_dir = Path(tmp)
+    for seed in DEFAULT_SEEDS:
+        _save_booster(model_dir / f"{INSTRUMENT}_xgboost_seed{seed}.json", seed)
+    return model_dir
+
+
+def _bump_mtime(path: Path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+
+def test_loads_once():
+    """Boosters are deserialized once and served from memory afterwards."""
+    print("\n📦 Test 1: Ensemble loaded once")
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(_model_dir(tmp), INSTRUMENT)
+        models = registry.get_models()
+        assert len(models) == len(DEFAULT_SEEDS)
+        for _ in range(20):
+            assert registry.get_models() is models
+        stats = registry.stats()
+        assert stats["ensemble_size"] == 5 and stats["reloads"] == 0 and stats["load_ms"] is not None
+    print(f"   ✅ 5 boosters loaded in {stats['load_ms']} ms, 20 calls without reloading")
+
+
+def test_touch_without_change_does_not_reload():
+    """A new mtime with identical bytes (touch, re-copy of the same file) keeps the loaded set."""
+    print("\n👆 Test 2: mtime-only change")
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = _model_dir(tmp)
+        registry = ModelRegistry(model_dir, INSTRUMENT)
+        models = registry.get_models()
+
+        path = model_dir / f"{INSTRUMENT}_xgboost_seed43.json"
+        _bump_mtime(path)
+        assert registry.get_models() is models
+        path.write_bytes(path.read_bytes())  # rewritten, same content
+        _bump_mtime(path)
+        assert registry.get_models() is models
+        assert registry.stats()["reloads"] == 0
+    print("   ✅ Touched and re-copied files: content hash unchanged, no reload")
+
+
+def test_rewrite_reloads_once():
+    """New model bytes reload the ensemble exactly once; a torn file keeps the previous set."""
+    print("\n🔄 Test 3: Model file rewritten")
+    X = xgb.DMatrix(np.random.default_rng(0).normal(size=(10, 4)))
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = _model_dir(tmp)
+        registry = ModelRegistry(model_dir, INSTRUMENT)
+        before = registry.get_models()
+        path = model_dir / f"{INSTRUMENT}_xgboost_seed44.json"
+        old_sha = registry.stats()["models"][1]["sha256"]
+
+        _save_booster(path, 44, rounds=20)
+        _bump_mtime(path)
+        after = registry.get_models()
+        assert after is not before and registry.stats()["reloads"] == 1
+        for _ in range(10):
+            assert registry.get_models() is after
+        assert registry.stats()["reloads"] == 1
+        assert registry.stats()["models"][1]["sha256"] != old_sha
+        assert not np.allclose(before[1].predict(X), after[1].predict(X))
+        assert np.allclose(before[0].predict(X), after[0].predict(X))
+
+        path.write_text('{"learner": ')  # caught mid-copy
+        _bump_mtime(path)
+        assert registry.get_models() is after and registry.stats()["reloads"] == 1
+    print("   ✅ One reload for new bytes, none for repeated checks, torn file ignored")
+
+
+def test_single_model_fallback():
+    """Without seed files the single-model file is used."""
+    print("\n1️⃣  Test 4: Single-model fallback")
+    with tempfile.TemporaryDirectory() as tmp:
+        _save_booster(Path(tmp) / f"{INSTRUMENT}_xgboost.json", 1)
+        registry = ModelRegistry(Path(tmp), INSTRUMENT)
+        assert len(registry.get_models()) == 1
+        assert registry.stats()["models"][0]["file"] == f"{INSTRUMENT}_xgboost.json"
+    print("   ✅ Single model loaded")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Model Registry")
+    print("=" * 70)
+    test_loads_once()
+    test_touch_without_change_does_not_reload()
+    test_rewrite_reloads_once()
+    test_single_model_fallback()
+    print("\n🎉 All model registry tests passed!")
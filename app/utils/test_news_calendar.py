@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory news calendar behind SimpleNewsAvoidanceService.
+
+Usage:
+    python3 app/utils/test_news_calendar.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+
+from app.utils.news_calendar import BlackoutTimeline, NewsCalendar, parse_event_time
+from app.utils.simple_news_avoidance import SimpleNewsAvoidanceService
+
+
+def _write(path: Path, events, enabled=True):
+    data = {"events": events, "settings": {"minutes_before": 30, "minutes_after": 60,
+                                           "minutes_before_close": 3, "enabled": enabled}}
+    path.write_text(json.dumps(data, default=str))
+
+
+def _event(i, title, currency, when, impact="high", fmt="z"):
+    stamp = {
+        "z": when.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "naive": when.replace(tzinfo=None).isoformat(),
+        "est": when.astimezone(timezone(timedelta(hours=-5))).isoformat(),
+    }[fmt]
+    return {"id": i, "title": title, "currency": currency, "event_time": stamp, "impact": impact}
+
+
+def test_window_queries():
+    """Indexed checks give the same decisions as the scan they replace."""
+    print("\n📅 Test 1: Avoid / close / upcoming decisions")
+    now = datetime.now(timezone.utc)
+    events = [
+        _event(1, "GBP CPI", "GBP", now + timedelta(minutes=20), fmt="naive"),
+        _event(2, "US NFP", "USD", now - timedelta(minutes=45), fmt="est"),
+        _event(3, "US Retail", "USD", now - timedelta(minutes=10)),
+        _event(4, "JPY BoJ", "JPY", now + timedelta(minutes=2)),
+        _event(5, "EUR PMI (medium)", "EUR", now + timedelta(minutes=1), impact="medium"),
+        _event(6, "EUR ECB", "EUR", now + timedelta(hours=5)),
+        _event(7, "USD FOMC old", "USD", now - timedelta(days=400)),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        _write(path, events)
+        service = SimpleNewsAvoidanceService(data_file=str(path))
+
+        eurusd = service.should_avoid_trading("EUR_USD")
+        assert eurusd["avoid_trading"] and eurusd["current_event"]["title"] == "US Retail"  # latest past
+        gbpjpy = service.should_avoid_trading("GBP_JPY")
+        assert gbpjpy["next_event"]["title"] == "JPY BoJ"  # closest upcoming
+        assert not service.should_avoid_trading("AUD_NZD")["avoid_trading"]
+
+        assert service.should_close_positions("USD_JPY")["next_event"]["title"] == "JPY BoJ"
+        assert not service.should_close_positions("EUR_USD")["close_positions"]  # medium ignored
+
+        upcoming = service.get_upcoming_news(hours_ahead=24)
+        assert [e["title"] for e in upcoming] == ["JPY BoJ", "GBP CPI", "EUR ECB"]
+        assert [e["title"] for e in service.get_upcoming_news(24, currency="eur")] == ["EUR ECB"]
+        assert upcoming[1]["event_time"] == parse_event_time(events[0]["event_time"])
+        assert service.calendar_reloads == 1
+    print("   ✅ Post-news, pre-news, close and upcoming answers from one load")
+
+
+def test_reload_on_file_change():
+    """The index is rebuilt when the file changes (external writer or add/delete)."""
+    print("\n🔄 Test 2: Reload on mtime change")
+    now = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        _write(path, [])
+        service = SimpleNewsAvoidanceService(data_file=str(path))
+        assert not service.should_avoid_trading("EUR_USD")["avoid_trading"]
+        for _ in range(100):
+            service.should_avoid_trading("EUR_USD")
+        assert service.calendar_reloads == 1
+
+        _write(path, [_event(1, "US CPI", "USD", now + timedelta(minutes=5))])
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))  # external writer
+        assert service.should_avoid_trading("EUR_USD")["avoid_trading"]
+        assert service.calendar_reloads == 2
+
+        added = service.add_news_event("EUR ECB", "EUR", now + timedelta(minutes=2))
+        assert service.should_close_positions("EUR_GBP")["next_event"]["title"] == "EUR ECB"
+        assert service.delete_news_event(added["id"])
+        assert not service.should_close_positions("EUR_GBP")["close_positions"]
+
+        _write(path, [_event(1, "US CPI", "USD", now + timedelta(minutes=5))], enabled=False)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000))
+        assert service.should_avoid_trading("EUR_USD")["reason"] == "News avoidance disabled"
+    print(f"   ✅ {service.calendar_reloads} reloads for 100+ checks and 4 file changes")
+
+
+def test_large_calendar_is_fast():
+    """Checks stay in the microsecond range with years of stored events."""
+    print("\n⚡ Test 3: Ten years of events")
+    now = datetime.now(timezone.utc)
+    currencies = ["USD", "EUR", "GBP", "JPY", "AUD", "CAD", "CHF", "NZD"]
+    start = now - timedelta(days=5 * 365)
+    events = [_event(i, f"Event {i}", currencies[i % len(currencies)], start + timedelta(minutes=97 * i))
+              for i in range(54_000)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        _write(path, events)
+        service = SimpleNewsAvoidanceService(data_file=str(path))
+        service.should_avoid_trading("GBP_USD")  # build the index
+
+        n = 2_000
+        t0 = time.perf_counter()
+        for _ in range(n):
+            service.should_avoid_trading("GBP_USD")
+            service.should_close_positions("GBP_USD")
+        per_check_us = (time.perf_counter() - t0) / (2 * n) * 1e6
+
+        calendar = NewsCalendar(events)
+        brute = [e for e in events if e["currency"] in ("GBP", "USD")
+                 and now - timedelta(hours=6) <= parse_event_time(e["event_time"]) <= now + timedelta(hours=6)]
+        hits = calendar.window(now - timedelta(hours=6), now + timedelta(hours=6), ["GBP", "USD"])
+        assert [e["id"] for e in hits] == [e["id"] for e in brute]
+        assert service.calendar_reloads == 1
+    assert per_check_us < 500, f"{per_check_us:.0f} µs per check"
+    print(f"   ✅ {len(events):,} events: {per_check_us:.1f} µs per check")
+
+
+def test_blackout_timeline():
+    """Merged intervals, transitions and masks agree with the per-event rules."""
+    print("\n🗓️ Test 4: Blackout timeline and next transition")
+    base = datetime(2025, 11, 17, 12, 0, tzinfo=timezone.utc)
+    events = [
+        _event(1, "US CPI", "USD", base),
+        _event(2, "US Claims", "USD", base + timedelta(minutes=50)),   # overlaps CPI's blackout
+        _event(3, "GBP BoE", "GBP", base + timedelta(hours=3)),
+        _event(4, "JPY BoJ", "JPY", base + timedelta(hours=1)),
+    ]
+    calendar = NewsCalendar(events)
+    timeline = BlackoutTimeline(calendar, minutes_before=30, minutes_after=60, minutes_before_close=3)
+    pair = ["GBP", "USD"]
+
+    starts, ends = timeline.intervals(pair, "blackout")
+    assert len(starts) == 2  # CPI + Claims merged, BoE separate
+    assert starts[0] == int((base - timedelta(minutes=30)).timestamp() * 1e9)
+
+    def brute(t):
+        times = [parse_event_time(e["event_time"]) for e in events if e["currency"] in pair]
+        return {"blackout": any(et - timedelta(minutes=30) <= t <= et + timedelta(minutes=60) for et in times),
+                "close": any(t < et <= t + timedelta(minutes=3) for et in times)}
+
+    probe = base - timedelta(hours=1)
+    for step in range(0, 6 * 60 * 60, 30):
+        t = probe + timedelta(seconds=step)
+        assert timeline.state_at(pair, t) == brute(t), t
+
+    # Walk the transitions: each one flips at least one state
+    t, walk = probe, []
+    while (nxt := timeline.next_transition(pair, t)) is not None:
+        assert nxt["time"] > t and timeline.state_at(pair, nxt["time"]) != timeline.state_at(pair, t)
+        walk.append((nxt["time"] - base, nxt["blackout"], nxt["close"]))
+        t = nxt["time"]
+    assert walk[0] == (timedelta(minutes=-30), True, False)
+    assert walk[1] == (timedelta(minutes=-3), True, True)
+    assert len(walk) == 10  # CPI/Claims: 6 (close windows inside one blackout), BoE: 4
+
+    stamps = np.arange(int(probe.timestamp() * 1e9), int((probe + timedelta(hours=6)).timestamp() * 1e9),
+                       30_000_000_000, dtype=np.int64)
+    mask = timeline.mask(pair, stamps)
+    close_mask = timeline.mask(pair, stamps, kind="close")
+    expected = [brute(datetime.fromtimestamp(ns / 1e9, tz=timezone.utc)) for ns in stamps.tolist()]
+    assert mask.tolist() == [e["blackout"] for e in expected]
+    assert close_mask.tolist() == [e["close"] for e in expected]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        _write(path, events)
+        service = SimpleNewsAvoidanceService(data_file=str(path))
+        state = service.next_transition("GBP_USD", now=base + timedelta(minutes=100))
+        assert state["avoid_trading"] and not state["close_positions"]
+        assert state["next_transition"]["time"] == base + timedelta(minutes=110, microseconds=1)
+        assert not state["next_transition"]["avoid_trading"]
+        assert service.blackout_timeline() is service.blackout_timeline()
+    print(f"   ✅ {len(walk)} transitions, {mask.sum()} of {len(stamps)} stamps blacked out")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing News Calendar Index")
+    print("=" * 70)
+    test_window_queries()
+    test_reload_on_file_change()
+    test_large_calendar_is_fast()
+    test_blackout_timeline()
+    print("\n🎉 All news calendar tests passed!")
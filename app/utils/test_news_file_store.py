@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test concurrent access to the shared news events file.
+
+Usage:
+    python3 app/utils/test_news_file_store.py
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.simple_news_avoidance import SimpleNewsAvoidanceService
+
+WRITERS = 4
+EVENTS_PER_WRITER = 25
+
+
+def _writer(path: str, writer: int):
+    service = SimpleNewsAvoidanceService(data_file=path)
+    base = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    for i in range(EVENTS_PER_WRITER):
+        service.add_news_event(f"W{writer} #{i}", "USD", base + timedelta(minutes=writer * 100 + i))
+
+
+def _bulk_rewriter(path: str, rounds: int):
+    service = SimpleNewsAvoidanceService(data_file=path)
+    base = datetime(2027, 1, 1, tzinfo=timezone.utc)
+    for r in range(rounds):
+        service.import_events([{"title": f"R{r} #{i}", "currency": "EUR", "event_time": base + timedelta(hours=i)}
+                               for i in range(500)])
+
+
+def test_concurrent_writers_lose_nothing():
+    """Writers in separate processes serialize on the lock: every event lands, ids are unique."""
+    print("\n🔒 Test 1: Concurrent writers")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "news_events.json")
+        SimpleNewsAvoidanceService(data_file=path)
+        procs = [multiprocessing.Process(target=_writer, args=(path, w)) for w in range(WRITERS)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+            assert p.exitcode == 0
+
+        events = json.loads(Path(path).read_text())["events"]
+        assert len(events) == WRITERS * EVENTS_PER_WRITER
+        assert len({e["id"] for e in events}) == len(events)
+        assert int(Path(path + ".version").read_text()) == 1 + WRITERS * EVENTS_PER_WRITER  # + initialize
+        assert sorted(os.listdir(tmp)) == ["news_events.json", "news_events.json.lock", "news_events.json.version"]
+    print(f"   ✅ {len(events)} events from {WRITERS} processes, no lost updates, no temp files left")
+
+
+def test_readers_never_see_torn_file():
+    """While another process rewrites a large file, every read parses and only grows."""
+    print("\n📖 Test 2: Readers during rewrites")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        SimpleNewsAvoidanceService(data_file=str(path))
+        rounds = 10
+        proc = multiprocessing.Process(target=_bulk_rewriter, args=(str(path), rounds))
+        proc.start()
+        reads, counts = 0, []
+        while proc.is_alive() or reads == 0:
+            counts.append(len(json.loads(path.read_text())["events"]))  # raises on a torn file
+            reads += 1
+        proc.join()
+        assert proc.exitcode == 0
+        assert counts == sorted(counts)
+        assert len(json.loads(path.read_text())["events"]) == rounds * 500
+    print(f"   ✅ {reads} reads during {rounds} rewrites, all complete JSON")
+
+
+def test_version_detects_changes():
+    """Checks skip reparsing until the version (or a hand edit) changes the key."""
+    print("\n🔢 Test 3: Version counter")
+    now = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        reader = SimpleNewsAvoidanceService(data_file=str(path))
+        writer = SimpleNewsAvoidanceService(data_file=str(path))
+        assert not reader.should_avoid_trading("EUR_USD")["avoid_trading"]
+        version = reader.data_version
+        for _ in range(20):
+            reader.should_avoid_trading("EUR_USD")
+        assert reader.calendar_reloads == 1
+
+        writer.add_news_event("US CPI", "USD", now + timedelta(minutes=5))
+        assert reader.should_avoid_trading("EUR_USD")["avoid_trading"]
+        assert reader.data_version == version + 1 and reader.calendar_reloads == 2
+
+        # Hand edit without a version bump is still noticed (new inode/mtime/size)
+        data = json.loads(path.read_text())
+        data["settings"]["enabled"] = False
+        path.write_text(json.dumps(data))
+        assert reader.should_avoid_trading("EUR_USD")["reason"] == "News avoidance disabled"
+    print("   ✅ One reload per write, hand edits detected")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing News File Store")
+    print("=" * 70)
+    test_concurrent_writers_lose_nothing()
+    test_readers_never_see_torn_file()
+    test_version_detects_changes()
+    print("\n🎉 All news file store tests passed!")
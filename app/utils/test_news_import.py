@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test calendar file parsing and the bulk import path.
+
+Usage:
+    python3 app/utils/test_news_import.py
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import app.api.routes.news_avoidance as routes
+from app.utils.async_news_avoidance import AsyncNewsAvoidance
+from app.utils.news_import import detect_format, parse_calendar
+from app.utils.simple_news_avoidance import SimpleNewsAvoidanceService
+
+UTC = timezone.utc
+
+CSV = """Title,Country,Date,Time,Impact
+Non-Farm Payrolls,USD,2026-01-09,8:30am,High
+Non-Farm Payrolls,USD,2026-01-09,8:30am,High
+BoE Rate Decision,gbp,2026-02-05,7:00am,high
+Bank Holiday,EUR,2026-04-06,,Holiday
+CPI m/m,USD,2026-01-13,8:30am,Medium
+"""
+
+ICS = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+SUMMARY:USD FOMC Statement
+DTSTART;TZID=America/New_York:20260128T140000
+X-IMPACT:high
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:RBA Rate
+  Statement
+CATEGORIES:AUD
+DTSTART:20260203T033000Z
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Christmas
+CATEGORIES:USD
+DTSTART;VALUE=DATE:20261225
+END:VEVENT
+END:VCALENDAR
+"""
+
+FOREX_FACTORY = json.dumps([
+    {"title": "ECB Press Conference", "country": "EUR", "date": "2026-01-22T08:45:00-05:00", "impact": "High"},
+    {"title": "German Prelim CPI", "country": "EUR", "date": "2026-01-29T03:00:00-05:00", "impact": "Medium"},
+])
+
+
+def _year_calendar(n: int = 5_000) -> str:
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    currencies = ["USD", "EUR", "GBP", "JPY", "AUD", "CAD", "CHF", "NZD"]
+    lines = ["title,currency,event_time,impact"]
+    for i in range(n):
+        when = start + timedelta(minutes=105 * i)
+        lines.append(f"Event {i},{currencies[i % 8]},{when.isoformat()},{'high' if i % 3 else 'medium'}")
+    return "\n".join(lines)
+
+
+def test_parse_formats():
+    """CSV (date + 12h time, in New York), ICS and ForexFactory JSON."""
+    print("\n📄 Test 1: Parse CSV / ICS / JSON calendars")
+    csv_batch = parse_calendar(CSV, filename="calendar.csv", tz="America/New_York")
+    assert csv_batch["rows"] == 5 and csv_batch["duplicates"] == 1
+    assert [e["title"] for e in csv_batch["events"]] == ["Non-Farm Payrolls", "BoE Rate Decision", "CPI m/m"]
+    assert csv_batch["events"][0]["event_time"] == datetime(2026, 1, 9, 13, 30, tzinfo=UTC)  # EST
+    assert csv_batch["events"][1]["currency"] == "GBP"
+    assert csv_batch["events"][2]["impact"] == "medium"
+    assert csv_batch["errors"] == [{"row": 4, "error": "invalid impact 'holiday'"}]
+
+    ics_batch = parse_calendar(ICS)
+    assert ics_batch["format"] == "ics"
+    fomc, rba = ics_batch["events"]
+    assert (fomc["currency"], fomc["event_time"]) == ("USD", datetime(2026, 1, 28, 19, 0, tzinfo=UTC))
+    assert (rba["title"], rba["currency"]) == ("RBA Rate Statement", "AUD")
+    assert len(ics_batch["errors"]) == 1 and "all-day" in ics_batch["errors"][0]["error"]
+
+    ff_batch = parse_calendar(FOREX_FACTORY)
+    assert ff_batch["format"] == "json" and not ff_batch["errors"]
+    assert ff_batch["events"][0]["event_time"] == datetime(2026, 1, 22, 13, 45, tzinfo=UTC)
+    assert detect_format(content_type="text/calendar") == "ics"
+    print("   ✅ Aliased columns, timezones, folded ICS lines; invalid rows reported by row number")
+
+
+def test_bulk_import_year():
+    """A year of events lands in one atomic write, well under a second; re-import is a no-op."""
+    print("\n📥 Test 2: Bulk import of a full calendar year")
+    content = _year_calendar()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        service = SimpleNewsAvoidanceService(data_file=str(path))
+        service.add_news_event("Event 0", "USD", datetime(2026, 1, 1, tzinfo=UTC))
+
+        t0 = time.perf_counter()
+        batch = parse_calendar(content)
+        counts = service.import_events(batch["events"])
+        elapsed = time.perf_counter() - t0
+        assert counts == {"inserted": 4_999, "skipped": 1}, counts
+        assert elapsed < 1.0, f"{elapsed:.2f}s"
+
+        stored = json.loads(path.read_text())["events"]
+        assert len(stored) == 5_000 and len({e["id"] for e in stored}) == 5_000
+        assert not list(Path(tmp).glob(".*.tmp"))
+        assert service.import_events(batch["events"]) == {"inserted": 0, "skipped": 5_000}
+        assert len(service.blackout_timeline().calendar) == 1 + sum(1 for i in range(5_000) if i % 3)  # + seeded
+    print(f"   ✅ 5,000 events parsed, validated and written in {elapsed * 1000:.0f} ms")
+
+
+async def _post(body: bytes, content_type: str, **params):
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    request = Request({"type": "http", "method": "POST", "path": "/api/news-avoidance/news-events/import",
+                       "headers": [(b"content-type", content_type.encode())], "query_string": b""}, receive)
+    return await routes.import_news_events(request, **params)
+
+
+async def _route_imports(path: Path):
+    original = routes.async_news_avoidance
+    routes.async_news_avoidance = AsyncNewsAvoidance(SimpleNewsAvoidanceService(data_file=str(path)), poll_seconds=0)
+    try:
+        try:
+            await _post(CSV.encode(), "text/csv", tz="America/New_York")
+            raise AssertionError("invalid row accepted")
+        except HTTPException as e:
+            assert e.status_code == 422 and e.detail["invalid"] == 1
+        assert json.loads(path.read_text())["events"] == []  # all-or-nothing
+
+        result = await _post(CSV.encode(), "text/csv", tz="America/New_York", skip_invalid=True)
+        assert (result["inserted"], result["duplicates"], result["invalid"]) == (3, 1, 1)
+        result = await _post(ICS.encode(), "text/calendar", skip_invalid=True)
+        assert result["format"] == "ics" and result["inserted"] == 2
+        assert (await _post(FOREX_FACTORY.encode(), "application/json", dry_run=True))["inserted"] == 0
+    finally:
+        await routes.async_news_avoidance.stop()
+        routes.async_news_avoidance = original
+
+
+def test_import_route():
+    """The import endpoint rejects bad files atomically and reports counts."""
+    print("\n🌐 Test 3: POST /news-events/import")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "news_events.json"
+        SimpleNewsAvoidanceService(data_file=str(path))
+        asyncio.run(_route_imports(path))
+    print("   ✅ 422 with nothing written, skip_invalid import, ICS by content type, dry run")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing News Calendar Import")
+    print("=" * 70)
+    test_parse_formats()
+    test_bulk_import_year()
+    test_import_route()
+    print("\n🎉 All news import tests passed!")
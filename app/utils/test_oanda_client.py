@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test the shared OANDA client against a local fake REST server.
+
+Usage:
+    python3 app/utils/test_oanda_client.py
+"""
+
+import asyncio
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.oanda_client import (
+    AsyncOandaClient, OandaAPIError, OandaClient, RateLimiter, endpoint_key,
+)
+
+ACCOUNT = "101-001-1234567-001"
+
+
+class FakeOandaServer:
+    """HTTP/1.1 keep-alive server; `script` maps paths to queued (status, body) replies."""
+
+    def __init__(self, script=None):
+        self.script = {path: list(replies) for path, replies in (script or {}).items()}
+        self.requests = []
+        self.clients = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                server.requests.append((self.command, self.path, body))
+                server.clients.add(self.client_address)
+                replies = server.script.get(self.path.split("?")[0], [])
+                status, payload = replies.pop(0) if len(replies) > 1 else (replies[0] if replies else (200, {}))
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v3"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _client(server, **kwargs) -> OandaClient:
+    sleeps = []
+    client = OandaClient(api_key="test-token", base_url=server.url, sleep=sleeps.append, **kwargs)
+    client.sleeps = sleeps
+    return client
+
+
+def test_pooled_connection_and_histograms():
+    """Sequential calls reuse one keep-alive connection; latency is recorded per endpoint."""
+    print("\n🔌 Test 1: Keep-alive pooling and latency histograms")
+    server = FakeOandaServer({f"/v3/accounts/{ACCOUNT}/summary": [(200, {"account": {"balance": "1000.0"}})]})
+    try:
+        client = _client(server)
+        for _ in range(20):
+            assert client.get(f"accounts/{ACCOUNT}/summary")["account"]["balance"] == "1000.0"
+        client.put(f"accounts/{ACCOUNT}/trades/42/orders", json={"stopLoss": {"price": "1.25000"}})
+    finally:
+        server.close()
+
+    assert len(server.clients) == 1, f"{len(server.clients)} connections opened"
+    stats = client.latency_stats()
+    assert stats["GET accounts/{id}/summary"]["count"] == 20
+    summary = stats["GET accounts/{id}/summary"]
+    assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+    assert stats["PUT accounts/{id}/trades/{id}/orders"]["count"] == 1
+    assert endpoint_key("GET", f"accounts/{ACCOUNT}/orders/@my-tag") == "GET accounts/{id}/orders/{id}"
+    print(f"   ✅ 21 requests over 1 connection, p50 {stats['GET accounts/{id}/summary']['p50_ms']} ms")
+
+
+def test_retry_policy():
+    """GETs retry 5xx with backoff; 4xx fail fast; POSTs retry only explicit rejections."""
+    print("\n🔁 Test 2: Retries and backoff")
+    path = f"/v3/accounts/{ACCOUNT}"
+    server = FakeOandaServer({
+        f"{path}/openTrades": [(503, {}), (502, {}), (200, {"trades": []})],
+        f"{path}/orders": [(500, {"errorMessage": "boom"}), (200, {"orderFillTransaction": {}})],
+        f"{path}/trades/7/close": [(404, {"errorMessage": "Trade not found", "errorCode": "TRADE_DOESNT_EXIST"})],
+    })
+    try:
+        client = _client(server)
+        assert client.get(f"accounts/{ACCOUNT}/openTrades") == {"trades": []}
+        assert len(client.sleeps) == 2 and all(0 <= s <= 8 for s in client.sleeps)
+
+        try:
+            client.put(f"accounts/{ACCOUNT}/trades/7/close", json={})
+            raise AssertionError("expected OandaAPIError")
+        except OandaAPIError as e:
+            assert e.status == 404 and e.error_code == "TRADE_DOESNT_EXIST"
+
+        try:
+            client.post(f"accounts/{ACCOUNT}/orders", json={"order": {}})  # 500: may have executed
+            raise AssertionError("expected OandaAPIError")
+        except OandaAPIError as e:
+            assert e.status == 500
+    finally:
+        server.close()
+
+    posts = [r for r in server.requests if r[0] == "POST"]
+    assert len(posts) == 1, "an order POST must not be retried after a 500"
+    print("   ✅ 2 retries on 5xx GET, 404 fails fast, order POST not retried after 500")
+
+
+def test_rate_limiter_and_async():
+    """The token bucket spaces bursts; the async client shares the pooled client."""
+    print("\n⏱️  Test 3: Rate limiting and async front-end")
+    now = [0.0]
+    limiter = RateLimiter(rate=10, burst=2, clock=lambda: now[0])
+    waits = [limiter.reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0] and abs(waits[2] - 0.1) < 1e-9 and abs(waits[3] - 0.2) < 1e-9
+    now[0] += 1.0
+    assert limiter.reserve() == 0.0
+
+    server = FakeOandaServer({f"/v3/accounts/{ACCOUNT}/pricing": [(200, {"prices": [{"bids": []}]})]})
+    try:
+        client = AsyncOandaClient(_client(server))
+        results = asyncio.run(client.gather([("GET", f"accounts/{ACCOUNT}/pricing")] * 5))
+    finally:
+        server.close()
+    assert all(r == {"prices": [{"bids": []}]} for r in results)
+    assert client.latency_stats()["GET accounts/{id}/pricing"]["count"] == 5
+    print("   ✅ Burst of 2 then 100 ms spacing at 10/s; 5 concurrent async calls")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Shared OANDA Client")
+    print("=" * 70)
+    test_pooled_connection_and_histograms()
+    test_retry_policy()
+    test_rate_limiter_and_async()
+    print("\n🎉 All OANDA client tests passed!")
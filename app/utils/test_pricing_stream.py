@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test the streaming pricing feed against a local fake OANDA stream server.
+
+Usage:
+    python3 app/utils/test_pricing_stream.py
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.oanda_client import shared_client
+from app.utils.pricing_stream import OandaPricingStream, StreamingCandleFeed
+
+
+def price(ts: str, bid: float, ask: float, instrument: str = "GBP_USD") -> dict:
+    return {"type": "PRICE", "instrument": instrument, "time": f"2025-11-27T{ts}Z", "tradeable": True,
+            "bids": [{"price": f"{bid:.5f}", "liquidity": 1000000}],
+            "asks": [{"price": f"{ask:.5f}", "liquidity": 1000000}]}
+
+
+def heartbeat(ts: str) -> dict:
+    return {"type": "HEARTBEAT", "time": f"2025-11-27T{ts}Z"}
+
+
+class FakeStreamServer:
+    """
+    Serves the OANDA pricing stream path on localhost. Each connection plays
+    the next scripted session (a list of messages) and then closes.
+    """
+
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.0"
+
+            def do_GET(self):
+                server.requests.append((self.path, self.headers.get("Authorization")))
+                if not server.sessions:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.end_headers()
+                for msg in server.sessions.pop(0):
+                    self.wfile.write(json.dumps(msg).encode() + b"\n")
+                    self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _feed(server: FakeStreamServer) -> StreamingCandleFeed:
+    stream = OandaPricingStream("101-TEST", ["GBP_USD"], api_key="test-token",
+                                stream_url=server.url, read_timeout=5, sleep=lambda s: None)
+    return StreamingCandleFeed(stream, "GBP_USD")
+
+
+def test_bars_close_once_with_spread():
+    """Ticks become mid OHLC bars, each emitted once, with the closing tick's spread."""
+    print("\n📡 Test 1: Bars from a pricing stream")
+    server = FakeStreamServer([[
+        price("09:00:01.123456789", 1.26500, 1.26510),
+        price("09:00:20.000000000", 1.26530, 1.26540),
+        price("09:00:40.000000000", 1.26480, 1.26490),
+        price("09:00:59.999000000", 1.26505, 1.26519),   # close of 09:00, spread 1.4
+        price("09:00:30.000000000", 1.20000, 1.20010, instrument="EUR_USD"),  # other instrument
+        heartbeat("09:00:59.000000000"),                  # still inside 09:00: no bar yet
+        price("09:01:02.000000000", 1.26520, 1.26530),   # closes 09:00
+        price("09:00:58.000000000", 1.26000, 1.26010),   # late tick for an emitted bar
+        heartbeat("09:02:04.000000000"),                  # quiet close of 09:01
+        heartbeat("09:03:09.000000000"),                  # no ticks in 09:02: no bar
+    ]])
+    try:
+        feed = _feed(server)
+        bars = list(feed.candles(max_reconnects=0))
+    finally:
+        server.close()
+
+    assert [candle["time"].strftime("%H:%M") for candle, _ in bars] == ["09:00", "09:01"]
+    first, spread = bars[0]
+    ohlc = [round(first[col], 6) for col in ["open", "high", "low", "close"]]
+    assert ohlc == [1.26505, 1.26535, 1.26485, 1.26512] and first["volume"] == 4
+    assert abs(spread - 1.4) < 1e-9 and feed.builder.late_ticks == 1
+    path, auth = server.requests[0]
+    assert path.startswith("/v3/accounts/101-TEST/pricing/stream?instruments=GBP_USD") and auth == "Bearer test-token"
+    assert feed.stream.session is shared_client("test-token").session  # pooled session, not a new one
+    print("   ✅ 2 bars, OHLC from mids, spread 1.4 pips, late tick dropped")
+
+
+def test_reconnect_continues_forming_bar():
+    """A dropped connection resumes without losing or duplicating bars."""
+    print("\n🔄 Test 2: Reconnect mid-bar")
+    server = FakeStreamServer([
+        [price("10:00:05.000000000", 1.26500, 1.26510), price("10:00:30.000000000", 1.26600, 1.26610)],
+        [price("10:00:30.000000000", 1.26600, 1.26610),   # snapshot repeats the last price
+         price("10:00:50.000000000", 1.26400, 1.26410), price("10:01:01.000000000", 1.26450, 1.26460),
+         heartbeat("10:02:05.000000000")],
+    ])
+    try:
+        feed = _feed(server)
+        bars = list(feed.candles(max_reconnects=1))
+    finally:
+        server.close()
+
+    assert [candle["time"].strftime("%H:%M") for candle, _ in bars] == ["10:00", "10:01"]
+    assert round(bars[0][0]["high"], 6) == 1.26605 and round(bars[0][0]["low"], 6) == 1.26405
+    assert feed.stream.connects == 2
+    print("   ✅ Forming bar survived the reconnect; 2 bars, no duplicates")
+
+
+def test_malformed_messages_are_skipped():
+    """Bad lines are counted and skipped; the feed keeps building bars."""
+    print("\n🧹 Test 3: Malformed messages")
+    bad_price = price("11:00:20.000000000", 1.26500, 1.26510)
+    del bad_price["time"]
+    bad_bid = price("11:00:25.000000000", 1.26500, 1.26510)
+    bad_bid["bids"][0]["price"] = "n/a"
+    server = FakeStreamServer([[
+        price("11:00:05.000000000", 1.26500, 1.26510),
+        bad_price,                                        # PRICE without time
+        {"type": "HEARTBEAT", "time": "not-a-time"},      # unparseable timestamp
+        bad_bid,                                          # unparseable price
+        {"type": "PRICE", "instrument": "GBP_USD", "time": "2025-11-27T11:00:30Z", "bids": [{}], "asks": [{}]},
+        price("11:00:40.000000000", 1.26600, 1.26610),
+        price("11:01:01.000000000", 1.26450, 1.26460),   # closes 11:00
+    ]])
+    try:
+        feed = _feed(server)
+        bars = list(feed.candles(max_reconnects=0))
+    finally:
+        server.close()
+
+    assert [candle["time"].strftime("%H:%M") for candle, _ in bars] == ["11:00"]
+    assert bars[0][0]["volume"] == 2 and feed.malformed == 4
+    print("   ✅ 4 malformed messages skipped, bar built from the valid ticks")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Streaming Pricing Feed")
+    print("=" * 70)
+    test_bars_close_once_with_spread()
+    test_reconnect_continues_forming_bar()
+    test_malformed_messages_are_skipped()
+    print("\n🎉 All pricing stream tests passed!")
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.db import get_db
 from app.models.ml_signal_history import MLSignalHistory
+from app.utils.latest_signals import latest_signals_statement
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -259,22 +260,15 @@ async def dashboard_multisignals(request: Request, db: AsyncSession = Depends(ge
     expected_instruments = ["EUR_USD", "GBP_USD", "USD_JPY"]
     
     try:
-        # Get all unique instruments from database
-        instruments_query = select(MLSignalHistory.instrument).distinct()
-        instruments_result = await db.execute(instruments_query)
-        db_instruments = [row[0] for row in instruments_result.all()]
+        # Latest signal of every instrument in one query (index skip-scan)
+        latest_result = await db.execute(latest_signals_statement())
+        latest_signals = {signal.instrument: signal for signal in latest_result.scalars().all()}
         
         # Combine expected instruments with database instruments (no duplicates, maintain order)
-        all_instruments = expected_instruments + [inst for inst in db_instruments if inst not in expected_instruments]
+        all_instruments = expected_instruments + [inst for inst in latest_signals if inst not in expected_instruments]
         
-        # Get latest signal for each instrument
         for instrument in all_instruments:
-            signal_query = select(MLSignalHistory).where(
-                MLSignalHistory.instrument == instrument
-            ).order_by(MLSignalHistory.timestamp.desc()).limit(1)
-            
-            signal_result = await db.execute(signal_query)
-            signal = signal_result.scalar_one_or_none()
+            signal = latest_signals.get(instrument)
             
             if signal:
                 signals_data.append({
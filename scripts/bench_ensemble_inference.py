@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-signal ensemble inference latency, before vs after batching.
+
+"before" = original generate_signal path (per-column pd.isna/df.loc loop,
+           DMatrix build, sequential model.predict)
+"after"  = build_feature_vector + EnsemblePredictor (sequential and thread pool)
+
+Uses synthetic boosters shaped like the ML5 ensemble (5 seeds, 14 features),
+or real ones if --model-dir is given.
+
+Usage:
+    python3 scripts/bench_ensemble_inference.py [--model-dir DIR --instrument EUR_USD] [--iterations 2000]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.ensemble_predictor import EnsemblePredictor, build_feature_vector
+from app.utils.incremental_indicators import FEATURE_COLS
+from app.utils.model_registry import ModelRegistry
+
+
+def synthetic_models(n_trees: int, depth: int):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(5000, len(FEATURE_COLS)))
+    y = (X[:, 0] + rng.normal(size=5000) > 0).astype(int)
+    dtrain = xgb.DMatrix(X, label=y, feature_names=FEATURE_COLS)
+    return [
+        xgb.train({"objective": "binary:logistic", "max_depth": depth, "seed": seed, "nthread": 1},
+                  dtrain, num_boost_round=n_trees)
+        for seed in range(43, 48)
+    ]
+
+
+def synthetic_frame(rows: int = 250) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.normal(size=(rows, len(FEATURE_COLS))), columns=FEATURE_COLS)
+    df.loc[rows - 1, ["rsi", "momentum_24h"]] = np.nan  # exercise the NaN fallback
+    return df
+
+
+def legacy_predict(df: pd.DataFrame, models) -> list:
+    """Original generate_signal feature assembly + inference."""
+    latest = df.iloc[-1]
+    feature_values = []
+    for col in FEATURE_COLS:
+        val = latest[col]
+        if pd.isna(val):
+            valid_idx = df[col].last_valid_index()
+            if valid_idx is not None:
+                val = df.loc[valid_idx, col]
+            else:
+                val = 0.0
+        feature_values.append(float(val))
+    features = np.array(feature_values, dtype=np.float64).reshape(1, -1)
+    if np.isnan(features).any():
+        features = np.nan_to_num(features, nan=0.0)
+    dtest = xgb.DMatrix(features, feature_names=FEATURE_COLS)
+    return [round(float(model.predict(dtest)[0]), 4) for model in models]
+
+
+def batched_predict(df: pd.DataFrame, models, predictor: EnsemblePredictor) -> list:
+    features = build_feature_vector(df, FEATURE_COLS)
+    return [round(float(p), 4) for p in predictor.predict(models, features, FEATURE_COLS)]
+
+
+def timeit(fn, iterations: int):
+    for _ in range(min(50, iterations)):  # warm-up
+        fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p99": samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", help="Directory with real {instrument}_xgboost_seed*.json models")
+    parser.add_argument("--instrument", default="EUR_USD")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--trees", type=int, default=300, help="Trees per synthetic booster")
+    parser.add_argument("--depth", type=int, default=6, help="Depth of synthetic boosters")
+    args = parser.parse_args()
+
+    if args.model_dir:
+        models = ModelRegistry(Path(args.model_dir), args.instrument).load()
+        source = f"{len(models)} models from {args.model_dir}"
+    else:
+        models = synthetic_models(args.trees, args.depth)
+        source = f"5 synthetic boosters ({args.trees} trees, depth {args.depth})"
+    if not models:
+        sys.exit("No models loaded")
+
+    df = synthetic_frame()
+    sequential = EnsemblePredictor()
+    threaded = EnsemblePredictor(parallel=True)
+
+    expected = legacy_predict(df, models)
+    assert batched_predict(df, models, sequential) == expected, "batched output differs from legacy"
+    assert batched_predict(df, models, threaded) == expected, "threaded output differs from legacy"
+
+    print(f"📊 Ensemble inference benchmark - {source}, {args.iterations} iterations")
+    print("=" * 70)
+    results = {
+        "before (loop + DMatrix)": timeit(lambda: legacy_predict(df, models), args.iterations),
+        "after (batched)": timeit(lambda: batched_predict(df, models, sequential), args.iterations),
+        "after (batched, threads)": timeit(lambda: batched_predict(df, models, threaded), args.iterations),
+    }
+    baseline = results["before (loop + DMatrix)"]["mean"]
+    for name, r in results.items():
+        print(f"  {name:26s} mean {r['mean']:8.1f} µs  p50 {r['p50']:8.1f} µs  "
+              f"p99 {r['p99']:8.1f} µs  ({baseline / r['mean']:.2f}x)")
+    threaded.shutdown()
+
+
+if __name__ == "__main__":
+    main()
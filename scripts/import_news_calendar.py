@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Import an economic calendar (CSV, ICS or JSON) into the news avoidance store.
+
+Writes straight to the configured backend (NEWS_AVOIDANCE_BACKEND: the JSON
+news file, or red_folder_events with =db) in one write; running bots pick the
+events up on their next check.
+
+Usage:
+    python3 scripts/import_news_calendar.py calendar_2026.csv [--tz America/New_York]
+    python3 scripts/import_news_calendar.py ff_calendar.json --skip-invalid
+    python3 scripts/import_news_calendar.py events.ics --dry-run
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.news_import import FORMATS, parse_calendar
+from app.utils.simple_news_avoidance import create_news_avoidance_service, news_avoidance_backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import a news calendar file")
+    parser.add_argument("path", type=Path, help="Calendar file")
+    parser.add_argument("--format", choices=FORMATS, help="File format (default: from extension/content)")
+    parser.add_argument("--tz", default="UTC", help="Timezone of times without an offset")
+    parser.add_argument("--skip-invalid", action="store_true", help="Import valid rows even if some are invalid")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only")
+    parser.add_argument("--data-file", help="News file (file backend; default: the shared news file)")
+    args = parser.parse_args()
+    if args.data_file and news_avoidance_backend() == "db":
+        parser.error("--data-file only applies to the file backend (NEWS_AVOIDANCE_BACKEND=db is set)")
+
+    t0 = time.perf_counter()
+    batch = parse_calendar(args.path.read_text(encoding="utf-8-sig"), fmt=args.format,
+                           filename=args.path.name, tz=args.tz)
+    parsed_ms = (time.perf_counter() - t0) * 1000
+    print(f"📄 {args.path.name} ({batch['format']}): {batch['rows']:,} rows, {len(batch['events']):,} valid, "
+          f"{batch['duplicates']:,} duplicates, {len(batch['errors']):,} invalid ({parsed_ms:.0f} ms)")
+    for error in batch["errors"][:20]:
+        print(f"   ❌ row {error['row']}: {error['error']}")
+    if len(batch["errors"]) > 20:
+        print(f"   ... {len(batch['errors']) - 20} more")
+
+    if batch["errors"] and not args.skip_invalid:
+        print("🚫 Nothing imported (fix the rows above or pass --skip-invalid)")
+        return 1
+    if args.dry_run:
+        print("✅ Dry run, nothing written")
+        return 0
+
+    service = create_news_avoidance_service(**({"data_file": args.data_file} if args.data_file else {}))
+    t0 = time.perf_counter()
+    counts = service.import_events(batch["events"])
+    print(f"✅ Imported {counts['inserted']:,} events, {counts['skipped']:,} already stored "
+          f"({(time.perf_counter() - t0) * 1000:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
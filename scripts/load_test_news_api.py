@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Load test: /api/news-avoidance/should-avoid-trading/{pair} latency under concurrency.
+
+Drives the news-avoidance router in-process over ASGI (no network) with an
+open-loop arrival rate (latency measured from each request's scheduled time,
+so queueing is not hidden) while a writer adds events, and reports
+p50/p95/p99 for two backends:
+
+"blocking" = the previous pattern: async handlers calling the file-backed
+             service directly, so the file check/reload (with simulated disk
+             latency) runs on the event loop
+"async"    = the routes as shipped: AsyncNewsAvoidance serving checks from
+             memory, file I/O in worker threads
+
+Usage:
+    python3 scripts/load_test_news_api.py [--rate 500] [--requests 5000] \\
+        [--events 20000] [--disk-latency-ms 1] [--write-every-ms 250]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import FastAPI
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import app.api.routes.news_avoidance as routes
+from app.utils.async_news_avoidance import AsyncNewsAvoidance
+from app.utils.simple_news_avoidance import SimpleNewsAvoidanceService
+
+PAIRS = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD"]
+
+
+class SlowDiskService(SimpleNewsAvoidanceService):
+    """File service whose file check pays a fixed (simulated) disk latency."""
+
+    disk_latency = 0.0
+
+    def refresh(self) -> bool:
+        time.sleep(self.disk_latency)
+        return super().refresh()
+
+
+def write_calendar(path: Path, n_events: int):
+    now = datetime.now(timezone.utc)
+    currencies = ["USD", "EUR", "GBP", "JPY", "AUD", "CAD", "CHF", "NZD"]
+    events = [{"id": i + 1, "title": f"Event {i}", "currency": currencies[i % len(currencies)],
+               "event_time": (now + timedelta(minutes=53 * (i - n_events // 2))).isoformat(),
+               "impact": "high" if i % 3 else "medium"} for i in range(n_events)]
+    path.write_text(json.dumps({"events": events, "settings": {
+        "minutes_before": 30, "minutes_after": 60, "minutes_before_close": 3, "enabled": True}}))
+
+
+async def asgi_request(app, method: str, path: str, body: bytes = b"") -> int:
+    """Minimal in-process ASGI call; returns the status code."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"loadtest"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000), "server": ("loadtest", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def build_blocking_app(service: SimpleNewsAvoidanceService) -> FastAPI:
+    """Previous handler shape: async def calling the file-backed service inline."""
+    app = FastAPI()
+
+    @app.get("/api/news-avoidance/should-avoid-trading/{currency_pair}")
+    async def check(currency_pair: str):
+        return service.should_avoid_trading(currency_pair)
+
+    @app.post("/api/news-avoidance/news-events", status_code=201)
+    async def create(payload: dict):
+        return service.add_news_event(payload["title"], payload["currency"],
+                                      datetime.fromisoformat(payload["event_time"]))
+
+    @app.delete("/api/news-avoidance/news-events/{event_id}", status_code=204)
+    async def delete(event_id: int):
+        service.delete_news_event(event_id)
+
+    return app
+
+
+def build_async_app(service: SimpleNewsAvoidanceService) -> FastAPI:
+    routes.async_news_avoidance = AsyncNewsAvoidance(service, poll_seconds=0.5)
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api/news-avoidance")
+    return app
+
+
+async def run(app, total: int, rate: float, write_every: float):
+    """
+    Open-loop load: request k is due at start + k / rate regardless of how the
+    previous ones fared, and its latency counts from that scheduled time, so
+    time spent queued behind a blocked loop is included.
+    """
+    loop = asyncio.get_running_loop()
+    latencies = []
+    stop = asyncio.Event()
+
+    async def request(k: int, scheduled: float):
+        await asyncio.sleep(max(0.0, scheduled - loop.time()))
+        pair = PAIRS[k % len(PAIRS)]
+        status = await asgi_request(app, "GET", f"/api/news-avoidance/should-avoid-trading/{pair}")
+        latencies.append((loop.time() - scheduled) * 1000)
+        assert status == 200, status
+
+    async def writer():
+        writes = 0
+        while not stop.is_set():
+            await asyncio.sleep(write_every)
+            when = (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
+            body = json.dumps({"title": "Load test", "currency": "USD", "event_time": when}).encode()
+            await asgi_request(app, "POST", "/api/news-avoidance/news-events", body)
+            writes += 1
+        return writes
+
+    # Warm-up (initial load) outside the measurement
+    await asgi_request(app, "GET", "/api/news-avoidance/should-avoid-trading/EUR_USD")
+    writer_task = asyncio.create_task(writer()) if write_every else None
+    started = loop.time()
+    await asyncio.gather(*(request(k, started + k / rate) for k in range(total)))
+    elapsed = loop.time() - started
+    stop.set()
+    writes = await writer_task if writer_task else 0
+
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    return {
+        "requests": len(latencies),
+        "writes": writes,
+        "rps": round(len(latencies) / elapsed),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(pct(0.95), 2),
+        "p99_ms": round(pct(0.99), 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+async def main_async(args):
+    results = {}
+    for mode in ("blocking", "async"):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "news_events.json"
+            write_calendar(path, args.events)
+            SlowDiskService.disk_latency = args.disk_latency_ms / 1000
+            service = SlowDiskService(data_file=str(path))
+            app = build_blocking_app(service) if mode == "blocking" else build_async_app(service)
+            results[mode] = await run(app, args.requests, args.rate, args.write_every_ms / 1000)
+            if mode == "async":
+                await routes.async_news_avoidance.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent latency of the news-avoidance check route")
+    parser.add_argument("--rate", type=float, default=500.0, help="Request arrivals per second")
+    parser.add_argument("--requests", type=int, default=5000, help="Total check requests")
+    parser.add_argument("--events", type=int, default=20_000, help="Events in the calendar file")
+    parser.add_argument("--disk-latency-ms", type=float, default=1.0, help="Simulated latency per file check")
+    parser.add_argument("--write-every-ms", type=float, default=250.0, help="Writer interval (0: no writes)")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    results = asyncio.run(main_async(args))
+    print(f"📈 {args.requests:,} requests at {args.rate:g}/s, {args.events:,} events, "
+          f"{args.disk_latency_ms:g} ms disk latency, writer every {args.write_every_ms:g} ms")
+    print(f"{'backend':<10}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'writes':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['rps']:>8}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}{r['writes']:>8}")
+
+
+if __name__ == "__main__":
+    main()